@@ -0,0 +1,180 @@
+from abc import abstractmethod
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Protocol
+
+from pydantic import BaseModel
+
+
+class State(Protocol):
+    """
+    Counters the conditions are evaluated on, WarehouseState or a Simulation
+    """
+
+    time: float
+    robots: int
+    balance: float
+    foos: int
+    bars: int
+    foobars: int
+
+
+class Condition(BaseModel):
+    """
+    Condition on the factory state, conditions can be combined with & and |. The metaclass of the pydantic models
+    is an ABCMeta, so only the conditions implementing is_met can be instantiated.
+    """
+
+    @abstractmethod
+    def is_met(self, state: State, wall_time: float) -> bool:
+        """
+        Returns if the condition is met
+        :param state: current state
+        :param wall_time: wall time elapsed since the start, in seconds
+        :return: bool
+        """
+
+    def get_simulated_deadlines(self) -> List[float]:
+        """
+        Returns the simulated times at which the condition can change without any warehouse change
+        :return: simulated times, in seconds
+        """
+        return []
+
+    def get_wall_deadlines(self) -> List[float]:
+        """
+        Returns the wall times at which the condition can change without any warehouse change
+        :return: wall times, in seconds
+        """
+        return []
+
+    def __and__(self, other: "Condition") -> "AllOf":
+        return AllOf(conditions=[self, other])
+
+    def __or__(self, other: "Condition") -> "AnyOf":
+        return AnyOf(conditions=[self, other])
+
+
+class RobotsTarget(Condition):
+    count: int
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return state.robots >= self.count
+
+
+class BalanceTarget(Condition):
+    balance: float
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return state.balance >= self.balance
+
+
+class FoobarsTarget(Condition):
+    count: int
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return state.foobars >= self.count
+
+
+class SimulatedTimeBudget(Condition):
+    seconds: float
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return state.time >= self.seconds
+
+    def get_simulated_deadlines(self) -> List[float]:
+        return [self.seconds]
+
+
+class WallTimeBudget(Condition):
+    seconds: float
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return wall_time >= self.seconds
+
+    def get_wall_deadlines(self) -> List[float]:
+        return [self.seconds]
+
+
+class AllOf(Condition):
+    conditions: List[Condition]
+
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return all(condition.is_met(state, wall_time) for condition in self.conditions)
+
+    def get_simulated_deadlines(self) -> List[float]:
+        return [deadline for condition in self.conditions for deadline in condition.get_simulated_deadlines()]
+
+    def get_wall_deadlines(self) -> List[float]:
+        return [deadline for condition in self.conditions for deadline in condition.get_wall_deadlines()]
+
+
+class AnyOf(AllOf):
+    def is_met(self, state: State, wall_time: float) -> bool:
+        return any(condition.is_met(state, wall_time) for condition in self.conditions)
+
+
+class Milestone(BaseModel):
+    """
+    A milestone condition has been met for the first time
+    """
+
+    name: str
+    time: float
+    wall_time: float
+
+
+class ConditionMonitor:
+    """
+    Evaluate the stop condition and the milestones each time it is notified of a change,
+    the milestones are reached only once and the monitor stays stopped once the stop condition is met
+    """
+
+    def __init__(
+        self,
+        stop_condition: Condition,
+        milestones: Optional[Dict[str, Condition]] = None,
+        milestone_listeners: Optional[List[Callable[[Milestone], None]]] = None,
+    ):
+        self.lock: Lock = Lock()
+        self.stop_condition: Condition = stop_condition
+        self.pending_milestones: Dict[str, Condition] = dict(milestones or {})
+        self.milestone_listeners: List[Callable[[Milestone], None]] = milestone_listeners or []
+        self.milestones: List[Milestone] = []
+        self.stopped: bool = False
+
+    def get_simulated_deadlines(self) -> List[float]:
+        """
+        Returns the simulated times at which the monitor has to be notified even without warehouse change
+        :return: sorted simulated times, in seconds
+        """
+        conditions: List[Condition] = [self.stop_condition, *self.pending_milestones.values()]
+        return sorted({deadline for condition in conditions for deadline in condition.get_simulated_deadlines()})
+
+    def get_wall_deadlines(self) -> List[float]:
+        """
+        Returns the wall times at which the monitor has to be notified even without warehouse change
+        :return: sorted wall times, in seconds
+        """
+        conditions: List[Condition] = [self.stop_condition, *self.pending_milestones.values()]
+        return sorted({deadline for condition in conditions for deadline in condition.get_wall_deadlines()})
+
+    def update(self, state: State, wall_time: float) -> bool:
+        """
+        Evaluate the conditions on the new state
+        :param state: current state
+        :param wall_time: wall time elapsed since the start, in seconds
+        :return: if the stop condition is met
+        """
+        with self.lock:
+            if self.stopped:
+                return True
+            if self.pending_milestones:
+                for name, condition in list(self.pending_milestones.items()):
+                    if condition.is_met(state, wall_time):
+                        del self.pending_milestones[name]
+                        milestone: Milestone = Milestone(name=name, time=state.time, wall_time=wall_time)
+                        self.milestones.append(milestone)
+                        for listener in self.milestone_listeners:
+                            listener(milestone)
+            self.stopped = self.stop_condition.is_met(state, wall_time)
+            return self.stopped
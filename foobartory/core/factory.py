@@ -1,16 +1,62 @@
 import time
-from threading import Thread, Event
+from threading import Thread, Event, Timer
+from typing import Callable, Dict, List, Optional
 
+from foobartory.core.conditions import Condition, ConditionMonitor, Milestone, RobotsTarget
+from foobartory.core.instrumented_lock import InstrumentedLock
+from foobartory.core.models.histogram import Histogram
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.robot.robot_stats import RobotStats
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.models.runtime_report import RuntimeReport
 from foobartory.core.models.warehouse import Warehouse
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.random_stream import RandomStream
+from foobartory.core.planner import get_planner
 from foobartory.core.robot import Robot
+from foobartory.core.shared_state import SharedStateWriter
 from foobartory.settings.settings import settings
 
 
+StateListener = Callable[[WarehouseState], None]
+
+
 class Factory:
-    def __init__(self):
+    def __init__(
+        self,
+        state_listeners: Optional[List[StateListener]] = None,
+        seed: Optional[int] = None,
+        stop_condition: Optional[Condition] = None,
+        milestones: Optional[Dict[str, Condition]] = None,
+        milestone_listeners: Optional[List[Callable[[Milestone], None]]] = None,
+        shared_state: Optional[SharedStateWriter] = None,
+        strategy: Optional[Strategy] = None,
+    ):
+        """
+        :param state_listeners: functions called with the state at every monitoring refresh
+        :param seed: random seed of the robots
+        :param stop_condition: condition stopping the factory, MAX_ROBOTS robots by default
+        :param milestones: conditions to report when they are met for the first time
+        :param milestone_listeners: functions called with the milestones reached
+        :param shared_state: shared memory block written after every warehouse change
+        :param strategy: strategy of the robots planner, the default rules if None
+        """
         super().__init__()
         self.warehouse: Warehouse = Warehouse()
+        self.random_stream: RandomStream = RandomStream(seed)
         self.stop_event: Event = Event()
+        self.finished_event: Event = Event()
+        self.state_listeners: List[StateListener] = state_listeners or []
+        self.stop_condition: Optional[Condition] = stop_condition
+        self.milestones: Dict[str, Condition] = milestones or {}
+        self.milestone_listeners: List[Callable[[Milestone], None]] = milestone_listeners or []
+        self.condition_monitor: Optional[ConditionMonitor] = None
+        self.started_at: float = time.perf_counter()
+        self.shared_state: Optional[SharedStateWriter] = shared_state
+        self.strategy: Optional[Strategy] = strategy
+        self.warehouse.subscribe(self.check_conditions)
+        if shared_state is not None:
+            self.warehouse.subscribe(self.write_shared_state)
         self.init_default_robots()
         self.monitoring_thread: Thread = Thread(target=self.print_state_monitoring, daemon=True)
 
@@ -21,9 +67,13 @@ class Factory:
         """
         for _ in range(settings.DEFAULT_ROBOTS):
             robot: Robot = Robot(
-                robot_id=len(self.warehouse.robots) + 1, warehouse=self.warehouse, stop_event=self.stop_event
+                robot_id=self.warehouse.robots.next_id(),
+                warehouse=self.warehouse,
+                stop_event=self.stop_event,
+                random_stream=self.random_stream.spawn(),
+                planner=get_planner(settings, self.strategy),
             )
-            self.warehouse.robots.append(robot)
+            self.warehouse.robots.add(robot)
             robot.start()
 
     def run(self) -> None:
@@ -31,11 +81,82 @@ class Factory:
         Manage the factory run
         :return:
         """
+        self.condition_monitor = ConditionMonitor(
+            self.stop_condition or RobotsTarget(count=settings.MAX_ROBOTS), self.milestones, self.milestone_listeners
+        )
+        self.start_deadline_timers()
         self.monitoring_thread.start()
-        while len(self.warehouse.robots) < settings.MAX_ROBOTS:
-            pass
+        self.check_conditions()
+        self.finished_event.wait()
         self.stop_event.set()
+        # The monitoring thread may be publishing a state, the listeners must not be called from two threads
+        if self.monitoring_thread.is_alive():
+            self.monitoring_thread.join()
         self.print_state()
+        self.publish_state()
+        self.write_shared_state()
+        self.print_runtime_report()
+
+    def check_conditions(self) -> None:
+        """
+        Evaluate the stop condition and the milestones, called after every warehouse change
+        :return:
+        """
+        if self.condition_monitor is not None and self.condition_monitor.update(
+            self.get_state(), time.perf_counter() - self.started_at
+        ):
+            self.finished_event.set()
+
+    def start_deadline_timers(self) -> None:
+        """
+        Start timers checking the conditions at their time budgets, when the warehouse may not change
+        :return:
+        """
+        elapsed: float = time.perf_counter() - self.started_at
+        delays: List[float] = [
+            *(deadline * settings.TIME_RATIO - elapsed for deadline in self.condition_monitor.get_simulated_deadlines()),
+            *(deadline - elapsed for deadline in self.condition_monitor.get_wall_deadlines()),
+        ]
+        for delay in delays:
+            timer: Timer = Timer(max(delay, 0), self.check_conditions)
+            timer.daemon = True
+            timer.start()
+
+    def get_state(self) -> WarehouseState:
+        """
+        Returns the current warehouse state
+        :return: warehouse state
+        """
+        return WarehouseState(
+            time=(time.perf_counter() - self.started_at) / settings.TIME_RATIO,
+            robots=len(self.warehouse.robots),
+            balance=self.warehouse.balance,
+            foos=len(self.warehouse.foos),
+            bars=len(self.warehouse.bars),
+            foobars=len(self.warehouse.foobars),
+        )
+
+    def publish_state(self) -> None:
+        """
+        Send the current state to the state listeners
+        :return:
+        """
+        if self.state_listeners:
+            state: WarehouseState = self.get_state()
+            for listener in self.state_listeners:
+                listener(state)
+
+    def write_shared_state(self) -> None:
+        """
+        Write the current state and the robots activities in the shared memory block
+        :return:
+        """
+        if self.shared_state is not None:
+            self.shared_state.write(
+                self.get_state(),
+                {activity: self.warehouse.robots.count_by_activity(activity) for activity in RobotActivity},
+                finished=self.stop_event.is_set(),
+            )
 
     def print_state(self) -> None:
         """
@@ -50,12 +171,49 @@ class Factory:
         print(f"bars: {len(self.warehouse.bars)}")
         print(f"finished: {self.stop_event.is_set()}")
 
+    def get_runtime_report(self) -> RuntimeReport:
+        """
+        Returns the instrumentation of the robots threads and of the warehouse lock
+        :return: runtime report
+        """
+        lock: InstrumentedLock = self.warehouse.lock
+        with lock:
+            report: RuntimeReport = RuntimeReport(
+                robots=len(self.warehouse.robots),
+                wall_time=time.perf_counter() - self.started_at,
+                lock_acquisitions=lock.acquisitions,
+                lock_contentions=lock.contentions,
+                lock_wait_times=lock.wait_times.copy(deep=True),
+                lock_hold_times=lock.hold_times.copy(deep=True),
+            )
+        for robot in self.warehouse.robots:
+            stats: RobotStats = robot.stats
+            report.waiting_time += stats.waiting_time
+            report.running_time += stats.running_time
+            report.cpu_time += stats.cpu_time
+            report.run_durations.merge(stats.run_durations)
+            report.wake_up_lateness.merge(stats.wake_up_lateness)
+            for robots, histogram in list(stats.wake_up_lateness_by_robots.items()):
+                if robots not in report.wake_up_lateness_by_robots:
+                    report.wake_up_lateness_by_robots[robots] = Histogram()
+                report.wake_up_lateness_by_robots[robots].merge(histogram)
+        return report
+
+    def print_runtime_report(self) -> None:
+        """
+        Print the runtime report
+        :return:
+        """
+        print("-" * 30)
+        print(self.get_runtime_report().format())
+
     def print_state_monitoring(self) -> None:
         """
-        Entrypoint of self.monitoring_thread, it prints the current state
+        Entrypoint of self.monitoring_thread, it prints and publishes the current state
         :return:
         """
         while not self.stop_event.is_set():
             self.print_state()
+            self.publish_state()
             time.sleep(settings.MONITORING_REFRESH_RATE * settings.TIME_RATIO)
 
@@ -0,0 +1,49 @@
+import time
+from threading import Lock
+
+from foobartory.core.models.histogram import Histogram
+
+
+class InstrumentedLock:
+    """
+    Lock measuring its contention: how often it was already held, how long the threads waited for it and how long
+    it was held. The measures are written while holding the lock, they need no other synchronisation.
+    """
+
+    def __init__(self):
+        self.lock: Lock = Lock()
+        self.acquisitions: int = 0
+        self.contentions: int = 0
+        self.wait_times: Histogram = Histogram()
+        self.hold_times: Histogram = Histogram()
+        self.acquired_at: float = 0
+
+    def acquire(self) -> None:
+        """
+        Acquire the lock, measuring the wait if it is already held
+        :return:
+        """
+        if self.lock.acquire(blocking=False):
+            self.acquired_at = time.perf_counter()
+        else:
+            started_at: float = time.perf_counter()
+            self.lock.acquire()
+            self.acquired_at = time.perf_counter()
+            self.contentions += 1
+            self.wait_times.record(self.acquired_at - started_at)
+        self.acquisitions += 1
+
+    def release(self) -> None:
+        """
+        Release the lock, recording how long it was held
+        :return:
+        """
+        self.hold_times.record(time.perf_counter() - self.acquired_at)
+        self.lock.release()
+
+    def __enter__(self) -> "InstrumentedLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
@@ -0,0 +1,90 @@
+import math
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+# Smallest bucket, values under 2**MIN_BUCKET seconds (about 1µs) are counted in it
+MIN_BUCKET: int = -20
+
+
+class Histogram(BaseModel):
+    """
+    Log2 histogram of durations in seconds: a value v lands in the bucket e such as 2**(e-1) <= v < 2**e
+    """
+
+    buckets: Dict[int, int] = {}
+    count: int = 0
+    total: float = 0
+    max: float = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def record(self, value: float) -> None:
+        """
+        Record a value
+        :param value: duration, in seconds
+        :return:
+        """
+        bucket: int = max(math.frexp(value)[1], MIN_BUCKET) if value > 0 else MIN_BUCKET
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Add the values of another histogram
+        :param other: histogram to add
+        :return:
+        """
+        for bucket, count in list(other.buckets.items()):
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns an upper bound of the q quantile, the upper bound of its bucket
+        :param q: quantile, between 0 and 1
+        :return: value, in seconds
+        """
+        if not self.count:
+            return 0
+        rank: float = q * self.count
+        seen: int = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2.0**bucket, self.max)
+        return self.max
+
+    def format(self, width: int = 40) -> List[str]:
+        """
+        Returns the histogram as text bars, one line per bucket
+        :param width: length of the longest bar
+        :return: lines
+        """
+        if not self.count:
+            return ["    (empty)"]
+        highest: int = max(self.buckets.values())
+        return [
+            f"    < {format_duration(2.0**bucket):>8} {'#' * max(round(width * count / highest), 1):<{width}} {count}"
+            for bucket, count in sorted(self.buckets.items())
+        ]
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Returns a duration with a readable unit
+    :param seconds: duration, in seconds
+    :return: formatted duration
+    """
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
@@ -0,0 +1,179 @@
+from typing import Dict, List, Set
+
+from pydantic import BaseModel, root_validator, validator
+
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.settings.settings import Settings
+
+MONEY: str = "money"
+ROBOT: str = "robot"
+
+
+class Recipe(BaseModel):
+    """
+    Activity turning inputs into outputs.
+
+    A recipe can run on up to batch_max batches of its inputs at once, it needs at least batch_min batches to start,
+    or more than batch_min batches when batch_min_exclusive is set.
+    Each batch gives the outputs and sale_value money. On failure, the failure_outputs are given back instead.
+    """
+
+    name: str
+    inputs: Dict[str, float] = {}
+    outputs: Dict[str, int] = {}
+    duration_min: float = 0
+    duration_max: float = 0
+    success_rate: float = 100
+    failure_outputs: Dict[str, int] = {}
+    sale_value: float = 0
+    batch_min: int = 1
+    batch_max: int = 1
+    batch_min_exclusive: bool = False
+
+    @root_validator
+    def validate_values(cls, values):
+        """
+        Verify the values validity
+        :param values: values
+        :return: values
+        """
+        if values.get("duration_min", 0) > values.get("duration_max", 0):
+            raise ValueError("duration_min has to be lower than duration_max")
+        if not 1 <= values.get("batch_min", 1) <= values.get("batch_max", 1):
+            raise ValueError("batch_min has to be positive and lower than batch_max")
+        if MONEY in values.get("outputs", {}):
+            raise ValueError(f"{MONEY} can only be produced with sale_value")
+        if ROBOT in values.get("inputs", {}):
+            raise ValueError(f"{ROBOT} can not be an input")
+        return values
+
+    @property
+    def is_raw(self) -> bool:
+        return not self.inputs
+
+
+class RecipeBook(BaseModel):
+    """
+    Production graph, it has to be acyclic and to contain one recipe producing robots, the goal of the factory
+    """
+
+    recipes: List[Recipe]
+
+    @validator("recipes")
+    def validate_recipes(cls, recipes: List[Recipe]) -> List[Recipe]:
+        """
+        Verify the recipes form a valid production graph
+        :param recipes: recipes
+        :return: recipes
+        """
+        if len({recipe.name for recipe in recipes}) != len(recipes):
+            raise ValueError("recipes names have to be unique")
+        if len([recipe for recipe in recipes if ROBOT in recipe.outputs]) != 1:
+            raise ValueError(f"exactly one recipe has to produce {ROBOT}")
+        produced: Set[str] = {resource for recipe in recipes for resource in cls.get_produced_resources(recipe)}
+        for recipe in recipes:
+            missing: Set[str] = set(recipe.inputs) - produced
+            if missing:
+                raise ValueError(f"{recipe.name}: no recipe produces {', '.join(sorted(missing))}")
+        cls.validate_acyclic(recipes)
+        return recipes
+
+    @classmethod
+    def validate_acyclic(cls, recipes: List[Recipe]) -> None:
+        """
+        Verify no resource is needed, even indirectly, to produce itself
+        :param recipes: recipes
+        :return:
+        """
+        edges: Dict[str, Set[str]] = {}
+        for recipe in recipes:
+            for resource in recipe.inputs:
+                edges.setdefault(resource, set()).update(cls.get_produced_resources(recipe))
+        visiting: Set[str] = set()
+        visited: Set[str] = set()
+
+        def visit(resource: str) -> None:
+            if resource in visiting:
+                raise ValueError(f"the recipes are cyclic, {resource} is needed to produce itself")
+            if resource not in visited:
+                visiting.add(resource)
+                for next_resource in edges.get(resource, ()):
+                    visit(next_resource)
+                visiting.remove(resource)
+                visited.add(resource)
+
+        for resource in list(edges):
+            visit(resource)
+
+    @staticmethod
+    def get_produced_resources(recipe: Recipe) -> Set[str]:
+        """
+        Returns the resources a recipe produces
+        :param recipe: recipe
+        :return: resources
+        """
+        return set(recipe.outputs) | ({MONEY} if recipe.sale_value else set())
+
+    @property
+    def goal(self) -> Recipe:
+        return next(recipe for recipe in self.recipes if ROBOT in recipe.outputs)
+
+    def get_resources(self) -> List[str]:
+        """
+        Returns the resources kept in stock, in order of appearance
+        :return: resources
+        """
+        resources: Dict[str, None] = {}
+        for recipe in self.recipes:
+            for resource in [*recipe.inputs, *self.get_produced_resources(recipe), *recipe.failure_outputs]:
+                if resource != ROBOT:
+                    resources[resource] = None
+        return list(resources)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RecipeBook":
+        """
+        Returns the foobar recipes, the ones the Robot follows
+        :param settings: settings
+        :return: recipe book
+        """
+        return cls(
+            recipes=[
+                Recipe(
+                    name=RobotActivity.MINING_FOO.value,
+                    outputs={"foo": 1},
+                    duration_min=settings.ROBOT_MINING_FOO_DURATION,
+                    duration_max=settings.ROBOT_MINING_FOO_DURATION,
+                ),
+                Recipe(
+                    name=RobotActivity.MINING_BAR.value,
+                    outputs={"bar": 1},
+                    duration_min=settings.ROBOT_MINING_BAR_DURATION_MIN,
+                    duration_max=settings.ROBOT_MINING_BAR_DURATION_MAX,
+                ),
+                Recipe(
+                    name=RobotActivity.ASSEMBLING_FOOBAR.value,
+                    inputs={"foo": 1, "bar": 1},
+                    outputs={"foobar": 1},
+                    duration_min=settings.ROBOT_ASSEMBLING_FOOBAR_DURATION,
+                    duration_max=settings.ROBOT_ASSEMBLING_FOOBAR_DURATION,
+                    success_rate=settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE,
+                    failure_outputs={"bar": 1},
+                ),
+                Recipe(
+                    name=RobotActivity.SELLING_FOOBARS.value,
+                    inputs={"foobar": 1},
+                    duration_min=settings.ROBOT_SELLING_FOOBARS_DURATION,
+                    duration_max=settings.ROBOT_SELLING_FOOBARS_DURATION,
+                    sale_value=settings.FOOBAR_VALUE,
+                    batch_min=settings.ROBOT_SELLING_FOOBARS_MIN,
+                    batch_max=settings.ROBOT_SELLING_FOOBARS_MAX,
+                    batch_min_exclusive=True,
+                ),
+                Recipe(
+                    name=RobotActivity.BUYING_ROBOT.value,
+                    inputs={MONEY: settings.ROBOT_COST, "foo": settings.ROBOT_FOO_COST},
+                    outputs={ROBOT: 1},
+                ),
+            ]
+        )
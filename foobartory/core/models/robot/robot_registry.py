@@ -0,0 +1,79 @@
+import itertools
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+
+if TYPE_CHECKING:
+    from foobartory.core.robot import Robot
+
+
+class RobotRegistry:
+    """
+    Thread safe registry of the factory robots, indexed by id and by current activity
+    """
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._ids: Iterator[int] = itertools.count(1)
+        self._robots: Dict[int, "Robot"] = {}
+        self._robots_by_activity: Dict[RobotActivity, Dict[int, "Robot"]] = {activity: {} for activity in RobotActivity}
+
+    def __len__(self) -> int:
+        return len(self._robots)
+
+    def __iter__(self) -> Iterator["Robot"]:
+        with self._lock:
+            return iter(list(self._robots.values()))
+
+    def __contains__(self, robot_id: int) -> bool:
+        return robot_id in self._robots
+
+    def next_id(self) -> int:
+        """
+        Returns a new unique robot id
+        :return: robot id
+        """
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, robot: "Robot") -> None:
+        """
+        Register a robot, it must have been created with an id returned by next_id
+        :param robot: robot to register
+        :return:
+        """
+        with self._lock:
+            if robot.id in self._robots:
+                raise ValueError(f"robot {robot.id} is already registered")
+            self._robots[robot.id] = robot
+            self._robots_by_activity[robot.activity][robot.id] = robot
+
+    def get(self, robot_id: int) -> Optional["Robot"]:
+        """
+        Returns the robot registered with this id
+        :param robot_id: robot id
+        :return: the robot or None
+        """
+        return self._robots.get(robot_id)
+
+    def update_activity(self, robot: "Robot", activity: RobotActivity) -> None:
+        """
+        Change the robot activity and keep the activity index up to date
+        :param robot: robot changing its activity
+        :param activity: new activity
+        :return:
+        """
+        with self._lock:
+            if robot.id in self._robots:
+                del self._robots_by_activity[robot.activity][robot.id]
+                self._robots_by_activity[activity][robot.id] = robot
+            robot.activity = activity
+
+    def count_by_activity(self, activity: RobotActivity) -> int:
+        """
+        Returns the number of robots doing an activity
+        :param activity: activity
+        :return: number of robots
+        """
+        return len(self._robots_by_activity[activity])
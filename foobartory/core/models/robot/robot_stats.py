@@ -0,0 +1,69 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+from foobartory.core.models.histogram import Histogram
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+
+
+class RobotStats(BaseModel):
+    """
+    Counters of a single robot, only written by the robot owning them
+    """
+
+    items_produced: int = 0
+    moves: int = 0
+    moving_duration: float = 0
+    activity_durations: Dict[RobotActivity, float] = {}
+    activity_counts: Dict[RobotActivity, int] = {}
+    waiting_time: float = 0
+    running_time: float = 0
+    cpu_time: float = 0
+    run_durations: Histogram = Histogram()
+    wake_up_lateness: Histogram = Histogram()
+    wake_up_lateness_by_robots: Dict[int, Histogram] = {}
+
+    def record_activity(self, activity: RobotActivity, duration: float, items_produced: int = 0) -> None:
+        """
+        Record a finished activity
+        :param activity: the activity done
+        :param duration: activity duration, in simulated seconds
+        :param items_produced: number of items produced by the activity
+        :return:
+        """
+        self.activity_durations[activity] = self.activity_durations.get(activity, 0) + duration
+        self.activity_counts[activity] = self.activity_counts.get(activity, 0) + 1
+        self.items_produced += items_produced
+
+    def record_move(self, duration: float) -> None:
+        """
+        Record a move between two activities
+        :param duration: moving duration, in simulated seconds
+        :return:
+        """
+        self.moves += 1
+        self.moving_duration += duration
+
+    def record_run(self, duration: float) -> None:
+        """
+        Record the time the robot ran between two waits
+        :param duration: running duration, in wall seconds
+        :return:
+        """
+        self.running_time += duration
+        self.run_durations.record(duration)
+
+    def record_wait(self, requested: float, duration: float, robots: int) -> None:
+        """
+        Record a wait and how late the robot woke up
+        :param requested: requested sleep, in wall seconds
+        :param duration: actual sleep, in wall seconds
+        :param robots: number of robots at wake up
+        :return:
+        """
+        lateness: float = max(duration - requested, 0)
+        self.waiting_time += duration
+        self.wake_up_lateness.record(lateness)
+        if robots not in self.wake_up_lateness_by_robots:
+            self.wake_up_lateness_by_robots[robots] = Histogram()
+        self.wake_up_lateness_by_robots[robots].record(lateness)
@@ -0,0 +1,64 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from foobartory.core.models.histogram import Histogram, format_duration
+
+
+class RuntimeReport(BaseModel):
+    """
+    Where the time of the robots threads went during a factory run, in wall seconds
+    """
+
+    robots: int
+    wall_time: float
+    waiting_time: float = 0
+    running_time: float = 0
+    cpu_time: float = 0
+    run_durations: Histogram = Histogram()
+    wake_up_lateness: Histogram = Histogram()
+    wake_up_lateness_by_robots: Dict[int, Histogram] = {}
+    lock_acquisitions: int = 0
+    lock_contentions: int = 0
+    lock_wait_times: Histogram = Histogram()
+    lock_hold_times: Histogram = Histogram()
+
+    @property
+    def waiting_ratio(self) -> float:
+        total: float = self.waiting_time + self.running_time
+        return self.waiting_time / total if total else 0
+
+    @property
+    def contention_ratio(self) -> float:
+        return self.lock_contentions / self.lock_acquisitions if self.lock_acquisitions else 0
+
+    def format(self) -> str:
+        """
+        Returns the report as text
+        :return: report
+        """
+        lines: List[str] = [
+            f"robots: {self.robots}, wall time: {format_duration(self.wall_time)}",
+            f"robots waiting: {format_duration(self.waiting_time)} ({self.waiting_ratio:.1%}), "
+            f"running: {format_duration(self.running_time)}, on cpu: {format_duration(self.cpu_time)}",
+            f"  runnable but off cpu (GIL and scheduler): {format_duration(max(self.running_time - self.cpu_time, 0))}",
+            "run durations between two waits:",
+            *self.run_durations.format(),
+            f"wake up lateness: mean {format_duration(self.wake_up_lateness.mean)}, "
+            f"p99 < {format_duration(self.wake_up_lateness.quantile(0.99))}, "
+            f"max {format_duration(self.wake_up_lateness.max)}",
+            *self.wake_up_lateness.format(),
+            "wake up lateness by number of robots:",
+            *(
+                f"    {robots:>4} robots: mean {format_duration(histogram.mean):>8}, "
+                f"p99 < {format_duration(histogram.quantile(0.99)):>8}"
+                for robots, histogram in sorted(self.wake_up_lateness_by_robots.items())
+            ),
+            f"warehouse lock: {self.lock_acquisitions} acquisitions, {self.lock_contentions} contended "
+            f"({self.contention_ratio:.1%})",
+            "warehouse lock waits:",
+            *self.lock_wait_times.format(),
+            "warehouse lock holds:",
+            *self.lock_hold_times.format(),
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,40 @@
+from typing import Dict, Union
+
+from pydantic import BaseModel
+
+PARAMETER_FIELDS = ("batch_min", "reserves", "targets")
+
+
+class Strategy(BaseModel):
+    """
+    Tuning of the planner rules, the empty strategy gives the default rules:
+        - batch_min: batches a recipe waits for before starting, by recipe name
+        - reserves: stock the conversions leave untouched, by resource
+        - targets: stock of a raw resource to reach before mining the others, by resource
+    """
+
+    batch_min: Dict[str, int] = {}
+    reserves: Dict[str, float] = {}
+    targets: Dict[str, float] = {}
+
+    @classmethod
+    def from_parameters(cls, parameters: Dict[str, Union[int, float]]) -> "Strategy":
+        """
+        Returns the strategy of flat parameters named "<field>.<key>", such as "reserves.foo"
+        :param parameters: parameters values
+        :return: strategy
+        """
+        values: Dict[str, Dict[str, Union[int, float]]] = {field: {} for field in PARAMETER_FIELDS}
+        for name, value in parameters.items():
+            field, _, key = name.partition(".")
+            if field not in values or not key:
+                raise ValueError(f"{name}: unknown strategy parameter")
+            values[field][key] = value
+        return cls(**values)
+
+    def get_parameters(self) -> Dict[str, Union[int, float]]:
+        """
+        Returns the strategy as flat parameters
+        :return: parameters values
+        """
+        return {f"{field}.{key}": value for field in PARAMETER_FIELDS for key, value in getattr(self, field).items()}
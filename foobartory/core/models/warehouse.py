@@ -1,13 +1,12 @@
-from typing import TYPE_CHECKING, List
+from typing import Callable, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
+from foobartory.core.instrumented_lock import InstrumentedLock
 from foobartory.core.models.items.bar import Bar
 from foobartory.core.models.items.foo import Foo
 from foobartory.core.models.items.foobar import FooBar
-
-if TYPE_CHECKING:
-    from foobartory.core.robot import Robot
+from foobartory.core.models.robot.robot_registry import RobotRegistry
 
 
 class Warehouse(BaseModel):
@@ -15,7 +14,28 @@ class Warehouse(BaseModel):
     Object containing all the datas that has to be shared between the Factory and the Robots
     """
     balance: float = 0
-    robots: List["Robot"] = []
+    robots: RobotRegistry = Field(default_factory=RobotRegistry)
     bars: List[Bar] = []
     foos: List[Foo] = []
     foobars: List[FooBar] = []
+    lock: InstrumentedLock = Field(default_factory=InstrumentedLock)
+    _observers: List[Callable[[], None]] = PrivateAttr(default_factory=list)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def subscribe(self, observer: Callable[[], None]) -> None:
+        """
+        Register a function called after every change of the warehouse
+        :param observer: function to call
+        :return:
+        """
+        self._observers.append(observer)
+
+    def notify_change(self) -> None:
+        """
+        Notify the observers that the warehouse changed
+        :return:
+        """
+        for observer in self._observers:
+            observer()
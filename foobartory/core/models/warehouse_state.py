@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class WarehouseState(BaseModel):
+    """
+    Snapshot of the warehouse counters at a given simulated time
+    """
+
+    time: float
+    robots: int
+    balance: float
+    foos: int
+    bars: int
+    foobars: int
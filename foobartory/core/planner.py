@@ -0,0 +1,272 @@
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import product
+from operator import mul
+from typing import Dict, List, Optional, Sequence, Set
+
+from foobartory.core.models.recipe import MONEY, Recipe, RecipeBook
+from foobartory.core.models.strategy import Strategy
+from foobartory.settings.settings import Settings, settings as default_settings
+
+# Above this number of stock buckets, the dispatch table is filled lazily instead of at compile time
+MAX_PRECOMPUTED_TABLE_SIZE: int = 65536
+
+
+class Planner:
+    """
+    Chooses the next recipe to run from the stock levels.
+
+    Every rule of the planner compares a stock level with a recipe quantity, so the stock levels can be bucketed by
+    these quantities: every stock in a bucket gets the same decision. The decisions are compiled into a table indexed
+    by the buckets, choosing a recipe is then a few bisects and a list lookup whatever the size of the recipe book.
+    """
+
+    def __init__(self, recipe_book: RecipeBook, strategy: Optional[Strategy] = None):
+        self.recipe_book: RecipeBook = recipe_book
+        self.strategy: Strategy = strategy or Strategy()
+        self.recipes: List[Recipe] = recipe_book.recipes
+        self.recipe_indexes: Dict[str, int] = {recipe.name: index for index, recipe in enumerate(self.recipes)}
+        self.resources: List[str] = recipe_book.get_resources()
+        self.resource_indexes: Dict[str, int] = {resource: index for index, resource in enumerate(self.resources)}
+        self.goal: Recipe = recipe_book.goal
+        self.producers: Dict[str, Recipe] = {}
+        for recipe in self.recipes:
+            for resource in RecipeBook.get_produced_resources(recipe):
+                self.producers.setdefault(resource, recipe)
+        self.validate_strategy()
+        self.targets: Dict[str, float] = {
+            resource: quantity for resource, quantity in self.goal.inputs.items() if self.producers[resource].is_raw
+        }
+        self.targets.update(self.strategy.targets)
+        self.distances: Dict[str, int] = self.get_distances()
+        self.conversions: List[Recipe] = sorted(
+            (recipe for recipe in self.recipes if not recipe.is_raw and recipe is not self.goal),
+            key=lambda recipe: self.distances.get(recipe.name, len(self.recipes)),
+        )
+        self.needs: Dict[str, float] = self.get_raw_needs()
+        self.thresholds: List[List[float]] = self.get_thresholds()
+        self.strides: List[int] = []
+        size: int = 1
+        for thresholds in reversed(self.thresholds):
+            self.strides.insert(0, size)
+            size *= len(thresholds) + 1
+        self.size: int = size
+        # Recipe indexes by bucket index, a dict so that the table of a lazily filled large graph stays sparse
+        self.table: Dict[int, int] = {}
+        if size <= MAX_PRECOMPUTED_TABLE_SIZE:
+            for buckets in product(*(range(len(thresholds) + 1) for thresholds in self.thresholds)):
+                stock: List[float] = [
+                    thresholds[bucket - 1] if bucket else 0 for thresholds, bucket in zip(self.thresholds, buckets)
+                ]
+                self.table[sum(map(mul, buckets, self.strides))] = self.recipe_indexes[self.decide(stock).name]
+
+    def validate_strategy(self) -> None:
+        """
+        Verify the strategy applies to the recipes
+        :return:
+        """
+        recipes: Dict[str, Recipe] = {recipe.name: recipe for recipe in self.recipes}
+        for name, batch_min in self.strategy.batch_min.items():
+            if name not in recipes:
+                raise ValueError(f"{name}: unknown recipe")
+            if not 1 <= batch_min <= recipes[name].batch_max:
+                raise ValueError(f"{name}: batch_min has to be between 1 and {recipes[name].batch_max}")
+        for resource in [*self.strategy.reserves, *self.strategy.targets]:
+            if resource not in self.resource_indexes:
+                raise ValueError(f"{resource}: unknown resource")
+        for resource in self.strategy.targets:
+            if not self.producers[resource].is_raw:
+                raise ValueError(f"{resource}: targets only apply to raw resources")
+
+    def get_distances(self) -> Dict[str, int]:
+        """
+        Returns the number of recipes between each recipe and the goal
+        :return: distances by recipe name
+        """
+        distances: Dict[str, int] = {self.goal.name: 0}
+        frontier: List[Recipe] = [self.goal]
+        while frontier:
+            next_frontier: List[Recipe] = []
+            for consumer in frontier:
+                for recipe in self.recipes:
+                    if recipe.name not in distances and RecipeBook.get_produced_resources(recipe) & set(
+                        consumer.inputs
+                    ):
+                        distances[recipe.name] = distances[consumer.name] + 1
+                        next_frontier.append(recipe)
+            frontier = next_frontier
+        return distances
+
+    def get_raw_needs(self) -> Dict[str, float]:
+        """
+        Returns the expected amount of each raw resource consumed by the conversions to build the goal, taking the
+        success rates and the failure outputs into account. The goal inputs themselves are not counted.
+        :return: needs by raw resource
+        """
+        needs: Dict[str, float] = {}
+
+        def expand(resource: str, amount: float, visited: Set[str]) -> None:
+            producer: Optional[Recipe] = self.producers.get(resource)
+            if producer is None or producer.is_raw or producer.name in visited:
+                if producer is not None and producer.is_raw:
+                    needs[resource] = needs.get(resource, 0) + amount
+                return
+            produced: float = producer.sale_value if resource == MONEY else producer.outputs[resource]
+            runs: float = amount / (produced * producer.success_rate / 100)
+            for input_resource, quantity in producer.inputs.items():
+                refund: float = (1 - producer.success_rate / 100) * producer.failure_outputs.get(input_resource, 0)
+                expand(input_resource, runs * (quantity - refund), visited | {producer.name})
+
+        for resource, quantity in self.goal.inputs.items():
+            producer: Optional[Recipe] = self.producers.get(resource)
+            if producer is not None and not producer.is_raw:
+                expand(resource, quantity, set())
+        return needs
+
+    def get_thresholds(self) -> List[List[float]]:
+        """
+        Returns, for each resource, the sorted stock levels the decisions can change at
+        :return: thresholds by resource index
+        """
+        thresholds: List[Set[float]] = [set() for _ in self.resources]
+        for recipe in self.recipes:
+            for resource in recipe.inputs:
+                thresholds[self.resource_indexes[resource]].add(self.get_required(recipe, resource))
+        for resource, target in self.targets.items():
+            thresholds[self.resource_indexes[resource]].add(target)
+        return [sorted(levels) for levels in thresholds]
+
+    def get_required(self, recipe: Recipe, resource: str) -> float:
+        """
+        Returns the stock of a resource a recipe needs to start, with the strategy batch size and reserve
+        :param recipe: recipe
+        :param resource: input resource
+        :return: stock level
+        """
+        if recipe is self.goal:
+            return recipe.inputs[resource]
+        batch_min: int = self.strategy.batch_min.get(recipe.name, recipe.batch_min + recipe.batch_min_exclusive)
+        return recipe.inputs[resource] * batch_min + self.strategy.reserves.get(resource, 0)
+
+    def get_stock_level(self, stock: Sequence[float], resource: str) -> float:
+        return stock[self.resource_indexes[resource]]
+
+    def can_run(self, recipe: Recipe, stock: Sequence[float]) -> bool:
+        """
+        If there is enough stock to start a recipe
+        :param recipe: recipe
+        :param stock: stock levels by resource index
+        :return: bool
+        """
+        return all(
+            self.get_stock_level(stock, resource) >= self.get_required(recipe, resource) for resource in recipe.inputs
+        )
+
+    def supply(self, resource: str, stock: Sequence[float]) -> Recipe:
+        """
+        Returns the recipe to run to get a resource, or to get the missing inputs of its producer
+        :param resource: needed resource
+        :param stock: stock levels by resource index
+        :return: recipe
+        """
+        producer: Recipe = self.producers[resource]
+        for input_resource in producer.inputs:
+            if self.get_stock_level(stock, input_resource) < self.get_required(producer, input_resource):
+                return self.supply(input_resource, stock)
+        return producer
+
+    def decide(self, stock: Sequence[float]) -> Recipe:
+        """
+        Choose the next recipe, in order:
+            - run the goal if possible
+            - if the goal money is available, supply its other inputs
+            - run the conversion closest to the goal
+            - reach the raw resources targets, the goal raw inputs by default
+            - produce the raw resource missing to the conversions, the most needed first
+        :param stock: stock levels by resource index
+        :return: recipe
+        """
+        if self.can_run(self.goal, stock):
+            return self.goal
+        if MONEY not in self.goal.inputs or self.get_stock_level(stock, MONEY) >= self.goal.inputs[MONEY]:
+            for resource, quantity in self.goal.inputs.items():
+                if resource != MONEY and self.get_stock_level(stock, resource) < quantity:
+                    return self.supply(resource, stock)
+        for recipe in self.conversions:
+            if self.can_run(recipe, stock):
+                return recipe
+        for resource, target in self.targets.items():
+            if self.get_stock_level(stock, resource) < target:
+                return self.producers[resource]
+        missing: List[str] = [
+            resource
+            for recipe in self.conversions
+            for resource in recipe.inputs
+            if self.producers[resource].is_raw
+            and self.get_stock_level(stock, resource) < self.get_required(recipe, resource)
+        ]
+        raw_resources: List[str] = missing or [
+            resource for resource in self.resources if self.producers[resource].is_raw
+        ]
+        return self.producers[max(raw_resources, key=lambda resource: self.needs.get(resource, 0))]
+
+    def plan(self, stock: Sequence[float]) -> int:
+        """
+        Returns the index of the next recipe to run, from the dispatch table
+        :param stock: stock levels by resource index
+        :return: recipe index
+        """
+        index: int = sum(map(mul, map(bisect_right, self.thresholds, stock), self.strides))
+        recipe_index: Optional[int] = self.table.get(index)
+        if recipe_index is None:
+            recipe_index = self.table[index] = self.recipe_indexes[self.decide(stock).name]
+        return recipe_index
+
+    def plan_recipe(self, stock: Dict[str, float]) -> Recipe:
+        """
+        Returns the next recipe to run
+        :param stock: stock levels by resource name
+        :return: recipe
+        """
+        return self.recipes[self.plan([stock.get(resource, 0) for resource in self.resources])]
+
+    def can_start(self, name: str, stock: Dict[str, float]) -> bool:
+        """
+        If there is still enough stock to start a recipe
+        :param name: recipe name
+        :param stock: stock levels by resource name
+        :return: bool
+        """
+        return self.can_run(
+            self.recipes[self.recipe_indexes[name]], [stock.get(resource, 0) for resource in self.resources]
+        )
+
+
+# Compiled planners kept, a search over strategies compiles one per candidate
+MAX_CACHED_PLANNERS: int = 64
+
+
+@lru_cache(maxsize=MAX_CACHED_PLANNERS)
+def compile_planner(settings_json: str, strategy_json: Optional[str]) -> Planner:
+    """
+    Compile the planner of the foobar recipes
+    :param settings_json: settings as json, already validated
+    :param strategy_json: planner strategy as json, the default rules if None
+    :return: planner
+    """
+    return Planner(
+        RecipeBook.from_settings(Settings.construct(**json.loads(settings_json))),
+        Strategy.parse_raw(strategy_json) if strategy_json is not None else None,
+    )
+
+
+def get_planner(settings: Settings = default_settings, strategy: Optional[Strategy] = None) -> Planner:
+    """
+    Returns the planner of the foobar recipes, compiled once per settings and strategy while it is among the
+    MAX_CACHED_PLANNERS last used ones
+    :param settings: settings
+    :param strategy: planner strategy, the default rules if None
+    :return: planner
+    """
+    return compile_planner(settings.json(), strategy.json() if strategy else None)
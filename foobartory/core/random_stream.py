@@ -0,0 +1,60 @@
+import itertools
+import random
+from array import array
+from typing import Iterator, Optional
+
+
+class RandomStream:
+    """
+    Random generator drawing its values by blocks.
+
+    Each block is drawn at once in an array and the draws are served by an iterator, so a draw only costs
+    a next() call. The blocks use the same algorithms as random.uniform and random.randrange, the distributions
+    do not change. Each robot or simulation owns its stream, nothing is shared between threads.
+    """
+
+    def __init__(self, seed: Optional[int] = None, block_size: int = 1024):
+        if block_size < 1:
+            raise ValueError("block_size has to be positive")
+        self.generator: random.Random = random.Random(seed)
+        self.block_size: int = block_size
+
+    def spawn(self) -> "RandomStream":
+        """
+        Returns a new stream seeded from this one
+        :return: random stream
+        """
+        return RandomStream(seed=self.generator.getrandbits(64), block_size=self.block_size)
+
+    def uniform(self, low: float, high: float) -> Iterator[float]:
+        """
+        Endless draws following random.uniform(low, high)
+        :param low: lower bound
+        :param high: higher bound
+        :return: draws iterator
+        """
+        span: float = high - low
+        draw = self.generator.random
+        block_size: int = self.block_size
+
+        def draw_block() -> array:
+            return array("d", [low + span * draw() for _ in itertools.repeat(None, block_size)])
+
+        return itertools.chain.from_iterable(iter(draw_block, None))
+
+    def randrange(self, stop: int) -> Iterator[int]:
+        """
+        Endless draws following random.randrange(stop), values out of range are rejected like randrange does
+        :param stop: exclusive upper bound
+        :return: draws iterator
+        """
+        if stop < 1:
+            raise ValueError("stop has to be positive")
+        bits: int = stop.bit_length()
+        getrandbits = self.generator.getrandbits
+        block_size: int = self.block_size
+
+        def draw_block() -> array:
+            return array("q", [value for value in map(getrandbits, itertools.repeat(bits, block_size)) if value < stop])
+
+        return itertools.chain.from_iterable(iter(draw_block, None))
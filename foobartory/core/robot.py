@@ -1,12 +1,15 @@
-import random
 import time
 from threading import Thread, Event
-from typing import List, TYPE_CHECKING
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
 
 from foobartory.core.models.items.bar import Bar
 from foobartory.core.models.items.foo import Foo
 from foobartory.core.models.items.foobar import FooBar
+from foobartory.core.models.recipe import MONEY
 from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.robot.robot_stats import RobotStats
+from foobartory.core.planner import Planner, get_planner
+from foobartory.core.random_stream import RandomStream
 from foobartory.settings.settings import settings
 
 if TYPE_CHECKING:
@@ -14,19 +17,37 @@ if TYPE_CHECKING:
 
 
 class Robot(Thread):
-    def __init__(self, robot_id: int, warehouse: "Warehouse", stop_event: Event):
+    def __init__(
+        self,
+        robot_id: int,
+        warehouse: "Warehouse",
+        stop_event: Event,
+        random_stream: Optional[RandomStream] = None,
+        planner: Optional[Planner] = None,
+    ):
         super().__init__()
         self.daemon = True
         self.id: int = robot_id
         self.warehouse: "Warehouse" = warehouse
         self.stop_event: Event = stop_event
         self.activity: RobotActivity = RobotActivity.MINING_FOO
+        self.stats: RobotStats = RobotStats()
+        self.random_stream: RandomStream = random_stream or RandomStream()
+        self.mining_bar_durations: Iterator[float] = self.random_stream.uniform(
+            settings.ROBOT_MINING_BAR_DURATION_MIN, settings.ROBOT_MINING_BAR_DURATION_MAX
+        )
+        self.assembling_draws: Iterator[int] = self.random_stream.randrange(100)
+        self.planner: Planner = planner or get_planner(settings)
+        self.woke_at: float = time.perf_counter()
+        self.cpu_started_at: Optional[float] = None
 
     def run(self) -> None:
         """
         Robot thread robot entrypoint
         :return:
         """
+        self.woke_at = time.perf_counter()
+        self.cpu_started_at = time.thread_time()
         while not self.stop_event.is_set():
             self.execute_next_activity()
 
@@ -43,28 +64,46 @@ class Robot(Thread):
         if (
             next_activity == self.get_next_activity()
         ):  # Check again to be sure that the activity is still valid after the movement duration
-            self.activity = next_activity
+            self.warehouse.robots.update_activity(self, next_activity)
             self.execute_activity()
         else:
             self.execute_next_activity()
 
     def get_next_activity(self) -> RobotActivity:
         """
-        Returns the robot next action
+        Returns the robot next action, chosen by the planner of the foobar recipes
         :return: robot next action
         """
-        if self.can_buy_robot():
-            return RobotActivity.BUYING_ROBOT
-        elif self.has_enough_balance_to_buy_robot():
-            return RobotActivity.MINING_FOO
-        elif self.can_sell_foobars():
-            return RobotActivity.SELLING_FOOBARS
-        elif self.can_assemble_foobar():
-            return RobotActivity.ASSEMBLING_FOOBAR
-        elif not self.has_enough_foo_to_buy_robot():
-            return RobotActivity.MINING_FOO
-        else:
-            return RobotActivity.MINING_BAR
+        return RobotActivity(self.planner.plan_recipe(self.get_stock()).name)
+
+    def get_stock(self) -> Dict[str, float]:
+        """
+        Returns the warehouse stock levels by resource
+        :return: stock levels
+        """
+        with self.warehouse.lock:
+            return self.read_stock()
+
+    def read_stock(self) -> Dict[str, float]:
+        """
+        Returns the warehouse stock levels by resource, the warehouse lock has to be held
+        :return: stock levels
+        """
+        return {
+            MONEY: self.warehouse.balance,
+            "foo": len(self.warehouse.foos),
+            "bar": len(self.warehouse.bars),
+            "foobar": len(self.warehouse.foobars),
+        }
+
+    def can_start(self, activity: RobotActivity) -> bool:
+        """
+        If the warehouse still holds the inputs of an activity, the warehouse lock has to be held: other robots can take
+        them between the planning and the start of the activity
+        :param activity: activity
+        :return: bool
+        """
+        return self.planner.can_start(activity.value, self.read_stock())
 
     def execute_activity(self) -> None:
         """
@@ -88,7 +127,14 @@ class Robot(Thread):
         :param seconds: time to wait
         :return:
         """
-        time.sleep(seconds * settings.TIME_RATIO)
+        requested: float = seconds * settings.TIME_RATIO
+        started_at: float = time.perf_counter()
+        self.stats.record_run(started_at - self.woke_at)
+        if self.cpu_started_at is not None:
+            self.stats.cpu_time = time.thread_time() - self.cpu_started_at
+        time.sleep(requested)
+        self.woke_at = time.perf_counter()
+        self.stats.record_wait(requested, self.woke_at - started_at, len(self.warehouse.robots))
 
     def move(self) -> None:
         """
@@ -96,6 +142,7 @@ class Robot(Thread):
         :return:
         """
         self.wait(settings.ROBOT_MOVING_DURATION)
+        self.stats.record_move(settings.ROBOT_MOVING_DURATION)
 
     def mine_foo(self) -> None:
         """
@@ -103,43 +150,52 @@ class Robot(Thread):
         :return:
         """
         self.wait(settings.ROBOT_MINING_FOO_DURATION)
-        self.warehouse.foos.append(Foo())
+        with self.warehouse.lock:
+            self.warehouse.foos.append(Foo())
+        self.warehouse.notify_change()
+        self.stats.record_activity(RobotActivity.MINING_FOO, settings.ROBOT_MINING_FOO_DURATION, items_produced=1)
 
     def mine_bar(self) -> None:
         """
         Mine bar
         :return:
         """
-        self.wait(random.uniform(settings.ROBOT_MINING_BAR_DURATION_MIN, settings.ROBOT_MINING_BAR_DURATION_MAX))
-        self.warehouse.bars.append(Bar())
+        duration: float = next(self.mining_bar_durations)
+        self.wait(duration)
+        with self.warehouse.lock:
+            self.warehouse.bars.append(Bar())
+        self.warehouse.notify_change()
+        self.stats.record_activity(RobotActivity.MINING_BAR, duration, items_produced=1)
 
-    def can_assemble_foobar(self) -> bool:
-        """
-        If it can assemble a new foobar
-        :return: bool
-        """
-        return len(self.warehouse.foos) > 0 and len(self.warehouse.bars) > 0
-
-    def assemble_foobar(self, success_rate: float = settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE) -> None:
+    def assemble_foobar(self, success_rate: Optional[float] = None) -> None:
         """
         Assemble a foobar
-        :param success_rate: assembly success rate
+        :param success_rate: assembly success rate, ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE by default
         :return:
         """
-        bar: Bar = self.warehouse.bars.pop(0)
-        foo: Foo = self.warehouse.foos.pop(0)
+        if success_rate is None:
+            success_rate = settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE
+        with self.warehouse.lock:
+            started: bool = self.can_start(RobotActivity.ASSEMBLING_FOOBAR)
+            if started:
+                bar: Bar = self.warehouse.bars.pop(0)
+                foo: Foo = self.warehouse.foos.pop(0)
+        if not started:
+            self.execute_next_activity()
+            return
+        self.warehouse.notify_change()
         self.wait(settings.ROBOT_ASSEMBLING_FOOBAR_DURATION)
-        if random.randrange(100) < success_rate:  # Success
-            self.warehouse.foobars.append(FooBar(foo=foo, bar=bar))
-        else:  # Fail
-            self.warehouse.bars.append(bar)
-
-    def can_sell_foobars(self) -> bool:
-        """
-        Returns if the robot can sell foobars
-        :return: if we can sell foobars
-        """
-        return len(self.warehouse.foobars) > settings.ROBOT_SELLING_FOOBARS_MIN
+        with self.warehouse.lock:
+            if next(self.assembling_draws) < success_rate:  # Success
+                self.warehouse.foobars.append(FooBar(foo=foo, bar=bar))
+                items_produced: int = 1
+            else:  # Fail
+                self.warehouse.bars.append(bar)
+                items_produced = 0
+        self.warehouse.notify_change()
+        self.stats.record_activity(
+            RobotActivity.ASSEMBLING_FOOBAR, settings.ROBOT_ASSEMBLING_FOOBAR_DURATION, items_produced=items_produced
+        )
 
     def get_foobars_to_sell(self) -> List[FooBar]:
         """
@@ -154,40 +210,39 @@ class Robot(Thread):
         Sell foobars
         :return:
         """
-        foobars: List[FooBar] = self.get_foobars_to_sell()
+        with self.warehouse.lock:
+            foobars: List[FooBar] = self.get_foobars_to_sell() if self.can_start(RobotActivity.SELLING_FOOBARS) else []
+        if not foobars:
+            self.execute_next_activity()
+            return
+        self.warehouse.notify_change()
         self.wait(settings.ROBOT_SELLING_FOOBARS_DURATION)
-        self.warehouse.balance += settings.FOOBAR_VALUE * len(foobars)
-
-    def can_buy_robot(self) -> bool:
-        """
-        If we can buy a new robot
-        :return: bool
-        """
-        return self.has_enough_balance_to_buy_robot() and self.has_enough_foo_to_buy_robot()
-
-    def has_enough_balance_to_buy_robot(self) -> bool:
-        """
-        Returns if it has enough balance to buy a new robot
-        :return: bool
-        """
-        return self.warehouse.balance >= settings.ROBOT_COST
-
-    def has_enough_foo_to_buy_robot(self) -> bool:
-        """
-        Returns if it has enough foos to buy a new robot
-        :return: bool
-        """
-        return len(self.warehouse.foos) >= settings.ROBOT_FOO_COST
+        with self.warehouse.lock:
+            self.warehouse.balance += settings.FOOBAR_VALUE * len(foobars)
+        self.warehouse.notify_change()
+        self.stats.record_activity(RobotActivity.SELLING_FOOBARS, settings.ROBOT_SELLING_FOOBARS_DURATION)
 
     def buy_robot(self) -> None:
         """
         Buy a new robot
         :return:
         """
-        self.warehouse.balance -= settings.ROBOT_COST
-        self.warehouse.foos = self.warehouse.foos[settings.ROBOT_FOO_COST:]
+        with self.warehouse.lock:
+            started: bool = self.can_start(RobotActivity.BUYING_ROBOT)
+            if started:
+                self.warehouse.balance -= settings.ROBOT_COST
+                self.warehouse.foos = self.warehouse.foos[settings.ROBOT_FOO_COST :]
+        if not started:
+            self.execute_next_activity()
+            return
         new_robot: Robot = Robot(
-            robot_id=len(self.warehouse.robots) + 1, warehouse=self.warehouse, stop_event=self.stop_event
+            robot_id=self.warehouse.robots.next_id(),
+            warehouse=self.warehouse,
+            stop_event=self.stop_event,
+            random_stream=self.random_stream.spawn(),
+            planner=self.planner,
         )
-        self.warehouse.robots.append(new_robot)
+        self.warehouse.robots.add(new_robot)
+        self.warehouse.notify_change()
+        self.stats.record_activity(RobotActivity.BUYING_ROBOT, 0)
         new_robot.start()
@@ -0,0 +1,182 @@
+import struct
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.warehouse_state import WarehouseState
+
+MAGIC: bytes = b"FBTSHM1\x00"
+HEADER: struct.Struct = struct.Struct("<8s")
+SEQUENCE: struct.Struct = struct.Struct("<Q")
+SEQUENCE_OFFSET: int = HEADER.size
+# time, robots, balance, foos, bars, foobars, finished, then the robots count of each RobotActivity
+BODY: struct.Struct = struct.Struct("<dqdqqqq" + "q" * len(RobotActivity))
+BODY_OFFSET: int = SEQUENCE_OFFSET + SEQUENCE.size
+SIZE: int = BODY_OFFSET + BODY.size
+# Blocks created by the writers of this process, the resource tracker of the process removes them at exit
+CREATED_BLOCKS: Set[str] = set()
+
+
+class SharedState(NamedTuple):
+    """
+    Factory state read from the shared memory block, version is the number of writes
+    """
+
+    version: int
+    time: float
+    robots: int
+    balance: float
+    foos: int
+    bars: int
+    foobars: int
+    finished: bool
+    activities: Dict[RobotActivity, int]
+
+
+class SharedStateWriter:
+    """
+    Publish the factory state in a fixed layout shared memory block guarded by a seqlock.
+
+    The block is the magic, a sequence number then the counters. The sequence is odd while the counters are written
+    and even once they are consistent: readers never block the writer, they retry when the sequence was odd or
+    changed during their read.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.memory: SharedMemory = SharedMemory(name=name, create=True, size=SIZE)
+        self.lock: Lock = Lock()
+        self.sequence: int = 0
+        self.activities: List[int] = [0] * len(RobotActivity)
+        self.closed: bool = False
+        CREATED_BLOCKS.add(self.memory.name)
+        HEADER.pack_into(self.memory.buf, 0, MAGIC)
+        SEQUENCE.pack_into(self.memory.buf, SEQUENCE_OFFSET, self.sequence)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __enter__(self) -> "SharedStateWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def write(
+        self, state: WarehouseState, activities: Optional[Dict[RobotActivity, int]] = None, finished: bool = False
+    ) -> None:
+        """
+        Write a state in the block, nothing is written once the block is closed
+        :param state: warehouse state
+        :param activities: robots count by activity, the last ones written are kept when None
+        :param finished: if the factory is finished
+        :return:
+        """
+        with self.lock:
+            if self.closed:
+                return
+            if activities is not None:
+                self.activities = [activities.get(activity, 0) for activity in RobotActivity]
+            buffer: memoryview = self.memory.buf
+            self.sequence += 1
+            SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, self.sequence)
+            BODY.pack_into(
+                buffer,
+                BODY_OFFSET,
+                state.time,
+                state.robots,
+                state.balance,
+                state.foos,
+                state.bars,
+                state.foobars,
+                finished,
+                *self.activities,
+            )
+            self.sequence += 1
+            SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, self.sequence)
+
+    def publish(self, state: WarehouseState) -> None:
+        """
+        State listener writing the states in the block
+        :param state: warehouse state
+        :return:
+        """
+        self.write(state)
+
+    def close(self) -> None:
+        """
+        Release and remove the block
+        :return:
+        """
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.memory.close()
+                self.memory.unlink()
+                CREATED_BLOCKS.discard(self.memory.name)
+
+
+class SharedStateReader:
+    """
+    Read the factory state published by a SharedStateWriter of another process, without locking nor serialization
+    """
+
+    def __init__(self, name: str):
+        try:
+            self.memory: SharedMemory = SharedMemory(name=name, track=False)
+        except TypeError:  # Before python 3.13, the block would be removed when the reader exits
+            self.memory = SharedMemory(name=name)
+            if self.memory.name not in CREATED_BLOCKS:
+                resource_tracker.unregister(self.memory._name, "shared_memory")
+        if HEADER.unpack_from(self.memory.buf, 0)[0] != MAGIC:
+            self.memory.close()
+            raise ValueError(f"{name} is not a foobartory shared state")
+
+    def __enter__(self) -> "SharedStateReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def read(self, retries: int = 10000) -> SharedState:
+        """
+        Returns a consistent state, retrying while the writer is writing
+        :param retries: maximum number of attempts
+        :return: shared state
+        """
+        buffer: memoryview = self.memory.buf
+        for _ in range(retries):
+            sequence: int = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            values: Tuple[Any, ...] = BODY.unpack_from(buffer, BODY_OFFSET)
+            if SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] == sequence:
+                return SharedState(sequence // 2, *values[:6], bool(values[6]), dict(zip(RobotActivity, values[7:])))
+        raise TimeoutError("the shared state kept changing during the reads")
+
+    def iter_states(self, interval: float = 0.01) -> Iterator[SharedState]:
+        """
+        Poll the block and yield every new state until the factory is finished
+        :param interval: polling interval, in seconds
+        :return: states iterator
+        """
+        version: int = -1
+        while True:
+            state: SharedState = self.read()
+            if state.version != version:
+                version = state.version
+                yield state
+                if state.finished:
+                    return
+            time.sleep(interval)
+
+    def close(self) -> None:
+        """
+        Release the block, it stays available to the other readers
+        :return:
+        """
+        self.memory.close()
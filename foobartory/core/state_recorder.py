@@ -0,0 +1,127 @@
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Dict, Iterator, Tuple, Union
+
+from foobartory.core.models.warehouse_state import WarehouseState
+
+if TYPE_CHECKING:
+    import numpy
+
+MAGIC: bytes = b"FBTREC1"
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("time", "d"),
+    ("robots", "q"),
+    ("balance", "d"),
+    ("foos", "q"),
+    ("bars", "q"),
+    ("foobars", "q"),
+)
+CHUNK_HEADER: struct.Struct = struct.Struct("<I")
+BYTE_ORDERS: Dict[str, bytes] = {"little": b"<", "big": b">"}
+
+
+class StateRecorder:
+    """
+    Stream warehouse states to a columnar binary file.
+
+    The file is a header (magic + byte order) followed by chunks, a chunk is its number of rows
+    then every column values, stored as typed arrays. Only one chunk is kept in memory.
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_size: int = 4096):
+        if chunk_size < 1:
+            raise ValueError("chunk_size has to be positive")
+        self.path: Path = Path(path)
+        self.chunk_size: int = chunk_size
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in COLUMNS}
+        self.file: IO[bytes] = open(self.path, "wb")
+        self.file.write(MAGIC + BYTE_ORDERS[sys.byteorder])
+
+    def __enter__(self) -> "StateRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.columns["time"])
+
+    def record(self, state: WarehouseState) -> None:
+        """
+        Append a state, the chunk is written once full
+        :param state: warehouse state
+        :return:
+        """
+        for name, column in self.columns.items():
+            column.append(getattr(state, name))
+        if len(self) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered states as a new chunk
+        :return:
+        """
+        if len(self):
+            self.file.write(CHUNK_HEADER.pack(len(self)))
+            for column in self.columns.values():
+                column.tofile(self.file)
+                del column[:]
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        Write the last chunk and close the file
+        :return:
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def iter_recording_chunks(path: Union[str, Path]) -> Iterator[Dict[str, array]]:
+    """
+    Read a recording chunk by chunk
+    :param path: recording path
+    :return: chunks columns
+    """
+    with open(path, "rb") as file:
+        header: bytes = file.read(len(MAGIC) + 1)
+        if header[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a foobartory recording")
+        swap: bool = header[len(MAGIC) :] != BYTE_ORDERS[sys.byteorder]
+        while True:
+            chunk_header: bytes = file.read(CHUNK_HEADER.size)
+            if not chunk_header:
+                return
+            (rows,) = CHUNK_HEADER.unpack(chunk_header)
+            chunk: Dict[str, array] = {}
+            for name, typecode in COLUMNS:
+                column: array = array(typecode)
+                column.fromfile(file, rows)
+                if swap:
+                    column.byteswap()
+                chunk[name] = column
+            yield chunk
+
+
+def load_recording(path: Union[str, Path]) -> Dict[str, "numpy.ndarray"]:
+    """
+    Load a whole recording as numpy arrays, numpy has to be installed
+    :param path: recording path
+    :return: columns arrays
+    """
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("numpy is needed to load a recording, install it with `pip install numpy`") from error
+    chunks: Dict[str, list] = {name: [] for name, _ in COLUMNS}
+    for chunk in iter_recording_chunks(path):
+        for name, column in chunk.items():
+            chunks[name].append(numpy.frombuffer(column, dtype=column.typecode))
+    return {
+        name: numpy.concatenate(arrays) if arrays else numpy.empty(0, dtype=typecode)
+        for (name, typecode), arrays in zip(COLUMNS, chunks.values())
+    }
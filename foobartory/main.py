@@ -1,5 +1,46 @@
-from foobartory.core.factory import Factory
+import argparse
+from typing import List, Optional
+
+from foobartory.core.factory import Factory, StateListener
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.shared_state import SharedStateWriter
+from foobartory.core.state_recorder import StateRecorder
+from foobartory.server.dashboard import DashboardServer
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command line arguments
+    :return: arguments
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="foobartory")
+    parser.add_argument("--record", metavar="PATH", help="record the warehouse states to this file")
+    parser.add_argument("--dashboard-port", metavar="PORT", type=int, help="serve a live dashboard on this port")
+    parser.add_argument("--shared-state", metavar="NAME", help="publish the state in this shared memory block")
+    parser.add_argument("--strategy", metavar="PATH", help="planner strategy file, such as the optimizer output")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    factory: Factory = Factory()
+    arguments: argparse.Namespace = parse_arguments()
+    state_listeners: List[StateListener] = []
+    recorder: Optional[StateRecorder] = StateRecorder(arguments.record) if arguments.record else None
+    if recorder:
+        state_listeners.append(recorder.record)
+    dashboard: Optional[DashboardServer] = None
+    if arguments.dashboard_port is not None:
+        dashboard = DashboardServer(port=arguments.dashboard_port)
+        dashboard.start()
+        state_listeners.append(dashboard.publish)
+    shared_state: Optional[SharedStateWriter] = (
+        SharedStateWriter(arguments.shared_state) if arguments.shared_state else None
+    )
+    strategy: Optional[Strategy] = Strategy.parse_file(arguments.strategy) if arguments.strategy else None
+    factory: Factory = Factory(state_listeners=state_listeners, shared_state=shared_state, strategy=strategy)
     factory.run()
+    if recorder:
+        recorder.close()
+    if dashboard:
+        dashboard.stop()
+    if shared_state:
+        shared_state.close()
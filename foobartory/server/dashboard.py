@@ -0,0 +1,205 @@
+import asyncio
+import json
+from collections import deque
+from http import HTTPStatus
+from threading import Event, Thread
+from typing import Any, Deque, Dict, Optional, Set
+
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.server.http import Request, build_response, build_response_head, read_request
+
+PAGE: bytes = b"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>foobartory</title></head>
+<body>
+<h1>foobartory</h1>
+<table id="state"></table>
+<script>
+const state = {};
+new EventSource("/events").onmessage = (event) => {
+    Object.assign(state, JSON.parse(event.data));
+    document.getElementById("state").innerHTML = Object.entries(state)
+        .map(([name, value]) => `<tr><th>${name}</th><td>${value}</td></tr>`).join("");
+};
+</script>
+</body>
+</html>
+"""
+
+
+class Subscriber:
+    """
+    Dashboard client, the deltas it did not receive yet are merged so a slow client only gets the latest values
+    """
+
+    def __init__(self, state: Dict[str, Any]):
+        self.pending: Dict[str, Any] = dict(state)
+        self.changed: asyncio.Event = asyncio.Event()
+        if self.pending:
+            self.changed.set()
+
+    def push(self, delta: Dict[str, Any]) -> None:
+        """
+        Merge a delta into the pending one
+        :param delta: changed fields
+        :return:
+        """
+        self.pending.update(delta)
+        self.changed.set()
+
+    async def pop(self) -> Dict[str, Any]:
+        """
+        Wait for changes then returns them
+        :return: changed fields
+        """
+        await self.changed.wait()
+        self.changed.clear()
+        delta, self.pending = self.pending, {}
+        return delta
+
+
+class DashboardServer:
+    """
+    Local HTTP server pushing the warehouse state changes with Server-Sent Events.
+
+    It runs its own asyncio loop in a daemon thread: publish only appends to a bounded queue and wakes the loop up
+    when it is not already, the oldest states are dropped if the loop does not keep up, so it never blocks the factory.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, queue_size: int = 16):
+        self.host: str = host
+        self.port: int = port
+        self.states: Deque[WarehouseState] = deque(maxlen=queue_size)
+        self.state: Dict[str, Any] = {}
+        self.subscribers: Set[Subscriber] = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.states_available: Optional[asyncio.Event] = None
+        # Set by publish when it wakes the loop up, cleared by the broadcaster before it drains the queue: the loop is
+        # woken up once per batch of states instead of once per state
+        self.wakeup_pending: bool = False
+        self.stopping: Optional[asyncio.Event] = None
+        self.ready: Event = Event()
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """
+        Start the server thread and wait for the server to listen
+        :return:
+        """
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self) -> None:
+        """
+        Stop the server and wait for its thread
+        :return:
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join()
+
+    def publish(self, state: WarehouseState) -> None:
+        """
+        Queue a state for the subscribers, it can be called from any thread
+        :param state: warehouse state
+        :return:
+        """
+        if self.loop is None:
+            return
+        self.states.append(state)
+        if not self.wakeup_pending:
+            self.wakeup_pending = True
+            self.loop.call_soon_threadsafe(self.states_available.set)
+
+    def run(self) -> None:
+        """
+        Entrypoint of self.thread
+        :return:
+        """
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """
+        Serve until stop is called
+        :return:
+        """
+        self.loop = asyncio.get_running_loop()
+        self.states_available = asyncio.Event()
+        self.stopping = asyncio.Event()
+        server: asyncio.AbstractServer = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        broadcaster: asyncio.Task = asyncio.create_task(self.broadcast_states())
+        async with server:
+            await self.stopping.wait()
+            broadcaster.cancel()
+            for subscriber in self.subscribers:
+                subscriber.changed.set()
+
+    async def broadcast_states(self) -> None:
+        """
+        Coalesce the queued states and push the changed fields to the subscribers
+        :return:
+        """
+        while True:
+            await self.states_available.wait()
+            self.states_available.clear()
+            self.wakeup_pending = False
+            delta: Dict[str, Any] = {}
+            while self.states:
+                for name, value in self.states.popleft().dict().items():
+                    if self.state.get(name) != value:
+                        delta[name] = value
+            if delta:
+                self.state.update(delta)
+                for subscriber in self.subscribers:
+                    subscriber.push(delta)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a client request
+        :param reader: client stream reader
+        :param writer: client stream writer
+        :return:
+        """
+        try:
+            request: Optional[Request] = await read_request(reader)
+            if request is None:
+                writer.write(build_response(HTTPStatus.BAD_REQUEST))
+            elif request.method != "GET":
+                writer.write(build_response(HTTPStatus.METHOD_NOT_ALLOWED))
+            elif request.path == "/":
+                writer.write(build_response(HTTPStatus.OK, PAGE, "text/html; charset=utf-8"))
+            elif request.path == "/state":
+                writer.write(build_response(HTTPStatus.OK, json.dumps(self.state).encode(), "application/json"))
+            elif request.path == "/events":
+                await self.stream_events(writer)
+            else:
+                writer.write(build_response(HTTPStatus.NOT_FOUND))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def stream_events(self, writer: asyncio.StreamWriter) -> None:
+        """
+        Send the full state then every delta as Server-Sent Events until the client leaves
+        :param writer: client stream writer
+        :return:
+        """
+        writer.write(
+            build_response_head(
+                HTTPStatus.OK, {"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "Connection": "close"}
+            )
+        )
+        subscriber: Subscriber = Subscriber(self.state)
+        self.subscribers.add(subscriber)
+        try:
+            while not self.stopping.is_set():
+                delta: Dict[str, Any] = await subscriber.pop()
+                if delta:
+                    writer.write(f"data: {json.dumps(delta)}\n\n".encode())
+                    await writer.drain()
+        finally:
+            self.subscribers.discard(subscriber)
@@ -0,0 +1,70 @@
+import asyncio
+from http import HTTPStatus
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+MAX_HEADER_LINES: int = 100
+
+
+class Request(BaseModel):
+    """
+    Minimal HTTP/1.1 request
+    """
+
+    method: str
+    path: str
+    headers: Dict[str, str] = {}
+    body: bytes = b""
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_size: int = 1024 * 1024) -> Optional[Request]:
+    """
+    Read a request from a client stream
+    :param reader: client stream
+    :param max_body_size: maximum body size accepted, in bytes
+    :return: the request, None if the client closed the connection or sent an invalid request
+    """
+    try:
+        request_line: bytes = await reader.readline()
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line: str = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        content_length: int = int(headers.get("content-length", 0))
+        if content_length > max_body_size:
+            return None
+        body: bytes = await reader.readexactly(content_length) if content_length else b""
+    except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+        return None
+    return Request(method=method.upper(), path=path, headers=headers, body=body)
+
+
+def build_response(
+    status: HTTPStatus, body: bytes = b"", content_type: str = "text/plain", headers: Optional[Dict[str, str]] = None
+) -> bytes:
+    """
+    Build a whole response
+    :param status: response status
+    :param body: response body
+    :param content_type: body content type
+    :param headers: other headers
+    :return: response bytes
+    """
+    headers = {"Content-Type": content_type, "Content-Length": str(len(body)), "Connection": "close", **(headers or {})}
+    return build_response_head(status, headers) + body
+
+
+def build_response_head(status: HTTPStatus, headers: Dict[str, str]) -> bytes:
+    """
+    Build the status line and headers of a response
+    :param status: response status
+    :param headers: response headers
+    :return: response head bytes
+    """
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
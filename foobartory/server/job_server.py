@@ -0,0 +1,416 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import os
+from enum import Enum
+from http import HTTPStatus
+from multiprocessing.connection import Connection
+from threading import Event, Thread
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from foobartory.server.http import Request, build_response, build_response_head, read_request
+from foobartory.settings.settings import Settings, settings as default_settings
+from foobartory.simulation.engine import SimulationResult, run_simulation
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed out"
+
+
+# Workers are forked from a clean fork server which already imported the simulation modules,
+# they do not inherit the clients sockets like a plain fork of the server would
+if "forkserver" in multiprocessing.get_all_start_methods():
+    MULTIPROCESSING_CONTEXT = multiprocessing.get_context("forkserver")
+else:
+    MULTIPROCESSING_CONTEXT = multiprocessing.get_context("spawn")
+FINAL_STATUSES = {JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMED_OUT}
+
+
+class JobRequest(BaseModel):
+    """
+    Simulation job sent by a client, the highest priority runs first
+    """
+
+    settings: Dict[str, Any] = {}
+    seed: Optional[int] = None
+    priority: int = 0
+    time_budget: Optional[float] = None
+
+
+class JobInfo(BaseModel):
+    """
+    Job state sent back to the clients
+    """
+
+    id: int
+    status: JobStatus
+    priority: int
+    result: Optional[SimulationResult] = None
+    error: Optional[str] = None
+
+
+class Job:
+    def __init__(self, job_id: int, request: JobRequest, settings: Settings):
+        self.id: int = job_id
+        self.request: JobRequest = request
+        self.settings: Settings = settings
+        self.status: JobStatus = JobStatus.QUEUED
+        self.result: Optional[SimulationResult] = None
+        self.error: Optional[str] = None
+        self.changed: asyncio.Event = asyncio.Event()
+        self.cancel_requested: asyncio.Event = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def get_info(self) -> JobInfo:
+        """
+        Returns the job state
+        :return: job info
+        """
+        return JobInfo(
+            id=self.id, status=self.status, priority=self.request.priority, result=self.result, error=self.error
+        )
+
+    def update(self, status: JobStatus, result: Optional[SimulationResult] = None, error: Optional[str] = None) -> None:
+        """
+        Change the job status and wake up the clients waiting for it
+        :param status: new status
+        :param result: simulation result
+        :param error: error message
+        :return:
+        """
+        self.status = status
+        self.result = result
+        self.error = error
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+def run_worker(connection: Connection) -> None:
+    """
+    Entrypoint of the worker processes, run the simulations sent through the connection
+    :param connection: connection with the server
+    :return:
+    """
+    while True:
+        try:
+            settings_values, seed = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, run_simulation(Settings(**settings_values), seed).json()))
+        except Exception as error:
+            connection.send((False, f"{type(error).__name__}: {error}"))
+
+
+class Worker:
+    """
+    Long lived process running simulations, it is replaced when a job has to be interrupted
+    """
+
+    def __init__(self):
+        self.connection: Connection
+        self.process: multiprocessing.process.BaseProcess
+        self.start()
+
+    def start(self) -> None:
+        """
+        Start the worker process
+        :return:
+        """
+        self.connection, worker_connection = MULTIPROCESSING_CONTEXT.Pipe()
+        self.process = MULTIPROCESSING_CONTEXT.Process(target=run_worker, args=(worker_connection,), daemon=True)
+        self.process.start()
+        worker_connection.close()
+
+    def restart(self) -> None:
+        """
+        Kill the worker process and start a new one
+        :return:
+        """
+        self.stop()
+        self.start()
+
+    def stop(self) -> None:
+        """
+        Kill the worker process
+        :return:
+        """
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    async def run(self, job: Job) -> Tuple[bool, str]:
+        """
+        Send a job to the process and wait for its outcome
+        :param job: job to run
+        :return: success and simulation result as json or error message
+        :raise EOFError: if the worker process died
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        readable: asyncio.Future = loop.create_future()
+        loop.add_reader(self.connection.fileno(), lambda: readable.done() or readable.set_result(None))
+        try:
+            self.connection.send((job.settings.dict(), job.request.seed))
+            await readable
+        finally:
+            loop.remove_reader(self.connection.fileno())
+        return self.connection.recv()
+
+
+class JobServer:
+    """
+    Local HTTP server running simulation jobs on a pool of pre-started worker processes.
+
+    POST /jobs queues a job and streams its status updates as JSON lines until it is finished,
+    GET /jobs/<id> returns a job state and DELETE /jobs/<id> cancels it.
+    The server listens on a Unix socket if unix_path is given, on host:port otherwise.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8001,
+        unix_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        base_settings: Settings = default_settings,
+    ):
+        self.host: str = host
+        self.port: int = port
+        self.unix_path: Optional[str] = unix_path
+        self.workers_count: int = workers or os.cpu_count() or 1
+        self.base_settings: Settings = base_settings
+        self.jobs: Dict[int, Job] = {}
+        self.queue: List[Tuple[int, int, Job]] = []
+        self.job_ids: Iterator[int] = itertools.count(1)
+        self.workers: List[Worker] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.jobs_available: Optional[asyncio.Condition] = None
+        self.stopping: Optional[asyncio.Event] = None
+        self.ready: Event = Event()
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """
+        Serve from a daemon thread, returns once the server is listening
+        :return:
+        """
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self) -> None:
+        """
+        Stop the server started with start
+        :return:
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join()
+
+    def run(self) -> None:
+        """
+        Serve until stop is called
+        :return:
+        """
+        self.preload_worker_modules()
+        asyncio.run(self.serve())
+
+    @staticmethod
+    def preload_worker_modules() -> None:
+        """
+        Make the fork server import the simulation modules once, before it forks the workers. The preload is global to
+        the multiprocessing module, so it is only set by a server about to start its workers.
+        :return:
+        """
+        if MULTIPROCESSING_CONTEXT.get_start_method() == "forkserver":
+            MULTIPROCESSING_CONTEXT.set_forkserver_preload(["foobartory.server.job_server"])
+
+    async def serve(self) -> None:
+        """
+        Start the workers then serve the clients
+        :return:
+        """
+        self.loop = asyncio.get_running_loop()
+        self.jobs_available = asyncio.Condition()
+        self.stopping = asyncio.Event()
+        self.workers = [Worker() for _ in range(self.workers_count)]
+        if self.unix_path:
+            server: asyncio.AbstractServer = await asyncio.start_unix_server(self.handle_connection, self.unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+            self.port = server.sockets[0].getsockname()[1]
+        dispatchers: List[asyncio.Task] = [asyncio.create_task(self.dispatch_jobs(worker)) for worker in self.workers]
+        self.ready.set()
+        async with server:
+            await self.stopping.wait()
+            for dispatcher in dispatchers:
+                dispatcher.cancel()
+            for job in self.jobs.values():
+                if not job.finished:
+                    job.update(JobStatus.CANCELLED)
+        for worker in self.workers:
+            worker.stop()
+
+    def submit(self, request: JobRequest) -> Job:
+        """
+        Queue a job, the settings are validated first
+        :param request: job request
+        :return: queued job
+        """
+        job: Job = Job(next(self.job_ids), request, self.base_settings.override(request.settings))
+        self.jobs[job.id] = job
+        heapq.heappush(self.queue, (-request.priority, job.id, job))
+        self.loop.create_task(self.notify_job_available())
+        return job
+
+    async def notify_job_available(self) -> None:
+        """
+        Wake up a dispatcher
+        :return:
+        """
+        async with self.jobs_available:
+            self.jobs_available.notify()
+
+    def cancel(self, job: Job) -> None:
+        """
+        Cancel a job, a running job is interrupted
+        :param job: job to cancel
+        :return:
+        """
+        if job.status == JobStatus.QUEUED:
+            job.update(JobStatus.CANCELLED)
+        elif job.status == JobStatus.RUNNING:
+            job.cancel_requested.set()
+
+    async def get_next_job(self) -> Job:
+        """
+        Wait for the highest priority queued job
+        :return: job
+        """
+        async with self.jobs_available:
+            while True:
+                while self.queue:
+                    _, _, job = heapq.heappop(self.queue)
+                    if job.status == JobStatus.QUEUED:
+                        return job
+                await self.jobs_available.wait()
+
+    async def dispatch_jobs(self, worker: Worker) -> None:
+        """
+        Run the queued jobs on a worker, one at a time
+        :param worker: worker
+        :return:
+        """
+        while True:
+            job: Job = await self.get_next_job()
+            job.update(JobStatus.RUNNING)
+            running: asyncio.Task = asyncio.create_task(worker.run(job))
+            cancelled: asyncio.Task = asyncio.create_task(job.cancel_requested.wait())
+            done, _ = await asyncio.wait(
+                {running, cancelled}, timeout=job.request.time_budget, return_when=asyncio.FIRST_COMPLETED
+            )
+            cancelled.cancel()
+            if running in done:
+                try:
+                    success, output = running.result()
+                except (EOFError, OSError):
+                    worker.restart()
+                    success, output = False, "the worker process died"
+                if success:
+                    job.update(JobStatus.DONE, result=SimulationResult.parse_raw(output))
+                else:
+                    job.update(JobStatus.FAILED, error=output)
+            else:
+                running.cancel()
+                worker.restart()
+                job.update(JobStatus.CANCELLED if cancelled in done else JobStatus.TIMED_OUT)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a client request
+        :param reader: client stream reader
+        :param writer: client stream writer
+        :return:
+        """
+        try:
+            request: Optional[Request] = await read_request(reader)
+            if request is None:
+                writer.write(build_response(HTTPStatus.BAD_REQUEST))
+            elif request.path == "/jobs" and request.method == "POST":
+                await self.create_job(request, writer)
+            elif request.path.startswith("/jobs/"):
+                job_id: str = request.path[len("/jobs/") :]
+                job: Optional[Job] = self.jobs.get(int(job_id)) if job_id.isdigit() else None
+                if job is None:
+                    writer.write(build_response(HTTPStatus.NOT_FOUND))
+                elif request.method == "GET":
+                    writer.write(build_response(HTTPStatus.OK, job.get_info().json().encode(), "application/json"))
+                elif request.method == "DELETE":
+                    self.cancel(job)
+                    writer.write(
+                        build_response(HTTPStatus.ACCEPTED, job.get_info().json().encode(), "application/json")
+                    )
+                else:
+                    writer.write(build_response(HTTPStatus.METHOD_NOT_ALLOWED))
+            else:
+                writer.write(build_response(HTTPStatus.NOT_FOUND))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def create_job(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        """
+        Queue a job then stream its status changes until it is finished
+        :param request: HTTP request
+        :param writer: client stream writer
+        :return:
+        """
+        try:
+            job: Job = self.submit(JobRequest.parse_raw(request.body or b"{}"))
+        except (ValidationError, ValueError) as error:
+            writer.write(build_response(HTTPStatus.BAD_REQUEST, str(error).encode()))
+            return
+        writer.write(
+            build_response_head(HTTPStatus.OK, {"Content-Type": "application/x-ndjson", "Connection": "close"})
+        )
+        status: Optional[JobStatus] = None
+        while True:
+            changed: asyncio.Event = job.changed
+            if job.status != status:
+                status = job.status
+                writer.write(job.get_info().json().encode() + b"\n")
+                await writer.drain()
+            if job.finished:
+                return
+            await changed.wait()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command line arguments
+    :return: arguments
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="foobartory.server.job_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--unix-path", help="listen on this Unix socket instead of host:port")
+    parser.add_argument("--workers", type=int, help="number of worker processes, the number of CPUs by default")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments: argparse.Namespace = parse_arguments()
+    JobServer(host=arguments.host, port=arguments.port, unix_path=arguments.unix_path, workers=arguments.workers).run()
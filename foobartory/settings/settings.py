@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Any, Dict
 
 from pydantic import BaseSettings, root_validator
 
@@ -50,6 +51,17 @@ class Settings(BaseSettings):
                 raise ValueError(f"{key}: has to be positive")
         return values
 
+    def override(self, values: Dict[str, Any]) -> "Settings":
+        """
+        Returns a validated copy of the settings with some values replaced
+        :param values: values to replace
+        :return: new settings
+        """
+        unknown_keys = set(values) - set(self.__fields__)
+        if unknown_keys:
+            raise ValueError(f"{', '.join(sorted(unknown_keys))}: unknown settings")
+        return Settings(**{**self.dict(), **values})
+
     @classmethod
     def validate_mining_bar_min_max(cls, duration_min: float, duration_max: float) -> None:
         """
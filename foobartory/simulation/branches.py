@@ -0,0 +1,137 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from foobartory.core.conditions import Condition
+from foobartory.core.models.recipe import RecipeBook
+from foobartory.core.models.strategy import Strategy
+from foobartory.simulation.engine import Simulation, SimulationResult
+
+# Branches are forked: a branch starts from the memory of the simulation, shared copy-on-write, nothing is copied
+# or pickled up front
+FORK_CONTEXT = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+
+
+class Branch(BaseModel):
+    """
+    What-if configuration a forked simulation continues with, an empty branch continues exactly like the original
+    """
+
+    settings: Dict[str, Any] = {}
+    recipe_book: Optional[RecipeBook] = None
+    seed: Optional[int] = None
+    stop_condition: Optional[Condition] = None
+    max_time: Optional[float] = None
+    strategy: Optional[Strategy] = None
+
+
+class BranchRun:
+    """
+    Handle on a branch running in its own process
+    """
+
+    def __init__(self, name: str, process: multiprocessing.Process, connection: Connection):
+        self.name: str = name
+        self.process: multiprocessing.Process = process
+        self.connection: Connection = connection
+        self.outcome: Optional[SimulationResult] = None
+        self.error: Optional[str] = None
+
+    def done(self) -> bool:
+        """
+        If the branch result is available
+        :return: bool
+        """
+        return self.outcome is not None or self.error is not None or self.connection.poll()
+
+    def result(self, timeout: Optional[float] = None) -> SimulationResult:
+        """
+        Wait for the branch result
+        :param timeout: timeout, in seconds
+        :return: branch simulation result
+        """
+        if self.outcome is None and self.error is None:
+            if not self.connection.poll(timeout):
+                raise TimeoutError(f"branch {self.name} is still running")
+            try:
+                succeeded, value = self.connection.recv()
+            except EOFError:
+                succeeded, value = False, f"process exited with code {self.process.exitcode}"
+            self.connection.close()
+            self.process.join()
+            if succeeded:
+                self.outcome = value
+            else:
+                self.error = value
+        if self.error is not None:
+            raise RuntimeError(f"branch {self.name} failed: {self.error}")
+        return self.outcome
+
+    def cancel(self) -> None:
+        """
+        Stop the branch process
+        :return:
+        """
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        if self.outcome is None:
+            self.error = "cancelled"
+
+
+def run_branch(simulation: Simulation, branch: Branch, connection: Connection) -> None:
+    """
+    Branch process entrypoint: apply the branch configuration and run the simulation to its end
+    :param simulation: forked simulation
+    :param branch: branch configuration
+    :param connection: connection to send the result to
+    :return:
+    """
+    try:
+        simulation.state_listeners = []
+        simulation.condition_monitor.milestone_listeners = []
+        if (
+            branch.settings
+            or branch.recipe_book
+            or branch.strategy
+            or branch.seed is not None
+            or branch.stop_condition is not None
+        ):
+            simulation.reconfigure(
+                settings=simulation.settings.override(branch.settings) if branch.settings else None,
+                recipe_book=branch.recipe_book,
+                seed=branch.seed,
+                stop_condition=branch.stop_condition,
+                strategy=branch.strategy,
+            )
+        connection.send((True, simulation.run(max_time=branch.max_time)))
+    except Exception as exception:
+        connection.send((False, repr(exception)))
+    finally:
+        connection.close()
+
+
+def fork_branches(simulation: Simulation, branches: Dict[str, Branch]) -> Dict[str, BranchRun]:
+    """
+    Fork the simulation once per branch, the branches run in parallel while the simulation can go on.
+    The simulation must not be stepped by another thread during the call. Only the forking thread exists in the
+    branches: a lock held by another thread at the time of the fork stays locked in them forever, so the other threads
+    of the process should be idle, as FactoryHost.fork_tenant ensures for the hosted factories.
+    :param simulation: simulation to fork
+    :param branches: branches configurations by name
+    :return: branch runs by name
+    """
+    if FORK_CONTEXT is None:
+        raise RuntimeError("forking branches needs the fork start method")
+    runs: Dict[str, BranchRun] = {}
+    for name, branch in branches.items():
+        receiver, sender = FORK_CONTEXT.Pipe(duplex=False)
+        process: multiprocessing.Process = FORK_CONTEXT.Process(
+            target=run_branch, args=(simulation, branch, sender), name=f"branch-{name}", daemon=True
+        )
+        process.start()
+        sender.close()
+        runs[name] = BranchRun(name, process, receiver)
+    return runs
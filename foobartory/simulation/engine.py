@@ -0,0 +1,526 @@
+import heapq
+import time
+from itertools import repeat
+from typing import Callable, Dict, Iterator, List, Optional, Set, TYPE_CHECKING, Tuple
+
+from pydantic import BaseModel
+
+from foobartory.core.conditions import Condition, ConditionMonitor, Milestone, RobotsTarget
+from foobartory.core.models.recipe import MONEY, ROBOT, Recipe, RecipeBook
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.planner import Planner, get_planner
+from foobartory.core.random_stream import RandomStream
+from foobartory.settings.settings import Settings, settings as default_settings
+
+if TYPE_CHECKING:
+    from foobartory.core.factory import Factory
+
+# Bump it every time a change of the engine can change the results of a simulation
+ENGINE_VERSION: str = "3"
+
+DECIDE: int = 0
+ARRIVE: int = 1
+FINISH: int = 2
+
+
+class CompiledRecipe:
+    """
+    Recipe with its resources replaced by their stock indexes, to run it without any lookup
+    """
+
+    def __init__(self, recipe: Recipe, resource_indexes: Dict[str, int], random_stream: RandomStream):
+        self.name: str = recipe.name
+        self.inputs: List[Tuple[int, float]] = [
+            (resource_indexes[resource], quantity) for resource, quantity in recipe.inputs.items()
+        ]
+        self.outputs: List[Tuple[int, int]] = [
+            (resource_indexes[resource], quantity) for resource, quantity in recipe.outputs.items() if resource != ROBOT
+        ]
+        self.failure_outputs: List[Tuple[int, int]] = [
+            (resource_indexes[resource], quantity) for resource, quantity in recipe.failure_outputs.items()
+        ]
+        self.robots: int = recipe.outputs.get(ROBOT, 0)
+        self.money: Optional[int] = resource_indexes[MONEY] if recipe.sale_value else None
+        self.sale_value: float = recipe.sale_value
+        self.batch_max: int = recipe.batch_max
+        self.success_rate: float = recipe.success_rate
+        self.instant: bool = recipe.duration_max == 0
+        self.durations: Iterator[float] = (
+            random_stream.uniform(recipe.duration_min, recipe.duration_max)
+            if recipe.duration_min < recipe.duration_max
+            else repeat(recipe.duration_max)
+        )
+        self.success_draws: Optional[Iterator[int]] = (
+            random_stream.randrange(100) if recipe.success_rate < 100 else None
+        )
+
+
+class SimulationResult(BaseModel):
+    """
+    Outcome of a simulation run, with the counters of every recipe and the ones of the foobar recipes
+    """
+
+    seed: Optional[int]
+    finished: bool
+    time: float
+    robots: int
+    balance: float
+    foos: int
+    bars: int
+    foobars: int
+    foos_mined: int = 0
+    bars_mined: int = 0
+    foobars_assembled: int = 0
+    assembling_failures: int = 0
+    foobars_sold: int = 0
+    sales: int = 0
+    robots_bought: int = 0
+    moves: int = 0
+    events: int = 0
+    stock: Dict[str, float] = {}
+    produced: Dict[str, float] = {}
+    sold: Dict[str, float] = {}
+    recipe_runs: Dict[str, int] = {}
+    recipe_failures: Dict[str, int] = {}
+    milestones: List[Milestone] = []
+
+
+class Simulation:
+    """
+    Discrete event version of the Factory: robots follow the recipes chosen by the planner like the Robot does,
+    but waiting only moves a simulated clock forward instead of sleeping
+    """
+
+    def __init__(
+        self,
+        settings: Settings = default_settings,
+        seed: Optional[int] = None,
+        state_listeners: Optional[List[Callable[[WarehouseState], None]]] = None,
+        stop_condition: Optional[Condition] = None,
+        milestones: Optional[Dict[str, Condition]] = None,
+        milestone_listeners: Optional[List[Callable[[Milestone], None]]] = None,
+        recipe_book: Optional[RecipeBook] = None,
+        strategy: Optional[Strategy] = None,
+    ):
+        self.settings: Settings = settings
+        self.seed: Optional[int] = seed
+        self.random_stream: RandomStream = RandomStream(seed)
+        self.recipe_book: Optional[RecipeBook] = recipe_book
+        self.strategy: Optional[Strategy] = strategy
+        self.planner: Planner = Planner(recipe_book, strategy) if recipe_book else get_planner(settings, strategy)
+        self.recipes: List[CompiledRecipe] = [
+            CompiledRecipe(recipe, self.planner.resource_indexes, self.random_stream) for recipe in self.planner.recipes
+        ]
+        self.time: float = 0
+        self.stock: List[float] = [0] * len(self.planner.resources)
+        self.produced: List[float] = [0] * len(self.planner.resources)
+        self.sold: List[float] = [0] * len(self.planner.resources)
+        self.recipe_runs: List[int] = [0] * len(self.recipes)
+        self.recipe_failures: List[int] = [0] * len(self.recipes)
+        self.robots_bought: int = 0
+        self.initial_activity: int = self.planner.plan(self.stock)
+        self.activities: List[int] = []
+        self.events: List[Tuple[float, int, int, int, int, int]] = []
+        self.sequence: int = 0
+        self.state_listeners: List[Callable[[WarehouseState], None]] = state_listeners or []
+        self.published_counters: Optional[Tuple[float, ...]] = None
+        self.result: SimulationResult = SimulationResult(
+            seed=seed, finished=False, time=0, robots=0, balance=0, foos=0, bars=0, foobars=0
+        )
+        # The default stop condition follows MAX_ROBOTS when the settings are reconfigured
+        self.default_stop_condition: bool = stop_condition is None
+        self.condition_monitor: ConditionMonitor = ConditionMonitor(
+            stop_condition or RobotsTarget(count=settings.MAX_ROBOTS), milestones, milestone_listeners
+        )
+        self.simulated_deadlines: List[float] = self.condition_monitor.get_simulated_deadlines()
+        self.started_at: float = time.perf_counter()
+        for _ in range(settings.DEFAULT_ROBOTS):
+            self.add_robot()
+        if self.state_listeners:
+            self.publish_state()
+        self.check_conditions()
+
+    @classmethod
+    def from_factory(cls, factory: "Factory", seed: Optional[int] = None) -> "Simulation":
+        """
+        Returns a simulation starting from the current state of a running factory. The robots decide their next
+        activity from their current one, the items held by a running activity are not in the warehouse and are lost.
+        :param factory: running factory
+        :param seed: random seed of the simulation
+        :return: simulation
+        """
+        simulation: Simulation = cls(
+            seed=seed,
+            strategy=factory.strategy,
+            stop_condition=factory.stop_condition,
+            milestones=factory.condition_monitor.pending_milestones
+            if factory.condition_monitor
+            else factory.milestones,
+        )
+        state: WarehouseState = factory.get_state()
+        simulation.time = state.time
+        simulation.events = []
+        simulation.activities = []
+        recipe_names: List[str] = [recipe.name for recipe in simulation.recipes]
+        for robot in factory.warehouse.robots:
+            simulation.activities.append(recipe_names.index(robot.activity.value))
+            simulation.schedule(0, len(simulation.activities) - 1, DECIDE)
+        simulation.set_stock(MONEY, state.balance)
+        simulation.set_stock("foo", state.foos)
+        simulation.set_stock("bar", state.bars)
+        simulation.set_stock("foobar", state.foobars)
+        simulation.simulated_deadlines = [
+            deadline for deadline in simulation.simulated_deadlines if deadline > state.time
+        ]
+        simulation.check_conditions()
+        return simulation
+
+    @property
+    def robots(self) -> int:
+        return len(self.activities)
+
+    @property
+    def balance(self) -> float:
+        return self.get_stock(MONEY)
+
+    @property
+    def foos(self) -> int:
+        return int(self.get_stock("foo"))
+
+    @property
+    def bars(self) -> int:
+        return int(self.get_stock("bar"))
+
+    @property
+    def foobars(self) -> int:
+        return int(self.get_stock("foobar"))
+
+    @property
+    def finished(self) -> bool:
+        return self.condition_monitor.stopped
+
+    def get_stock(self, resource: str) -> float:
+        """
+        Returns the stock level of a resource, 0 if no recipe uses it
+        :param resource: resource name
+        :return: stock level
+        """
+        index: Optional[int] = self.planner.resource_indexes.get(resource)
+        return 0 if index is None else self.stock[index]
+
+    def set_stock(self, resource: str, level: float) -> None:
+        """
+        Set the stock level of a resource
+        :param resource: resource name
+        :param level: stock level
+        :return:
+        """
+        self.stock[self.planner.resource_indexes[resource]] = level
+
+    def reconfigure(
+        self,
+        settings: Optional[Settings] = None,
+        recipe_book: Optional[RecipeBook] = None,
+        seed: Optional[int] = None,
+        stop_condition: Optional[Condition] = None,
+        strategy: Optional[Strategy] = None,
+    ) -> None:
+        """
+        Continue the simulation with other settings or recipes, the stock, the robots, their running activities and
+        the counters are kept. The random draws go on from the current random state unless a new seed is given.
+        :param settings: new settings
+        :param recipe_book: new recipes, they have to contain the running ones
+        :param seed: new random seed
+        :param stop_condition: new stop condition, MAX_ROBOTS robots of the new settings if the simulation had the
+            default one
+        :param strategy: new planner strategy
+        :return:
+        """
+        resources: List[str] = self.planner.resources
+        recipe_names: List[str] = [recipe.name for recipe in self.recipes]
+        stock: Dict[str, float] = dict(zip(resources, self.stock))
+        produced: Dict[str, float] = dict(zip(resources, self.produced))
+        sold: Dict[str, float] = dict(zip(resources, self.sold))
+        recipe_runs: Dict[str, int] = dict(zip(recipe_names, self.recipe_runs))
+        recipe_failures: Dict[str, int] = dict(zip(recipe_names, self.recipe_failures))
+        self.settings = settings or self.settings
+        self.recipe_book = recipe_book or self.recipe_book
+        self.strategy = strategy or self.strategy
+        if seed is not None:
+            self.seed = seed
+            self.random_stream = RandomStream(seed)
+        self.planner = (
+            Planner(self.recipe_book, self.strategy) if self.recipe_book else get_planner(self.settings, self.strategy)
+        )
+        self.recipes = [
+            CompiledRecipe(recipe, self.planner.resource_indexes, self.random_stream) for recipe in self.planner.recipes
+        ]
+        new_recipe_names: List[str] = [recipe.name for recipe in self.recipes]
+        running_names: Set[str] = {recipe_names[activity] for activity in self.activities}
+        running_names.update(recipe_names[event[4]] for event in self.events if event[3] != DECIDE)
+        missing: Set[str] = running_names - set(new_recipe_names)
+        if missing:
+            raise ValueError(f"running recipes missing from the new recipes: {', '.join(sorted(missing))}")
+        indexes: List[int] = [new_recipe_names.index(name) if name in new_recipe_names else 0 for name in recipe_names]
+        self.activities = [indexes[activity] for activity in self.activities]
+        self.events = [(*event[:4], indexes[event[4]], event[5]) for event in self.events]
+        self.stock = [stock.get(resource, 0) for resource in self.planner.resources]
+        self.produced = [produced.get(resource, 0) for resource in self.planner.resources]
+        self.sold = [sold.get(resource, 0) for resource in self.planner.resources]
+        self.recipe_runs = [recipe_runs.get(name, 0) for name in new_recipe_names]
+        self.recipe_failures = [recipe_failures.get(name, 0) for name in new_recipe_names]
+        self.initial_activity = self.planner.plan([0] * len(self.planner.resources))
+        self.published_counters = None
+        if stop_condition is not None:
+            self.default_stop_condition = False
+        elif settings is not None and self.default_stop_condition:
+            stop_condition = RobotsTarget(count=self.settings.MAX_ROBOTS)
+        if stop_condition is not None:
+            self.condition_monitor.stop_condition = stop_condition
+            self.condition_monitor.stopped = False
+            self.simulated_deadlines = [
+                deadline for deadline in self.condition_monitor.get_simulated_deadlines() if deadline > self.time
+            ]
+            self.check_conditions()
+
+    def schedule(self, delay: float, robot: int, kind: int, activity: int = 0, count: int = 0):
+        """
+        Schedule a robot event
+        :param delay: delay from now, in simulated seconds
+        :param robot: robot index
+        :param kind: event kind, DECIDE, ARRIVE or FINISH
+        :param activity: index of the recipe the event is about
+        :param count: number of batches the recipe is holding
+        :return:
+        """
+        self.sequence += 1
+        heapq.heappush(self.events, (self.time + delay, self.sequence, robot, kind, activity, count))
+
+    def add_robot(self) -> None:
+        """
+        Add a new robot, it starts where the robots start on an empty stock, like the Robot does
+        :return:
+        """
+        self.activities.append(self.initial_activity)
+        self.schedule(0, len(self.activities) - 1, DECIDE)
+
+    def decide(self, robot: int) -> None:
+        """
+        Same as Robot.execute_next_activity: move first if the activity changes
+        :param robot: robot index
+        :return:
+        """
+        next_activity: int = self.planner.plan(self.stock)
+        if next_activity != self.activities[robot]:
+            self.result.moves += 1
+            self.schedule(self.settings.ROBOT_MOVING_DURATION, robot, ARRIVE, next_activity)
+        else:
+            self.start_activity(robot, next_activity)
+
+    def arrive(self, robot: int, activity: int) -> None:
+        """
+        The robot finished moving, start the activity if it is still valid or decide again
+        :param robot: robot index
+        :param activity: index of the recipe the robot moved for
+        :return:
+        """
+        if activity == self.planner.plan(self.stock):
+            self.activities[robot] = activity
+            self.start_activity(robot, activity)
+        else:
+            self.decide(robot)
+
+    def start_activity(self, robot: int, activity: int) -> None:
+        """
+        Take the recipe inputs and schedule its end, instant recipes end immediately
+        :param robot: robot index
+        :param activity: index of the recipe to start
+        :return:
+        """
+        recipe: CompiledRecipe = self.recipes[activity]
+        stock: List[float] = self.stock
+        batches: int = 1
+        if recipe.batch_max > 1:
+            batches = min(recipe.batch_max, *(int(stock[index] // quantity) for index, quantity in recipe.inputs))
+        for index, quantity in recipe.inputs:
+            stock[index] = max(stock[index] - quantity * batches, 0)
+        if recipe.instant:
+            self.produce(activity, batches)
+            self.schedule(0, robot, DECIDE)
+        else:
+            self.schedule(next(recipe.durations), robot, FINISH, activity, batches)
+
+    def produce(self, activity: int, batches: int) -> None:
+        """
+        Give the recipe outputs, or its failure outputs if the recipe fails
+        :param activity: index of the finished recipe
+        :param batches: number of batches the recipe was holding
+        :return:
+        """
+        recipe: CompiledRecipe = self.recipes[activity]
+        stock: List[float] = self.stock
+        self.recipe_runs[activity] += 1
+        if recipe.success_draws is not None and next(recipe.success_draws) >= recipe.success_rate:
+            self.recipe_failures[activity] += 1
+            for index, quantity in recipe.failure_outputs:
+                stock[index] += quantity * batches
+            return
+        for index, quantity in recipe.outputs:
+            stock[index] += quantity * batches
+            self.produced[index] += quantity * batches
+        if recipe.money is not None:
+            stock[recipe.money] += recipe.sale_value * batches
+            self.produced[recipe.money] += recipe.sale_value * batches
+            for index, quantity in recipe.inputs:
+                self.sold[index] += quantity * batches
+        for _ in range(recipe.robots * batches):
+            self.robots_bought += 1
+            self.add_robot()
+
+    def finish_activity(self, robot: int, activity: int, count: int) -> None:
+        """
+        Give the recipe outputs then decide the next one
+        :param robot: robot index
+        :param activity: index of the finished recipe
+        :param count: number of batches the recipe was holding
+        :return:
+        """
+        self.produce(activity, count)
+        self.decide(robot)
+
+    def step(self) -> bool:
+        """
+        Process the next event, or the next simulated deadline when it comes first
+        :return: if an event or a deadline has been processed
+        """
+        if self.finished or not self.events:
+            return False
+        if self.simulated_deadlines and self.events[0][0] >= self.simulated_deadlines[0]:
+            # The deadline is a step of its own, a paced caller only processes the next event once it is due
+            self.time = self.simulated_deadlines.pop(0)
+            self.check_conditions()
+            return True
+        self.time, _, robot, kind, activity, count = heapq.heappop(self.events)
+        self.result.events += 1
+        if kind == DECIDE:
+            self.decide(robot)
+        elif kind == ARRIVE:
+            self.arrive(robot, activity)
+        else:
+            self.finish_activity(robot, activity, count)
+        if self.state_listeners:
+            self.publish_state()
+        self.check_conditions()
+        return True
+
+    def check_conditions(self) -> None:
+        """
+        Evaluate the stop condition and the milestones on the current state
+        :return:
+        """
+        self.condition_monitor.update(self, time.perf_counter() - self.started_at)
+
+    def get_state(self) -> WarehouseState:
+        """
+        Returns the current warehouse state
+        :return: warehouse state
+        """
+        return WarehouseState(
+            time=self.time,
+            robots=self.robots,
+            balance=self.balance,
+            foos=self.foos,
+            bars=self.bars,
+            foobars=self.foobars,
+        )
+
+    def publish_state(self) -> None:
+        """
+        Send the state to the state listeners if a counter changed since the last time
+        :return:
+        """
+        counters: Tuple[float, ...] = (self.robots, *self.stock)
+        if counters != self.published_counters:
+            self.published_counters = counters
+            state: WarehouseState = self.get_state()
+            for listener in self.state_listeners:
+                listener(state)
+
+    def run(self, max_time: Optional[float] = None) -> SimulationResult:
+        """
+        Run the simulation until the stop condition is met
+        :param max_time: simulated time budget, in seconds
+        :return: simulation result
+        """
+        while not self.finished and self.events:
+            if max_time is not None and self.events[0][0] > max_time:
+                break
+            self.step()
+        return self.get_result()
+
+    def get_result(self) -> SimulationResult:
+        """
+        Returns the simulation result at the current time
+        :return: result
+        """
+        resources: List[str] = self.planner.resources
+        produced: Dict[str, float] = dict(zip(resources, self.produced))
+        sold: Dict[str, float] = dict(zip(resources, self.sold))
+        foobar_recipes: List[int] = [
+            index for index, recipe in enumerate(self.planner.recipes) if "foobar" in recipe.outputs
+        ]
+        return self.result.copy(
+            update={
+                "finished": self.finished,
+                "time": self.time,
+                "robots": self.robots,
+                "balance": self.balance,
+                "foos": self.foos,
+                "bars": self.bars,
+                "foobars": self.foobars,
+                "foos_mined": int(produced.get("foo", 0)),
+                "bars_mined": int(produced.get("bar", 0)),
+                "foobars_assembled": int(produced.get("foobar", 0)),
+                "assembling_failures": sum(self.recipe_failures[index] for index in foobar_recipes),
+                "foobars_sold": int(sold.get("foobar", 0)),
+                "sales": sum(runs for runs, recipe in zip(self.recipe_runs, self.recipes) if recipe.money is not None),
+                "robots_bought": self.robots_bought,
+                "stock": dict(zip(resources, self.stock)),
+                "produced": produced,
+                "sold": sold,
+                "recipe_runs": {recipe.name: runs for recipe, runs in zip(self.recipes, self.recipe_runs)},
+                "recipe_failures": {
+                    recipe.name: failures for recipe, failures in zip(self.recipes, self.recipe_failures)
+                },
+                "milestones": list(self.condition_monitor.milestones),
+            }
+        )
+
+
+def run_simulation(
+    settings: Settings = default_settings,
+    seed: Optional[int] = None,
+    stop_condition: Optional[Condition] = None,
+    milestones: Optional[Dict[str, Condition]] = None,
+    recipe_book: Optional[RecipeBook] = None,
+    strategy: Optional[Strategy] = None,
+) -> SimulationResult:
+    """
+    Run a whole simulation
+    :param settings: simulation settings
+    :param seed: random seed
+    :param stop_condition: condition stopping the simulation, MAX_ROBOTS robots by default
+    :param milestones: conditions to report when they are met for the first time
+    :param recipe_book: recipes of the factory, the foobar recipes by default
+    :param strategy: planner strategy, the default rules if None
+    :return: simulation result
+    """
+    return Simulation(
+        settings=settings,
+        seed=seed,
+        stop_condition=stop_condition,
+        milestones=milestones,
+        recipe_book=recipe_book,
+        strategy=strategy,
+    ).run()
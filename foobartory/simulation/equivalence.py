@@ -0,0 +1,348 @@
+import argparse
+import contextlib
+import io
+import math
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from foobartory.core.conditions import Milestone, RobotsTarget, WallTimeBudget
+from foobartory.core.factory import Factory
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.settings.settings import Settings, settings as global_settings
+from foobartory.simulation.engine import SimulationResult, run_simulation
+from foobartory.simulation.statistics import describe, holm, ks_2samp, mann_whitney_u
+
+METRICS: Tuple[str, ...] = ("time", "sales", "assemblies")
+MAX_ROBOTS_MILESTONE: str = "max robots"
+
+
+class RunMeasure(BaseModel):
+    """
+    Measures of one run, time is the simulated time MAX_ROBOTS robots were reached at and the counts are the finished
+    activities at that time
+    """
+
+    seed: int
+    finished: bool
+    time: float
+    sales: int
+    assemblies: int
+
+
+class MetricComparison(BaseModel):
+    """
+    Comparison of the distributions of a measure between the engine and the threaded factory, the adjusted p-values
+    are corrected for every test of the configuration
+    """
+
+    metric: str
+    engine_mean: float
+    engine_std: float
+    factory_mean: float
+    factory_std: float
+    ks_statistic: float
+    ks_p_value: float
+    mann_whitney_u: float
+    mann_whitney_p_value: float
+    ks_adjusted_p_value: float
+    mann_whitney_adjusted_p_value: float
+    alpha: float
+
+    @property
+    def relative_difference(self) -> float:
+        return (self.factory_mean - self.engine_mean) / self.engine_mean if self.engine_mean else math.nan
+
+    @property
+    def diverged(self) -> bool:
+        return min(self.ks_adjusted_p_value, self.mann_whitney_adjusted_p_value) < self.alpha
+
+
+class ConfigurationReport(BaseModel):
+    """
+    Engine and threaded factory runs of one configuration over the same seeds
+    """
+
+    values: Dict[str, Any]
+    engine: List[RunMeasure]
+    factory: List[RunMeasure]
+    metrics: List[MetricComparison]
+
+    @property
+    def unfinished(self) -> int:
+        return sum(not measure.finished for measure in self.engine + self.factory)
+
+    @property
+    def diverged(self) -> bool:
+        return bool(self.unfinished) or any(comparison.diverged for comparison in self.metrics)
+
+
+class EquivalenceReport(BaseModel):
+    """
+    Outcome of an equivalence check, a configuration diverges when a test rejects the equality of the distributions
+    of a measure at the alpha level, or when a run did not reach MAX_ROBOTS robots. The two tests of every measure
+    make a family per configuration whose p-values get the Holm-Bonferroni correction, so that the configuration
+    diverges by chance with a probability of at most alpha.
+    """
+
+    time_ratio: float
+    alpha: float
+    configurations: List[ConfigurationReport]
+
+    @property
+    def diverged(self) -> bool:
+        return any(configuration.diverged for configuration in self.configurations)
+
+    def format(self) -> str:
+        """
+        Returns the report as text
+        :return: report
+        """
+        tests: int = 2 * len(METRICS)
+        lines: List[str] = [
+            f"threaded factory at TIME_RATIO={self.time_ratio} against the engine, alpha={self.alpha} with the Holm "
+            f"correction over the {tests} tests of a configuration: the smallest p-value is compared to "
+            f"alpha/{tests}={self.alpha / tests:.3g}, the next ones to alpha/{tests - 1} to alpha"
+        ]
+        for configuration in self.configurations:
+            lines.append(
+                f"{configuration.values or 'default settings'}: {len(configuration.engine)} seeds, "
+                f"{configuration.unfinished} unfinished runs, {'DIVERGED' if configuration.diverged else 'equivalent'}"
+            )
+            for comparison in configuration.metrics:
+                lines.append(
+                    f"    {comparison.metric:>10}: engine {comparison.engine_mean:9.2f} ± {comparison.engine_std:7.2f}, "
+                    f"factory {comparison.factory_mean:9.2f} ± {comparison.factory_std:7.2f} "
+                    f"({comparison.relative_difference:+.1%}), KS D={comparison.ks_statistic:.3f} "
+                    f"p={comparison.ks_p_value:.3g} (adjusted {comparison.ks_adjusted_p_value:.3g}), "
+                    f"Mann-Whitney p={comparison.mann_whitney_p_value:.3g} "
+                    f"(adjusted {comparison.mann_whitney_adjusted_p_value:.3g})"
+                    f"{' DIVERGED' if comparison.diverged else ''}"
+                )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def patch_settings(values: Dict[str, Any]) -> Iterator[None]:
+    """
+    Replace values of the global settings the threaded factory reads, then restore them.
+    The values are assigned without validation, so that TIME_RATIO can go below the 0.1 floor of the settings.
+    :param values: values to replace
+    :return:
+    """
+    previous: Dict[str, Any] = {key: getattr(global_settings, key) for key in values}
+    try:
+        for key, value in values.items():
+            setattr(global_settings, key, value)
+        yield
+    finally:
+        for key, value in previous.items():
+            setattr(global_settings, key, value)
+
+
+def measure_simulation(settings_values: Dict[str, Any], seed: int) -> RunMeasure:
+    """
+    Run the engine
+    :param settings_values: simulation settings values
+    :param seed: random seed
+    :return: measure
+    """
+    result: SimulationResult = run_simulation(Settings(**settings_values), seed)
+    return RunMeasure(
+        seed=seed,
+        finished=result.robots >= settings_values["MAX_ROBOTS"],
+        time=result.time,
+        sales=result.sales,
+        assemblies=result.recipe_runs.get(RobotActivity.ASSEMBLING_FOOBAR.value, 0),
+    )
+
+
+def measure_factory(settings_values: Dict[str, Any], seed: int, time_ratio: float, timeout: float) -> RunMeasure:
+    """
+    Entrypoint of the worker processes: run the threaded factory, its measures are taken when it reaches MAX_ROBOTS
+    robots since the running robots still finish their activity afterwards
+    :param settings_values: settings values
+    :param seed: random seed
+    :param time_ratio: wall seconds per simulated second
+    :param timeout: wall seconds the factory is stopped at
+    :return: measure
+    """
+    with patch_settings({**settings_values, "TIME_RATIO": time_ratio}):
+        counts: Dict[RobotActivity, int] = {}
+        reached_at: List[float] = []
+
+        def count_activities() -> None:
+            for robot in list(factory.warehouse.robots):
+                for activity, count in list(robot.stats.activity_counts.items()):
+                    counts[activity] = counts.get(activity, 0) + count
+
+        def on_milestone(milestone: Milestone) -> None:
+            reached_at.append(milestone.time)
+            count_activities()
+
+        target: RobotsTarget = RobotsTarget(count=settings_values["MAX_ROBOTS"])
+        factory: Factory = Factory(
+            seed=seed,
+            stop_condition=target | WallTimeBudget(seconds=timeout),
+            milestones={MAX_ROBOTS_MILESTONE: target},
+            milestone_listeners=[on_milestone],
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            factory.run()
+            for robot in list(factory.warehouse.robots):
+                robot.join()
+            factory.monitoring_thread.join()
+        if not reached_at:
+            count_activities()
+        return RunMeasure(
+            seed=seed,
+            finished=bool(reached_at),
+            time=reached_at[0] if reached_at else factory.get_state().time,
+            sales=counts.get(RobotActivity.SELLING_FOOBARS, 0),
+            assemblies=counts.get(RobotActivity.ASSEMBLING_FOOBAR, 0),
+        )
+
+
+class EquivalenceHarness:
+    """
+    Check the engine behaves like the threaded Robot and Factory implementation.
+
+    Each configuration runs on the same seeds with the engine and with the threaded factory at a small TIME_RATIO.
+    The random draws of both are consumed in a different order, so the runs of a seed differ: the harness compares the
+    distributions of the time to MAX_ROBOTS robots, of the sales and of the assemblies with the Kolmogorov-Smirnov and
+    the Mann-Whitney tests, corrected for multiple testing. The threaded factories run in worker processes since they
+    read the global settings.
+    """
+
+    def __init__(
+        self,
+        base_settings: Settings = global_settings,
+        time_ratio: float = 0.01,
+        alpha: float = 0.01,
+        timeout: float = 600,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        :param base_settings: settings the configurations values are applied on
+        :param time_ratio: TIME_RATIO of the threaded factories
+        :param alpha: significance level of the tests
+        :param timeout: wall seconds a threaded factory is stopped at
+        :param max_workers: number of worker processes, the number of CPUs by default
+        """
+        if time_ratio <= 0:
+            raise ValueError("time_ratio has to be positive")
+        if not 0 < alpha < 1:
+            raise ValueError("alpha has to be between 0 and 1")
+        self.base_settings: Settings = base_settings
+        self.time_ratio: float = time_ratio
+        self.alpha: float = alpha
+        self.timeout: float = timeout
+        self.max_workers: Optional[int] = max_workers
+
+    def compare(self, engine: List[RunMeasure], factory: List[RunMeasure]) -> List[MetricComparison]:
+        """
+        Compare the distributions of every measure, the p-values are adjusted over all the tests
+        :param engine: engine measures
+        :param factory: threaded factory measures
+        :return: comparisons, in the METRICS order
+        """
+        tests: List[Dict[str, Any]] = []
+        for metric in METRICS:
+            engine_values: List[float] = [getattr(measure, metric) for measure in engine]
+            factory_values: List[float] = [getattr(measure, metric) for measure in factory]
+            engine_description: Dict[str, float] = describe(engine_values)
+            factory_description: Dict[str, float] = describe(factory_values)
+            ks_statistic, ks_p_value = ks_2samp(engine_values, factory_values)
+            u_statistic, u_p_value = mann_whitney_u(engine_values, factory_values)
+            tests.append(
+                {
+                    "metric": metric,
+                    "engine_mean": engine_description["mean"],
+                    "engine_std": engine_description["std"],
+                    "factory_mean": factory_description["mean"],
+                    "factory_std": factory_description["std"],
+                    "ks_statistic": ks_statistic,
+                    "ks_p_value": ks_p_value,
+                    "mann_whitney_u": u_statistic,
+                    "mann_whitney_p_value": u_p_value,
+                }
+            )
+        adjusted: List[float] = holm(
+            [p_value for test in tests for p_value in (test["ks_p_value"], test["mann_whitney_p_value"])]
+        )
+        return [
+            MetricComparison(
+                **test,
+                ks_adjusted_p_value=adjusted[2 * index],
+                mann_whitney_adjusted_p_value=adjusted[2 * index + 1],
+                alpha=self.alpha,
+            )
+            for index, test in enumerate(tests)
+        ]
+
+    def run(self, configurations: Iterable[Dict[str, Any]], seeds: Iterable[int]) -> EquivalenceReport:
+        """
+        Run every configuration with every seed on both implementations and compare them
+        :param configurations: settings values to override
+        :param seeds: random seeds
+        :return: report
+        """
+        seeds = list(seeds)
+        configurations = list(configurations)
+        planned: List[Tuple[Dict[str, Any], List[Future]]] = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for values in configurations:
+                settings_values: Dict[str, Any] = self.base_settings.override(values).dict()
+                planned.append(
+                    (
+                        values,
+                        [
+                            executor.submit(measure_factory, settings_values, seed, self.time_ratio, self.timeout)
+                            for seed in seeds
+                        ],
+                    )
+                )
+            reports: List[ConfigurationReport] = []
+            for values, futures in planned:
+                settings_values = self.base_settings.override(values).dict()
+                engine: List[RunMeasure] = [measure_simulation(settings_values, seed) for seed in seeds]
+                factory: List[RunMeasure] = [future.result() for future in futures]
+                reports.append(
+                    ConfigurationReport(
+                        values=values, engine=engine, factory=factory, metrics=self.compare(engine, factory)
+                    )
+                )
+        return EquivalenceReport(time_ratio=self.time_ratio, alpha=self.alpha, configurations=reports)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command line arguments
+    :return: arguments
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="foobartory.simulation.equivalence")
+    parser.add_argument("--seeds", type=int, default=30, help="number of seeds of each configuration")
+    parser.add_argument("--time-ratio", type=float, default=0.01, help="TIME_RATIO of the threaded factories")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level of the tests")
+    parser.add_argument("--timeout", type=float, default=600, help="wall seconds a threaded factory is stopped at")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument(
+        "--set",
+        metavar="NAME=VALUE",
+        action="append",
+        default=[],
+        help="setting of the configuration to check, the default settings if omitted",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments: argparse.Namespace = parse_arguments()
+    configuration: Dict[str, Any] = dict(value.split("=", 1) for value in arguments.set)
+    harness: EquivalenceHarness = EquivalenceHarness(
+        time_ratio=arguments.time_ratio, alpha=arguments.alpha, timeout=arguments.timeout, max_workers=arguments.workers
+    )
+    report: EquivalenceReport = harness.run([configuration], range(arguments.seeds))
+    print(report.format())
+    raise SystemExit(1 if report.diverged else 0)
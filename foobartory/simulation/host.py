@@ -0,0 +1,330 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition as ThreadCondition, Event, Lock, Thread
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from foobartory.core.conditions import Condition, Milestone
+from foobartory.core.models.recipe import RecipeBook
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.settings.settings import Settings, settings as default_settings
+from foobartory.simulation.branches import Branch, BranchRun, fork_branches
+from foobartory.simulation.engine import Simulation, SimulationResult
+
+# Tenant steps are pure Python and hold the GIL, more worker threads would only contend for it
+DEFAULT_WORKERS: int = 2
+
+
+class Tenant:
+    """
+    Factory hosted by a FactoryHost: a simulation paced on the wall clock with its own time ratio
+    """
+
+    def __init__(self, tenant_id: str, simulation: Simulation, time_ratio: float):
+        self.id: str = tenant_id
+        self.simulation: Simulation = simulation
+        self.time_ratio: float = time_ratio
+        self.wall_deadlines: List[float] = simulation.condition_monitor.get_wall_deadlines()
+        self.started_at: float = 0
+        self.lock: Lock = Lock()
+        self.finished_event: Event = Event()
+        self.dispatches: int = 0
+        self.processed_events: int = 0
+        self.max_lag: float = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_event.is_set()
+
+    def start(self, now: float) -> None:
+        """
+        Start the tenant clock
+        :param now: wall time
+        :return:
+        """
+        self.started_at = now
+        self.simulation.started_at = now
+
+    def get_next_deadline(self) -> Optional[float]:
+        """
+        Returns the wall time the tenant has something to do at, None when it is over
+        :return: wall time
+        """
+        if self.simulation.finished or not self.simulation.events:
+            return None
+        simulated_time: float = self.simulation.events[0][0]
+        if self.simulation.simulated_deadlines:
+            simulated_time = min(simulated_time, self.simulation.simulated_deadlines[0])
+        deadline: float = self.started_at + simulated_time * self.time_ratio
+        if self.wall_deadlines:
+            deadline = min(deadline, self.started_at + self.wall_deadlines[0])
+        return deadline
+
+    def advance(self, now: float, quantum: int) -> int:
+        """
+        Process the events due at a wall time, at most quantum of them
+        :param now: wall time
+        :param quantum: maximum number of events to process
+        :return: number of processed events
+        """
+        processed: int = 0
+        with self.lock:
+            self.dispatches += 1
+            while processed < quantum:
+                deadline: Optional[float] = self.get_next_deadline()
+                if deadline is None or deadline > now:
+                    break
+                self.max_lag = max(self.max_lag, now - deadline)
+                if self.wall_deadlines and deadline >= self.started_at + self.wall_deadlines[0]:
+                    self.wall_deadlines.pop(0)
+                    self.simulation.check_conditions()
+                else:
+                    self.simulation.step()
+                    processed += 1
+            self.processed_events += processed
+            if self.get_next_deadline() is None:
+                self.finished_event.set()
+        return processed
+
+    def get_state(self) -> WarehouseState:
+        """
+        Returns the tenant warehouse state
+        :return: warehouse state
+        """
+        with self.lock:
+            return self.simulation.get_state()
+
+    def get_result(self) -> SimulationResult:
+        """
+        Returns the tenant simulation result
+        :return: result
+        """
+        with self.lock:
+            return self.simulation.get_result()
+
+    def fork(self, branches: Dict[str, Branch]) -> Dict[str, BranchRun]:
+        """
+        Fork the tenant current state into what-if branches, the tenant goes on meanwhile.
+        The other threads of the process keep running during the fork: a hosted tenant is forked with
+        FactoryHost.fork_tenant, which first waits for the workers to be idle.
+        :param branches: branches configurations by name
+        :return: branch runs by name
+        """
+        with self.lock:
+            return fork_branches(self.simulation, branches)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the tenant to finish
+        :param timeout: timeout, in seconds
+        :return: if the tenant finished
+        """
+        return self.finished_event.wait(timeout)
+
+
+class FactoryHost:
+    """
+    Runs many independent factories with one scheduler thread and one worker pool.
+
+    Each tenant owns its simulation, settings and random stream, nothing is shared between tenants. The scheduler
+    keeps the tenants waiting for their next event in a heap ordered by wall time, and the due tenants in a ready
+    queue served in turn. A dispatch processes at most quantum events of one tenant, a tenant still late after it
+    goes back to the end of the ready queue: a busy tenant delays the others by one quantum at most.
+
+    The workers are threads: they overlap the tenants listeners waiting on I/O, but the simulations themselves run one
+    at a time under the GIL. Spreading the tenants over several hosts in separate processes is what scales with the
+    CPUs.
+    """
+
+    def __init__(self, workers: Optional[int] = None, quantum: int = 64):
+        if quantum < 1:
+            raise ValueError("quantum has to be positive")
+        self.workers: int = workers or DEFAULT_WORKERS
+        self.quantum: int = quantum
+        self.tenants: Dict[str, Tenant] = {}
+        self.waiting: List[Tuple[float, int, Tenant]] = []
+        self.ready: Deque[Tenant] = deque()
+        self.running: int = 0
+        self.paused: int = 0
+        self.sequence: Iterator[int] = itertools.count()
+        self.condition: ThreadCondition = ThreadCondition()
+        self.stop_event: Event = Event()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.scheduler: Optional[Thread] = None
+
+    def add_tenant(
+        self,
+        tenant_id: str,
+        settings: Settings = default_settings,
+        seed: Optional[int] = None,
+        time_ratio: Optional[float] = None,
+        state_listeners: Optional[List[Callable[[WarehouseState], None]]] = None,
+        stop_condition: Optional[Condition] = None,
+        milestones: Optional[Dict[str, Condition]] = None,
+        milestone_listeners: Optional[List[Callable[[Milestone], None]]] = None,
+        recipe_book: Optional[RecipeBook] = None,
+    ) -> Tenant:
+        """
+        Add a factory, it starts immediately
+        :param tenant_id: unique tenant id
+        :param settings: tenant settings
+        :param seed: random seed
+        :param time_ratio: wall seconds per simulated second, TIME_RATIO of the settings by default
+        :param state_listeners: functions receiving the tenant warehouse states
+        :param stop_condition: condition stopping the tenant, MAX_ROBOTS robots by default
+        :param milestones: conditions to report when they are met for the first time
+        :param milestone_listeners: functions receiving the reached milestones
+        :param recipe_book: recipes of the tenant, the foobar recipes by default
+        :return: tenant
+        """
+        simulation: Simulation = Simulation(
+            settings=settings,
+            seed=seed,
+            state_listeners=state_listeners,
+            stop_condition=stop_condition,
+            milestones=milestones,
+            milestone_listeners=milestone_listeners,
+            recipe_book=recipe_book,
+        )
+        tenant: Tenant = Tenant(tenant_id, simulation, settings.TIME_RATIO if time_ratio is None else time_ratio)
+        with self.condition:
+            if tenant_id in self.tenants:
+                raise ValueError(f"tenant {tenant_id} already exists")
+            self.tenants[tenant_id] = tenant
+            tenant.start(time.perf_counter())
+            self.schedule(tenant)
+            self.condition.notify()
+        return tenant
+
+    def remove_tenant(self, tenant_id: str) -> Tenant:
+        """
+        Remove a factory, it is not scheduled anymore
+        :param tenant_id: tenant id
+        :return: removed tenant
+        """
+        with self.condition:
+            tenant: Tenant = self.tenants.pop(tenant_id)
+            self.waiting = [entry for entry in self.waiting if entry[2] is not tenant]
+            heapq.heapify(self.waiting)
+            if tenant in self.ready:
+                self.ready.remove(tenant)
+        return tenant
+
+    def fork_tenant(self, tenant_id: str, branches: Dict[str, Branch]) -> Dict[str, BranchRun]:
+        """
+        Fork a tenant current state into what-if branches from a quiesced host: the scheduler stops dispatching and
+        the running quanta finish first, so that no thread holds a lock the branches could need while forking
+        :param tenant_id: tenant id
+        :param branches: branches configurations by name
+        :return: branch runs by name
+        """
+        with self.condition:
+            tenant: Tenant = self.tenants[tenant_id]
+            self.paused += 1
+            try:
+                self.condition.wait_for(lambda: self.running == 0)
+                return tenant.fork(branches)
+            finally:
+                self.paused -= 1
+                self.condition.notify_all()
+
+    def schedule(self, tenant: Tenant) -> None:
+        """
+        Queue a tenant for its next deadline, the lock has to be held
+        :param tenant: tenant
+        :return:
+        """
+        deadline: Optional[float] = tenant.get_next_deadline()
+        if deadline is None:
+            tenant.finished_event.set()
+        elif self.tenants.get(tenant.id) is tenant:
+            heapq.heappush(self.waiting, (deadline, next(self.sequence), tenant))
+
+    def admit_due_tenants(self, now: float) -> None:
+        """
+        Move the tenants due at a wall time to the ready queue, the lock has to be held
+        :param now: wall time
+        :return:
+        """
+        while self.waiting and self.waiting[0][0] <= now:
+            self.ready.append(heapq.heappop(self.waiting)[2])
+
+    def process_tenant(self, tenant: Tenant) -> None:
+        """
+        Worker task: advance a tenant by one quantum then queue it again
+        :param tenant: tenant
+        :return:
+        """
+        try:
+            tenant.advance(time.perf_counter(), self.quantum)
+        finally:
+            with self.condition:
+                self.running -= 1
+                deadline: Optional[float] = tenant.get_next_deadline()
+                if deadline is not None and deadline <= time.perf_counter():
+                    if self.tenants.get(tenant.id) is tenant:
+                        self.ready.append(tenant)
+                else:
+                    self.schedule(tenant)
+                self.condition.notify_all()
+
+    def run_scheduler(self) -> None:
+        """
+        Scheduler thread: hand the due tenants to the workers, in turn
+        :return:
+        """
+        with self.condition:
+            while not self.stop_event.is_set():
+                self.admit_due_tenants(time.perf_counter())
+                while self.ready and self.running < self.workers and not self.paused:
+                    self.running += 1
+                    self.executor.submit(self.process_tenant, self.ready.popleft())
+                timeout: Optional[float] = None
+                if self.waiting and self.running < self.workers:
+                    timeout = max(self.waiting[0][0] - time.perf_counter(), 0)
+                self.condition.wait(timeout)
+
+    def start(self) -> None:
+        """
+        Start the scheduler and the workers
+        :return:
+        """
+        self.stop_event.clear()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="factory-host")
+        self.scheduler = Thread(target=self.run_scheduler, name="factory-host-scheduler", daemon=True)
+        self.scheduler.start()
+
+    def stop(self) -> None:
+        """
+        Stop the scheduler, the running quanta finish first
+        :return:
+        """
+        with self.condition:
+            self.stop_event.set()
+            self.condition.notify()
+        if self.scheduler is not None:
+            self.scheduler.join()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for every tenant to finish
+        :param timeout: timeout, in seconds
+        :return: if every tenant finished
+        """
+        deadline: Optional[float] = None if timeout is None else time.perf_counter() + timeout
+        for tenant in list(self.tenants.values()):
+            remaining: Optional[float] = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            if not tenant.wait(remaining):
+                return False
+        return True
+
+    def __enter__(self) -> "FactoryHost":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
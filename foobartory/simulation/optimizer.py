@@ -0,0 +1,260 @@
+import argparse
+import math
+import random
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from foobartory.core.conditions import Condition, RobotsTarget, SimulatedTimeBudget
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.strategy import Strategy
+from foobartory.settings.settings import Settings, settings as default_settings
+from foobartory.simulation.engine import SimulationResult
+from foobartory.simulation.result_cache import ResultCache
+from foobartory.simulation.sweep import get_run_key, run_sweep_simulation
+
+SearchSpace = Dict[str, Tuple[int, int]]
+
+
+def get_default_search_space(settings: Settings = default_settings) -> SearchSpace:
+    """
+    Returns the (min, max) of the strategy parameters tuned by default: the foobars batch to sell, the foos kept for
+    the robots, and the foos and bars to mine before the others
+    :param settings: settings
+    :return: search space
+    """
+    return {
+        f"batch_min.{RobotActivity.SELLING_FOOBARS.value}": (1, settings.ROBOT_SELLING_FOOBARS_MAX),
+        "reserves.foo": (0, settings.ROBOT_FOO_COST),
+        "targets.foo": (1, 3 * settings.ROBOT_FOO_COST),
+        "targets.bar": (0, 5),
+    }
+
+
+class CandidateScore(BaseModel):
+    """
+    Score of a strategy over the seeds it was evaluated on
+    """
+
+    strategy: Strategy
+    mean_time: float
+    seeds: int
+    finished: int
+
+
+class OptimizationRound(BaseModel):
+    """
+    One round of the search: every candidate left evaluated on the same seeds, best first
+    """
+
+    seeds: int
+    scores: List[CandidateScore]
+
+
+class OptimizationResult(BaseModel):
+    """
+    Outcome of a search, the best candidate and the default strategy are scored on seeds the rounds did not use so
+    that the improvement is not biased by the selection
+    """
+
+    best: CandidateScore
+    baseline: CandidateScore
+    rounds: List[OptimizationRound]
+    evaluations: int
+    cached_evaluations: int
+
+    @property
+    def improvement(self) -> float:
+        return self.baseline.mean_time - self.best.mean_time
+
+
+class StrategyOptimizer:
+    """
+    Search the planner strategy reaching MAX_ROBOTS robots the fastest, with the engine as objective.
+
+    The candidates are raced by successive halving: they all start on a few seeds, then each round keeps the best
+    fraction of them and evaluates the survivors on more seeds, so most of the simulations go to the promising
+    strategies. A simulation stops at the time budget, a run not reaching MAX_ROBOTS scores the budget. The runs are
+    computed by a process pool and cached like the sweep ones, later rounds only compute the seeds they add.
+    """
+
+    def __init__(
+        self,
+        settings: Settings = default_settings,
+        search_space: Optional[SearchSpace] = None,
+        time_budget: float = 3600,
+        cache: Optional[ResultCache] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        :param settings: settings of the simulations
+        :param search_space: (min, max) of each strategy parameter, the default search space if None
+        :param time_budget: simulated seconds a simulation is stopped at
+        :param cache: results cache, the default on disk cache if None
+        :param max_workers: number of worker processes, the number of CPUs by default
+        """
+        if time_budget <= 0:
+            raise ValueError("time_budget has to be positive")
+        self.settings: Settings = settings
+        self.search_space: SearchSpace = (
+            search_space if search_space is not None else get_default_search_space(settings)
+        )
+        self.time_budget: float = time_budget
+        self.stop_condition: Condition = RobotsTarget(count=settings.MAX_ROBOTS) | SimulatedTimeBudget(
+            seconds=time_budget
+        )
+        self.cache: ResultCache = cache if cache is not None else ResultCache()
+        self.max_workers: Optional[int] = max_workers
+        self.evaluations: int = 0
+        self.cached_evaluations: int = 0
+
+    def sample(self, samples: int, seed: Optional[int] = None) -> List[Strategy]:
+        """
+        Returns distinct strategies drawn uniformly in the search space, the stock levels being integers so are the
+        parameters
+        :param samples: maximum number of strategies
+        :param seed: random seed
+        :return: strategies
+        """
+        generator: random.Random = random.Random(seed)
+        strategies: List[Strategy] = []
+        for _ in range(samples):
+            strategy: Strategy = Strategy.from_parameters(
+                {name: generator.randint(int(low), int(high)) for name, (low, high) in self.search_space.items()}
+            )
+            if strategy not in strategies:
+                strategies.append(strategy)
+        return strategies
+
+    def get_score(self, result: SimulationResult) -> float:
+        """
+        Returns the time a simulation reached MAX_ROBOTS robots at, the time budget if it did not
+        :param result: simulation result
+        :return: score, lower is better
+        """
+        return result.time if result.robots >= self.settings.MAX_ROBOTS else self.time_budget
+
+    def evaluate(self, executor: Executor, strategies: List[Strategy], seeds: List[int]) -> List[CandidateScore]:
+        """
+        Run the strategies on the seeds, cached results are not computed again
+        :param executor: executor running the simulations
+        :param strategies: strategies
+        :param seeds: random seeds
+        :return: scores, in the strategies order
+        """
+        keys: List[List[str]] = [
+            [get_run_key(self.settings, seed, self.stop_condition, strategy) for seed in seeds]
+            for strategy in strategies
+        ]
+        results: Dict[str, str] = {}
+        futures: Dict[str, Future] = {}
+        for strategy, strategy_keys in zip(strategies, keys):
+            for seed, key in zip(seeds, strategy_keys):
+                if key in results or key in futures:
+                    continue
+                cached_result: Optional[str] = self.cache.get(key)
+                if cached_result is None:
+                    futures[key] = executor.submit(
+                        run_sweep_simulation, self.settings.dict(), seed, self.stop_condition, strategy.dict()
+                    )
+                else:
+                    results[key] = cached_result
+                    self.cached_evaluations += 1
+        for key, future in futures.items():
+            results[key] = future.result()
+            self.cache.set(key, results[key])
+            self.evaluations += 1
+        scores: List[CandidateScore] = []
+        for strategy, strategy_keys in zip(strategies, keys):
+            strategy_results: List[SimulationResult] = [
+                SimulationResult.parse_raw(results[key]) for key in strategy_keys
+            ]
+            strategy_scores: List[float] = [self.get_score(result) for result in strategy_results]
+            scores.append(
+                CandidateScore(
+                    strategy=strategy,
+                    mean_time=sum(strategy_scores) / len(strategy_scores),
+                    seeds=len(seeds),
+                    finished=sum(score < self.time_budget for score in strategy_scores),
+                )
+            )
+        return scores
+
+    def optimize(
+        self,
+        candidates: Union[int, List[Strategy]] = 64,
+        seeds: int = 32,
+        min_seeds: int = 4,
+        reduction: int = 2,
+        seed: Optional[int] = None,
+    ) -> OptimizationResult:
+        """
+        Race the candidates by successive halving, the default strategy always takes part. The winner is then compared
+        to the default strategy on as many held-out seeds.
+        :param candidates: strategies to race, or the number of strategies to sample in the search space
+        :param seeds: number of seeds the last candidates are evaluated on
+        :param min_seeds: number of seeds of the first round
+        :param reduction: each round keeps 1 / reduction of the candidates and multiplies the seeds by reduction
+        :param seed: random seed of the sampling
+        :return: optimization result
+        """
+        if reduction < 2:
+            raise ValueError("reduction has to be at least 2")
+        if not 1 <= min_seeds <= seeds:
+            raise ValueError("min_seeds has to be between 1 and seeds")
+        strategies: List[Strategy] = [Strategy()]
+        for strategy in candidates if isinstance(candidates, list) else self.sample(candidates, seed):
+            if strategy not in strategies:
+                strategies.append(strategy)
+        rounds: List[OptimizationRound] = []
+        round_seeds: int = min_seeds
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                scores: List[CandidateScore] = sorted(
+                    self.evaluate(executor, strategies, list(range(round_seeds))),
+                    key=lambda score: score.mean_time,
+                )
+                rounds.append(OptimizationRound(seeds=round_seeds, scores=scores))
+                if len(scores) == 1:
+                    break
+                strategies = [score.strategy for score in scores[: math.ceil(len(scores) / reduction)]]
+                round_seeds = min(round_seeds * reduction, seeds)
+            best, baseline = self.evaluate(executor, [strategies[0], Strategy()], list(range(seeds, 2 * seeds)))
+        return OptimizationResult(
+            best=best,
+            baseline=baseline,
+            rounds=rounds,
+            evaluations=self.evaluations,
+            cached_evaluations=self.cached_evaluations,
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command line arguments
+    :return: arguments
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="foobartory.simulation.optimizer")
+    parser.add_argument("--output", metavar="PATH", default="strategy.json", help="best strategy file")
+    parser.add_argument("--candidates", type=int, default=64, help="number of strategies to sample")
+    parser.add_argument("--seeds", type=int, default=32, help="number of seeds of the last round")
+    parser.add_argument("--min-seeds", type=int, default=4, help="number of seeds of the first round")
+    parser.add_argument("--time-budget", type=float, default=3600, help="simulated seconds a run is stopped at")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--seed", type=int, help="random seed of the sampling")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments: argparse.Namespace = parse_arguments()
+    optimizer: StrategyOptimizer = StrategyOptimizer(time_budget=arguments.time_budget, max_workers=arguments.workers)
+    optimization: OptimizationResult = optimizer.optimize(
+        candidates=arguments.candidates, seeds=arguments.seeds, min_seeds=arguments.min_seeds, seed=arguments.seed
+    )
+    Path(arguments.output).write_text(optimization.best.strategy.json(indent=2))
+    print(f"{len(optimization.rounds)} rounds, {optimization.evaluations} simulations")
+    print(f"Default strategy: {optimization.baseline.mean_time:.1f}s to {default_settings.MAX_ROBOTS} robots")
+    print(f"Best strategy: {optimization.best.mean_time:.1f}s, {optimization.best.strategy}")
+    print(f"Saved to {arguments.output}, run it with: python -m foobartory.main --strategy {arguments.output}")
@@ -0,0 +1,77 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH: Path = Path(__file__).parents[2].resolve() / ".cache" / "simulation_results.sqlite3"
+
+
+class ResultCache:
+    """
+    On disk key/value cache of simulation results, the least recently used entries are evicted
+    when the cache holds more than max_entries results
+    """
+
+    # Logical clock, the entries are ordered by last access without relying on the system time resolution
+    NEXT_ACCESS: str = "SELECT COALESCE(MAX(accessed_at), 0) + 1 FROM results"
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = 100_000):
+        if max_entries < 1:
+            raise ValueError("max_entries has to be positive")
+        self.path: Path = Path(path)
+        self.max_entries: int = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection: sqlite3.Connection = sqlite3.connect(str(self.path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        self.connection.commit()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the value cached for this key
+        :param key: cache key
+        :return: cached value or None
+        """
+        row = self.connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute(f"UPDATE results SET accessed_at = ({self.NEXT_ACCESS}) WHERE key = ?", (key,))
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Cache a value, then evict the oldest entries if the cache is full
+        :param key: cache key
+        :param value: value to cache
+        :return:
+        """
+        with self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO results (key, value, accessed_at) VALUES (?, ?, ({self.NEXT_ACCESS}))",
+                (key, value),
+            )
+            self.connection.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """
+        Remove all the cached values
+        :return:
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        """
+        Close the cache database
+        :return:
+        """
+        self.connection.close()
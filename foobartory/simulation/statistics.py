@@ -0,0 +1,114 @@
+import math
+from typing import Dict, List, Sequence, Tuple
+
+
+def ks_2samp(sample: Sequence[float], other: Sequence[float]) -> Tuple[float, float]:
+    """
+    Two sided two sample Kolmogorov-Smirnov test: the largest distance between the empirical distribution functions
+    and its asymptotic p-value, with the Stephens correction for small samples
+    :param sample: first sample
+    :param other: second sample
+    :return: statistic, p-value
+    """
+    if not sample or not other:
+        raise ValueError("the samples must not be empty")
+    values: List[Tuple[float, int]] = sorted([(value, 0) for value in sample] + [(value, 1) for value in other])
+    sizes: Tuple[int, int] = (len(sample), len(other))
+    counts: List[int] = [0, 0]
+    statistic: float = 0
+    for index, (value, origin) in enumerate(values):
+        counts[origin] += 1
+        # Tied values are steps of both distribution functions, the distance is only measured after the last of them
+        if index + 1 < len(values) and values[index + 1][0] == value:
+            continue
+        statistic = max(statistic, abs(counts[0] / sizes[0] - counts[1] / sizes[1]))
+    effective_size: float = math.sqrt(sizes[0] * sizes[1] / (sizes[0] + sizes[1]))
+    return statistic, kolmogorov_survival((effective_size + 0.12 + 0.11 / effective_size) * statistic)
+
+
+def kolmogorov_survival(value: float) -> float:
+    """
+    Returns P(K > value) for the Kolmogorov distribution
+    :param value: value
+    :return: probability
+    """
+    if value < 0.2:
+        return 1.0
+    probability: float = 0
+    for term in range(1, 101):
+        addend: float = (-1) ** (term - 1) * math.exp(-2 * term * term * value * value)
+        probability += addend
+        if abs(addend) < 1e-12:
+            break
+    return min(max(2 * probability, 0.0), 1.0)
+
+
+def rank(values: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """
+    Returns the ranks of the values, starting at 1, tied values get their average rank
+    :param values: values
+    :return: ranks in the values order, sizes of the groups of tied values
+    """
+    order: List[int] = sorted(range(len(values)), key=values.__getitem__)
+    ranks: List[float] = [0] * len(values)
+    ties: List[int] = []
+    start: int = 0
+    while start < len(order):
+        end: int = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        ties.append(end - start + 1)
+        start = end + 1
+    return ranks, ties
+
+
+def mann_whitney_u(sample: Sequence[float], other: Sequence[float]) -> Tuple[float, float]:
+    """
+    Two sided Mann-Whitney U test with the normal approximation, corrected for ties and continuity
+    :param sample: first sample
+    :param other: second sample
+    :return: U statistic of the first sample, p-value
+    """
+    if not sample or not other:
+        raise ValueError("the samples must not be empty")
+    size: int = len(sample)
+    other_size: int = len(other)
+    ranks, ties = rank(list(sample) + list(other))
+    statistic: float = sum(ranks[:size]) - size * (size + 1) / 2
+    mean: float = size * other_size / 2
+    total: int = size + other_size
+    tie_correction: float = sum(tie**3 - tie for tie in ties) / (total * (total - 1)) if total > 1 else 0
+    variance: float = size * other_size / 12 * (total + 1 - tie_correction)
+    if variance <= 0:
+        return statistic, 1.0
+    z: float = max(abs(statistic - mean) - 0.5, 0) / math.sqrt(variance)
+    return statistic, min(math.erfc(z / math.sqrt(2)), 1.0)
+
+
+def holm(p_values: Sequence[float]) -> List[float]:
+    """
+    Holm-Bonferroni adjusted p-values: a family of tests rejected where the adjusted p-value is below alpha keeps the
+    probability of any false rejection below alpha
+    :param p_values: p-values of the family
+    :return: adjusted p-values, in the p-values order
+    """
+    adjusted: List[float] = [0] * len(p_values)
+    largest: float = 0
+    for position, index in enumerate(sorted(range(len(p_values)), key=p_values.__getitem__)):
+        largest = max(largest, min((len(p_values) - position) * p_values[index], 1.0))
+        adjusted[index] = largest
+    return adjusted
+
+
+def describe(values: Sequence[float]) -> Dict[str, float]:
+    """
+    Returns the mean and the sample standard deviation of the values
+    :param values: values
+    :return: mean and std
+    """
+    mean: float = sum(values) / len(values) if values else math.nan
+    if len(values) < 2:
+        return {"mean": mean, "std": 0.0 if values else math.nan}
+    return {"mean": mean, "std": math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1))}
@@ -0,0 +1,166 @@
+import hashlib
+import itertools
+import json
+import random
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from foobartory.core.conditions import Condition
+from foobartory.core.models.strategy import Strategy
+from foobartory.settings.settings import Settings, settings as default_settings
+from foobartory.simulation.engine import ENGINE_VERSION, SimulationResult, run_simulation
+from foobartory.simulation.result_cache import ResultCache
+
+
+class SweepRun(BaseModel):
+    """
+    One simulation of a sweep
+    """
+
+    values: Dict[str, Any]
+    seed: int
+    key: str
+    cached: bool
+    result: SimulationResult
+
+
+def get_run_key(
+    settings: Settings, seed: int, stop_condition: Optional[Condition] = None, strategy: Optional[Strategy] = None
+) -> str:
+    """
+    Returns the cache key of a simulation, it changes with the settings, seed, stop condition, strategy or engine
+    version
+    :param settings: simulation settings
+    :param seed: random seed
+    :param stop_condition: simulation stop condition
+    :param strategy: planner strategy
+    :return: cache key
+    """
+    if stop_condition is not None and stop_condition.get_wall_deadlines():
+        raise ValueError("simulations stopped on wall time budgets are not reproducible, they cannot be cached")
+    values: Dict[str, Any] = {
+        "settings": settings.dict(),
+        "seed": seed,
+        "stop_condition": repr(stop_condition),
+        "engine": ENGINE_VERSION,
+    }
+    if strategy is not None and strategy.get_parameters():
+        values["strategy"] = strategy.dict()
+    payload: str = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def run_sweep_simulation(
+    settings_values: Dict[str, Any],
+    seed: int,
+    stop_condition: Optional[Condition],
+    strategy_values: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Entrypoint of the sweep worker processes
+    :param settings_values: simulation settings values
+    :param seed: random seed
+    :param stop_condition: simulation stop condition
+    :param strategy_values: planner strategy values
+    :return: simulation result, as json
+    """
+    strategy: Optional[Strategy] = Strategy(**strategy_values) if strategy_values is not None else None
+    return run_simulation(Settings(**settings_values), seed, stop_condition=stop_condition, strategy=strategy).json()
+
+
+class Sweep:
+    """
+    Run simulations over a set of settings values and seeds in parallel,
+    the results are cached on disk so that only new simulations are computed
+    """
+
+    def __init__(
+        self,
+        base_settings: Settings = default_settings,
+        cache: Optional[ResultCache] = None,
+        max_workers: Optional[int] = None,
+        stop_condition: Optional[Condition] = None,
+    ):
+        """
+        :param base_settings: settings the swept values are applied on
+        :param cache: results cache, the default on disk cache if None
+        :param max_workers: number of worker processes, the number of CPUs by default
+        :param stop_condition: condition stopping the simulations early, MAX_ROBOTS robots by default, it cannot
+            depend on the wall time
+        """
+        if stop_condition is not None and stop_condition.get_wall_deadlines():
+            raise ValueError("simulations stopped on wall time budgets are not reproducible, they cannot be cached")
+        self.base_settings: Settings = base_settings
+        self.stop_condition: Optional[Condition] = stop_condition
+        self.cache: ResultCache = cache if cache is not None else ResultCache()
+        self.max_workers: Optional[int] = max_workers
+
+    @staticmethod
+    def grid(values: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns every combination of the values
+        :param values: values to try for each setting
+        :return: settings values
+        """
+        names: List[str] = list(values)
+        return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+    @staticmethod
+    def random_samples(
+        ranges: Dict[str, Tuple[float, float]], samples: int, seed: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns values drawn uniformly in the ranges, integer settings get integer values
+        :param ranges: (min, max) of each setting
+        :param samples: number of samples
+        :param seed: random seed
+        :return: settings values
+        """
+        generator: random.Random = random.Random(seed)
+        configurations: List[Dict[str, Any]] = []
+        for _ in range(samples):
+            configuration: Dict[str, Any] = {}
+            for name, (low, high) in ranges.items():
+                if Settings.__fields__[name].outer_type_ is int:
+                    configuration[name] = generator.randint(int(low), int(high))
+                else:
+                    configuration[name] = generator.uniform(low, high)
+            configurations.append(configuration)
+        return configurations
+
+    def run(self, configurations: Iterable[Dict[str, Any]], seeds: Iterable[int]) -> List[SweepRun]:
+        """
+        Run every configuration with every seed, cached results are not computed again
+        :param configurations: settings values to override
+        :param seeds: random seeds
+        :return: runs, in the configurations then seeds order
+        """
+        seeds = list(seeds)
+        planned: List[Tuple[Dict[str, Any], int, str, bool]] = []
+        results: Dict[str, str] = {}
+        pending: Dict[str, Tuple[Settings, int]] = {}
+        for values in configurations:
+            run_settings: Settings = self.base_settings.override(values)
+            for seed in seeds:
+                key: str = get_run_key(run_settings, seed, self.stop_condition)
+                cached_result: Optional[str] = results.get(key) or self.cache.get(key)
+                if cached_result is None:
+                    pending[key] = (run_settings, seed)
+                else:
+                    results[key] = cached_result
+                planned.append((values, seed, key, cached_result is not None))
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures: Dict[str, Future] = {
+                    key: executor.submit(run_sweep_simulation, run_settings.dict(), seed, self.stop_condition)
+                    for key, (run_settings, seed) in pending.items()
+                }
+                for key, future in futures.items():
+                    results[key] = future.result()
+                    self.cache.set(key, results[key])
+        return [
+            SweepRun(values=values, seed=seed, key=key, cached=cached, result=SimulationResult.parse_raw(results[key]))
+            for values, seed, key, cached in planned
+        ]
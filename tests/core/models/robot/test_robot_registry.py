@@ -0,0 +1,97 @@
+from threading import Thread
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.robot.robot_registry import RobotRegistry
+from foobartory.core.models.warehouse import Warehouse
+from foobartory.core.robot import Robot
+
+
+class TestRobotRegistry:
+    def setup_method(self):
+        self.warehouse: Warehouse = Warehouse()
+        self.registry: RobotRegistry = self.warehouse.robots
+
+    def add_robot(self) -> Robot:
+        """
+        Register a new robot in the registry
+        :return: the new robot
+        """
+        robot: Robot = Robot(robot_id=self.registry.next_id(), warehouse=self.warehouse, stop_event=Mock())
+        self.registry.add(robot)
+        return robot
+
+    def test_next_id_unique_across_threads(self):
+        """
+        Test the next_id method, ids have to be unique even if they are requested concurrently
+        :return:
+        """
+        ids: List[int] = []
+
+        def request_ids():
+            for _ in range(1000):
+                ids.append(self.registry.next_id())
+
+        threads: List[Thread] = [Thread(target=request_ids) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(ids)) == 4000
+
+    def test_add(self):
+        """
+        Test the add method
+        :return:
+        """
+        robot: Robot = self.add_robot()
+
+        assert len(self.registry) == 1
+        assert robot.id in self.registry
+        assert self.registry.get(robot.id) is robot
+        assert list(self.registry) == [robot]
+        assert self.registry.count_by_activity(RobotActivity.MINING_FOO) == 1
+
+    def test_add_twice(self):
+        """
+        Test the add method with an already registered robot
+        :return:
+        """
+        robot: Robot = self.add_robot()
+        with pytest.raises(ValueError):
+            self.registry.add(robot)
+
+    def test_update_activity(self):
+        """
+        Test the update_activity method
+        :return:
+        """
+        robot: Robot = self.add_robot()
+        self.add_robot()
+
+        self.registry.update_activity(robot, RobotActivity.MINING_BAR)
+
+        assert robot.activity == RobotActivity.MINING_BAR
+        assert self.registry.count_by_activity(RobotActivity.MINING_FOO) == 1
+        assert self.registry.count_by_activity(RobotActivity.MINING_BAR) == 1
+
+    def test_get(self, mocker):
+        """
+        Test the get method returns the registered robot and its counters
+        :param mocker: pytest mocker
+        :return:
+        """
+        mocker.patch.object(Robot, "wait")
+        robot: Robot = self.add_robot()
+        robot.mine_foo()
+        robot.move()
+
+        stats = self.registry.get(robot.id).stats
+        assert stats.items_produced == 1
+        assert stats.moves == 1
+        assert RobotActivity.MINING_FOO in stats.activity_durations
+        assert stats.activity_counts == {RobotActivity.MINING_FOO: 1}
@@ -0,0 +1,73 @@
+from foobartory.core.models.histogram import Histogram, format_duration
+
+
+class TestHistogram:
+    def setup_method(self):
+        self.histogram: Histogram = Histogram()
+
+    def test_record(self):
+        """
+        Test the values land in their log2 bucket
+        :return:
+        """
+        for value in [0, 0.75, 1, 1.5, 3]:
+            self.histogram.record(value)
+
+        assert self.histogram.buckets == {-20: 1, 0: 1, 1: 2, 2: 1}
+        assert self.histogram.count == 5
+        assert self.histogram.total == 6.25
+        assert self.histogram.max == 3
+        assert self.histogram.mean == 1.25
+
+    def test_merge(self):
+        """
+        Test the merge method
+        :return:
+        """
+        other: Histogram = Histogram()
+        other.record(1)
+        self.histogram.record(1)
+        self.histogram.record(5)
+        self.histogram.merge(other)
+
+        assert self.histogram.buckets == {1: 2, 3: 1}
+        assert self.histogram.count == 3
+        assert self.histogram.max == 5
+
+    def test_quantile(self):
+        """
+        Test the quantiles are the upper bounds of their buckets
+        :return:
+        """
+        assert self.histogram.quantile(0.5) == 0
+        for value in [0.1] * 98 + [1, 3]:
+            self.histogram.record(value)
+
+        assert self.histogram.quantile(0.5) == 0.125
+        assert self.histogram.quantile(0.99) == 2
+        assert self.histogram.quantile(1) == 3
+
+    def test_format(self):
+        """
+        Test the format method gives one line per bucket
+        :return:
+        """
+        assert self.histogram.format() == ["    (empty)"]
+        self.histogram.record(0.001)
+        self.histogram.record(0.0011)
+        self.histogram.record(1)
+
+        lines = self.histogram.format(width=10)
+
+        assert len(lines) == 2
+        assert lines[0].endswith("########## 2")
+        assert lines[1].endswith("#####      1")
+
+    def test_format_duration(self):
+        """
+        Test the format_duration function
+        :return:
+        """
+        assert format_duration(0.0000015) == "2µs"
+        assert format_duration(0.0015) == "1.5ms"
+        assert format_duration(15) == "15.00s"
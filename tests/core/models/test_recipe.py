@@ -0,0 +1,76 @@
+import pytest
+from pydantic import ValidationError
+
+from foobartory.core.models.recipe import Recipe, RecipeBook
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.settings.settings import settings
+
+
+class TestRecipe:
+    def test_validate_values(self):
+        """
+        Test the recipe values validation
+        :return:
+        """
+        with pytest.raises(ValidationError):
+            Recipe(name="mining", duration_min=2, duration_max=1)
+        with pytest.raises(ValidationError):
+            Recipe(name="selling", batch_min=3, batch_max=2)
+        with pytest.raises(ValidationError):
+            Recipe(name="printing", outputs={"money": 1})
+        with pytest.raises(ValidationError):
+            Recipe(name="recycling", inputs={"robot": 1})
+
+
+class TestRecipeBook:
+    def setup_method(self):
+        self.recipe_book: RecipeBook = RecipeBook.from_settings(settings)
+
+    def test_from_settings(self):
+        """
+        Test the foobar recipes follow the settings
+        :return:
+        """
+        assert [recipe.name for recipe in self.recipe_book.recipes] == [
+            RobotActivity.MINING_FOO.value,
+            RobotActivity.MINING_BAR.value,
+            RobotActivity.ASSEMBLING_FOOBAR.value,
+            RobotActivity.SELLING_FOOBARS.value,
+            RobotActivity.BUYING_ROBOT.value,
+        ]
+        assert self.recipe_book.goal.inputs == {"money": settings.ROBOT_COST, "foo": settings.ROBOT_FOO_COST}
+        assert self.recipe_book.recipes[3].batch_min == settings.ROBOT_SELLING_FOOBARS_MIN
+        assert self.recipe_book.recipes[3].batch_min_exclusive
+
+    def test_get_resources(self):
+        """
+        Test the get_resources method
+        :return:
+        """
+        assert self.recipe_book.get_resources() == ["foo", "bar", "foobar", "money"]
+
+    def test_validate_recipes(self):
+        """
+        Test the production graph validation
+        :return:
+        """
+        buy: Recipe = Recipe(name="buying robot", inputs={"money": 1}, outputs={"robot": 1})
+        sell: Recipe = Recipe(name="selling", inputs={"foo": 1}, sale_value=1)
+        mine: Recipe = Recipe(name="mining", outputs={"foo": 1})
+        RecipeBook(recipes=[mine, sell, buy])
+        with pytest.raises(ValidationError, match="unique"):
+            RecipeBook(recipes=[mine, mine, sell, buy])
+        with pytest.raises(ValidationError, match="exactly one"):
+            RecipeBook(recipes=[mine, sell])
+        with pytest.raises(ValidationError, match="no recipe produces foo"):
+            RecipeBook(recipes=[sell, buy])
+        with pytest.raises(ValidationError, match="cyclic"):
+            RecipeBook(
+                recipes=[
+                    mine,
+                    sell,
+                    buy,
+                    Recipe(name="splitting", inputs={"foo": 1}, outputs={"bar": 2}),
+                    Recipe(name="joining", inputs={"bar": 2}, outputs={"foo": 1}),
+                ]
+            )
@@ -0,0 +1,28 @@
+import pytest
+
+from foobartory.core.models.strategy import Strategy
+
+
+class TestStrategy:
+    def test_from_parameters(self):
+        """
+        Test the strategy is built from flat parameters
+        :return:
+        """
+        strategy: Strategy = Strategy.from_parameters(
+            {"batch_min.selling foobar": 4, "reserves.foo": 2, "targets.foo": 9}
+        )
+
+        assert strategy == Strategy(batch_min={"selling foobar": 4}, reserves={"foo": 2}, targets={"foo": 9})
+        assert Strategy.from_parameters(strategy.get_parameters()) == strategy
+        assert Strategy.from_parameters({}) == Strategy()
+
+    def test_from_parameters_unknown(self):
+        """
+        Test the unknown parameters are refused
+        :return:
+        """
+        with pytest.raises(ValueError):
+            Strategy.from_parameters({"speed.foo": 1})
+        with pytest.raises(ValueError):
+            Strategy.from_parameters({"reserves": 1})
@@ -0,0 +1,109 @@
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from foobartory.core.conditions import (
+    AllOf,
+    AnyOf,
+    BalanceTarget,
+    Condition,
+    ConditionMonitor,
+    FoobarsTarget,
+    Milestone,
+    RobotsTarget,
+    SimulatedTimeBudget,
+    WallTimeBudget,
+)
+from foobartory.core.models.warehouse_state import WarehouseState
+
+
+def get_state(**values) -> WarehouseState:
+    """
+    Returns a warehouse state
+    :param values: values replacing the default ones
+    :return: warehouse state
+    """
+    return WarehouseState(**{"time": 0, "robots": 2, "balance": 0, "foos": 0, "bars": 0, "foobars": 0, **values})
+
+
+class TestConditions:
+    def test_targets(self):
+        """
+        Test the target conditions
+        :return:
+        """
+        assert RobotsTarget(count=3).is_met(get_state(robots=3), 0)
+        assert not RobotsTarget(count=3).is_met(get_state(robots=2), 0)
+        assert BalanceTarget(balance=10).is_met(get_state(balance=10), 0)
+        assert not BalanceTarget(balance=10).is_met(get_state(balance=9), 0)
+        assert FoobarsTarget(count=5).is_met(get_state(foobars=5), 0)
+        assert not FoobarsTarget(count=5).is_met(get_state(foobars=4), 0)
+
+    def test_abstract_condition(self):
+        """
+        Test the base condition cannot be instantiated
+        :return:
+        """
+        with pytest.raises(TypeError):
+            Condition()
+
+    def test_budgets(self):
+        """
+        Test the time budget conditions and their deadlines
+        :return:
+        """
+        assert SimulatedTimeBudget(seconds=60).is_met(get_state(time=60), 0)
+        assert not SimulatedTimeBudget(seconds=60).is_met(get_state(time=59), 100)
+        assert SimulatedTimeBudget(seconds=60).get_simulated_deadlines() == [60]
+        assert WallTimeBudget(seconds=1).is_met(get_state(), 1)
+        assert not WallTimeBudget(seconds=1).is_met(get_state(time=100), 0.5)
+        assert WallTimeBudget(seconds=1).get_wall_deadlines() == [1]
+
+    def test_combinations(self):
+        """
+        Test combining conditions with & and |
+        :return:
+        """
+        condition: AnyOf = (RobotsTarget(count=10) & BalanceTarget(balance=5)) | SimulatedTimeBudget(seconds=60)
+
+        assert isinstance(condition.conditions[0], AllOf)
+        assert not condition.is_met(get_state(robots=10), 0)
+        assert condition.is_met(get_state(robots=10, balance=5), 0)
+        assert condition.is_met(get_state(time=60), 0)
+        assert condition.get_simulated_deadlines() == [60]
+
+
+class TestConditionMonitor:
+    def test_update(self):
+        """
+        Test the milestones are reached once and the monitor stays stopped
+        :return:
+        """
+        milestones: List[Milestone] = []
+        listener_mock: Mock = Mock(side_effect=milestones.append)
+        monitor: ConditionMonitor = ConditionMonitor(
+            RobotsTarget(count=5), {"first foobar": FoobarsTarget(count=1)}, [listener_mock]
+        )
+
+        assert not monitor.update(get_state(), 0)
+        assert not monitor.update(get_state(time=10, foobars=1), 0.5)
+        assert not monitor.update(get_state(time=11, foobars=2), 0.6)
+        assert monitor.update(get_state(time=12, robots=5), 0.7)
+        assert monitor.update(get_state(time=13, robots=4), 0.8)
+
+        listener_mock.assert_called_once()
+        assert milestones == monitor.milestones == [Milestone(name="first foobar", time=10, wall_time=0.5)]
+
+    def test_deadlines(self):
+        """
+        Test the deadlines of the stop condition and the milestones are merged
+        :return:
+        """
+        monitor: ConditionMonitor = ConditionMonitor(
+            SimulatedTimeBudget(seconds=60) | WallTimeBudget(seconds=5),
+            {"a minute": SimulatedTimeBudget(seconds=60), "ten seconds": SimulatedTimeBudget(seconds=10)},
+        )
+
+        assert monitor.get_simulated_deadlines() == [10, 60]
+        assert monitor.get_wall_deadlines() == [5]
@@ -1,6 +1,13 @@
+from typing import List
 from unittest.mock import Mock
 
+from foobartory.core.conditions import ConditionMonitor, RobotsTarget, WallTimeBudget
 from foobartory.core.factory import Factory
+from foobartory.core.models.runtime_report import RuntimeReport
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.robot import Robot
+from foobartory.core.shared_state import SharedState, SharedStateReader, SharedStateWriter
 from foobartory.settings.settings import settings
 
 
@@ -8,6 +15,10 @@ class TestFactory:
     def setup_method(self):
         self.factory = Factory()
 
+    def teardown_method(self):
+        for robot in list(self.factory.warehouse.robots):
+            robot.stop_event.set()
+
     def test_init_default_robots(self, mocker):
         """
         Test the init_default_robots method
@@ -30,15 +41,35 @@ class TestFactory:
         print_state_mock: Mock = mocker.patch.object(Factory, "print_state")
         settings_mock: Mock = mocker.patch("foobartory.core.factory.settings")
         settings_mock.MAX_ROBOTS = len(self.factory.warehouse.robots)
+        settings_mock.TIME_RATIO = settings.TIME_RATIO
         monitoring_thread_start_mock: Mock = Mock()
         self.factory.monitoring_thread.start = monitoring_thread_start_mock
-        stop_event_set_mock: Mock = Mock()
-        self.factory.stop_event.set = stop_event_set_mock
+        stop_event_mock: Mock = Mock()
+        self.factory.stop_event = stop_event_mock
         self.factory.run()
         monitoring_thread_start_mock.assert_called_once()
-        stop_event_set_mock.assert_called_once_with()
+        stop_event_mock.set.assert_called_once_with()
         print_state_mock.assert_called_once_with()
 
+    def test_run_joins_monitoring_thread(self, mocker):
+        """
+        Test the run method waits for the monitoring thread before publishing the last state
+        :param mocker: pytest mocker
+        :return:
+        """
+        mocker.patch.object(Factory, "print_state")
+        calls: Mock = Mock()
+        self.factory.stop_condition = RobotsTarget(count=len(self.factory.warehouse.robots))
+        self.factory.monitoring_thread = calls.monitoring_thread
+        calls.monitoring_thread.is_alive.return_value = True
+        self.factory.state_listeners = [calls.listener]
+        self.factory.run()
+
+        assert [call[0] for call in calls.mock_calls if call[0] in ("monitoring_thread.join", "listener")] == [
+            "monitoring_thread.join",
+            "listener",
+        ]
+
     def test_print_state(self, mocker):
         """
         Test the print_state method
@@ -56,21 +87,117 @@ class TestFactory:
         assert "bars:" in print_mock.call_args_list[5][0][0]
         assert "finished:" in print_mock.call_args_list[6][0][0]
 
+    def test_get_runtime_report(self):
+        """
+        Test the runtime report merges the robots stats and the warehouse lock measures
+        :return:
+        """
+        robots: List[Robot] = list(self.factory.warehouse.robots)
+        robots[0].stats.record_run(1)
+        robots[1].stats.record_run(2)
+        robots[1].stats.record_wait(0.5, 0.75, 2)
+        with self.factory.warehouse.lock:
+            pass
+        report: RuntimeReport = self.factory.get_runtime_report()
+
+        assert report.robots == settings.DEFAULT_ROBOTS
+        assert report.running_time >= 3
+        assert report.run_durations.count >= 2
+        assert report.wake_up_lateness_by_robots[2].total >= 0.25
+        assert report.lock_acquisitions >= 1
+        assert "warehouse lock" in report.format()
+
+    def test_write_shared_state(self):
+        """
+        Test the factory writes its state and its robots activities in the shared memory block
+        :return:
+        """
+        with SharedStateWriter() as writer, SharedStateReader(writer.name) as reader:
+            factory: Factory = Factory(shared_state=writer)
+            factory.write_shared_state()
+            factory.stop_event.set()
+            state: SharedState = reader.read()
+
+        assert state.version >= 1
+        assert state.robots == settings.DEFAULT_ROBOTS
+        assert sum(state.activities.values()) == settings.DEFAULT_ROBOTS
+
     def test_print_state_monitoring(self, mocker):
         """
         Test the print_state_monitoring method
         :param mocker: pytest mocker
         :return:
         """
-        stop_event_is_set_mock: Mock = Mock()
-        stop_event_is_set_mock.side_effect = [False, True]
-        self.factory.stop_event.is_set = stop_event_is_set_mock
+        stop_event_mock: Mock = Mock()
+        stop_event_mock.is_set.side_effect = [False, True]
+        self.factory.stop_event = stop_event_mock
 
         print_state_mock: Mock = mocker.patch.object(Factory, "print_state")
 
         sleep_mock: Mock = mocker.patch('foobartory.core.factory.time.sleep')
         self.factory.print_state_monitoring()
 
-        stop_event_is_set_mock.assert_called_with()
+        stop_event_mock.is_set.assert_called_with()
         print_state_mock.assert_called_once_with()
         sleep_mock.assert_called_once_with(settings.MONITORING_REFRESH_RATE * settings.TIME_RATIO)
+
+    def test_get_state(self):
+        """
+        Test the get_state method
+        :return:
+        """
+        self.factory.warehouse.balance = 2
+        state: WarehouseState = self.factory.get_state()
+
+        assert state.robots == len(self.factory.warehouse.robots)
+        assert state.balance == 2
+        assert state.time >= 0
+
+    def test_publish_state(self):
+        """
+        Test the publish_state method
+        :return:
+        """
+        listener_mock: Mock = Mock()
+        self.factory.state_listeners.append(listener_mock)
+        self.factory.publish_state()
+
+        listener_mock.assert_called_once()
+        assert isinstance(listener_mock.call_args[0][0], WarehouseState)
+
+    def test_check_conditions(self):
+        """
+        Test the check_conditions method sets the finished event when the stop condition is met
+        :return:
+        """
+        self.factory.check_conditions()
+        assert not self.factory.finished_event.is_set()
+
+        self.factory.condition_monitor = ConditionMonitor(RobotsTarget(count=len(self.factory.warehouse.robots)))
+        self.factory.warehouse.notify_change()
+        assert self.factory.finished_event.is_set()
+
+    def test_run_wall_time_budget(self, mocker):
+        """
+        Test the run method stops at a wall time budget
+        :param mocker: pytest mocker
+        :return:
+        """
+        mocker.patch.object(Factory, "print_state")
+        mocker.patch.object(Robot, "run")
+        factory: Factory = Factory(stop_condition=WallTimeBudget(seconds=0.1))
+        factory.run()
+
+        assert factory.stop_event.is_set()
+        assert len(factory.warehouse.robots) < settings.MAX_ROBOTS
+
+    def test_strategy(self):
+        """
+        Test the robots plan with the factory strategy
+        :return:
+        """
+        strategy: Strategy = Strategy(reserves={"foo": 1})
+        factory: Factory = Factory(strategy=strategy)
+        factory.stop_event.set()
+
+        assert [robot.planner.strategy for robot in factory.warehouse.robots] == [strategy] * settings.DEFAULT_ROBOTS
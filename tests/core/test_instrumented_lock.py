@@ -0,0 +1,46 @@
+import time
+from threading import Thread
+
+from foobartory.core.instrumented_lock import InstrumentedLock
+
+
+class TestInstrumentedLock:
+    def setup_method(self):
+        self.lock: InstrumentedLock = InstrumentedLock()
+
+    def test_uncontended(self):
+        """
+        Test an acquisition of a free lock is not a contention
+        :return:
+        """
+        with self.lock:
+            pass
+
+        assert self.lock.acquisitions == 1
+        assert self.lock.contentions == 0
+        assert self.lock.hold_times.count == 1
+        assert not self.lock.lock.locked()
+
+    def test_contended(self):
+        """
+        Test the waits for a held lock are measured
+        :return:
+        """
+
+        def hold() -> None:
+            with self.lock:
+                time.sleep(0.05)
+
+        thread: Thread = Thread(target=hold)
+        thread.start()
+        while not self.lock.lock.locked():
+            time.sleep(0.001)
+        with self.lock:
+            pass
+        thread.join()
+
+        assert self.lock.acquisitions == 2
+        assert self.lock.contentions == 1
+        assert self.lock.wait_times.count == 1
+        assert self.lock.wait_times.max > 0.01
+        assert self.lock.hold_times.max >= 0.05
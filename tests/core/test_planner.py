@@ -0,0 +1,230 @@
+from typing import Dict, List
+
+import pytest
+
+from foobartory.core import planner as planner_module
+from foobartory.core.models.recipe import Recipe, RecipeBook
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.planner import Planner, get_planner
+from foobartory.settings.settings import settings
+
+
+def get_hand_written_activity(balance: float, foos: int, bars: int, foobars: int) -> RobotActivity:
+    """
+    Decision rules of the robots before the planner
+    :param balance: balance
+    :param foos: foos number
+    :param bars: bars number
+    :param foobars: foobars number
+    :return: activity
+    """
+    if balance >= settings.ROBOT_COST and foos >= settings.ROBOT_FOO_COST:
+        return RobotActivity.BUYING_ROBOT
+    elif balance >= settings.ROBOT_COST:
+        return RobotActivity.MINING_FOO
+    elif foobars > settings.ROBOT_SELLING_FOOBARS_MIN:
+        return RobotActivity.SELLING_FOOBARS
+    elif foos > 0 and bars > 0:
+        return RobotActivity.ASSEMBLING_FOOBAR
+    elif foos < settings.ROBOT_FOO_COST:
+        return RobotActivity.MINING_FOO
+    else:
+        return RobotActivity.MINING_BAR
+
+
+class TestPlanner:
+    def setup_method(self):
+        self.planner: Planner = Planner(RecipeBook.from_settings(settings))
+        self.recipe_book: RecipeBook = RecipeBook(
+            recipes=[
+                Recipe(name="mining ore", outputs={"ore": 1}),
+                Recipe(name="cutting wood", outputs={"wood": 1}),
+                Recipe(name="smelting ingot", inputs={"ore": 2}, outputs={"ingot": 1}),
+                Recipe(name="building tool", inputs={"ingot": 1, "wood": 1}, outputs={"tool": 1}, success_rate=50),
+                Recipe(name="selling tools", inputs={"tool": 1}, sale_value=5, batch_max=4),
+                Recipe(name="buying robot", inputs={"money": 10, "wood": 2}, outputs={"robot": 1}),
+            ]
+        )
+
+    def test_init(self):
+        """
+        Test the planner compiles its thresholds and its dispatch table
+        :return:
+        """
+        assert self.planner.resources == ["foo", "bar", "foobar", "money"]
+        assert self.planner.thresholds == [
+            [1, settings.ROBOT_FOO_COST],
+            [1],
+            [settings.ROBOT_SELLING_FOOBARS_MIN + 1],
+            [settings.ROBOT_COST],
+        ]
+        assert self.planner.size == 3 * 2 * 2 * 2
+        assert sorted(self.planner.table) == list(range(self.planner.size))
+
+    def test_plan_hand_written_rules(self):
+        """
+        Test the foobar recipes planner gives the same decisions as the hand written rules
+        :return:
+        """
+        for balance in [0, 1, 2.5, 3, 4, 10]:
+            for foos in range(10):
+                for bars in range(3):
+                    for foobars in range(8):
+                        recipe: Recipe = self.planner.plan_recipe(
+                            {"money": balance, "foo": foos, "bar": bars, "foobar": foobars}
+                        )
+                        assert recipe.name == get_hand_written_activity(balance, foos, bars, foobars).value
+
+    def test_plan_selling_min_equal_to_max(self):
+        """
+        Test the foobars are sold once there are more than ROBOT_SELLING_FOOBARS_MIN of them when it is also the max
+        :return:
+        """
+        selling_max: int = settings.ROBOT_SELLING_FOOBARS_MAX
+        planner: Planner = get_planner(settings.override({"ROBOT_SELLING_FOOBARS_MIN": selling_max}))
+        stock: Dict[str, float] = {"money": 0, "foo": 0, "bar": 0}
+
+        assert planner.plan_recipe({**stock, "foobar": selling_max}).name != RobotActivity.SELLING_FOOBARS.value
+        assert planner.plan_recipe({**stock, "foobar": selling_max + 1}).name == RobotActivity.SELLING_FOOBARS.value
+
+    def test_plan_lazy_table(self, mocker):
+        """
+        Test the dispatch table is filled on demand when it is too large to be precomputed
+        :param mocker: pytest mocker
+        :return:
+        """
+        mocker.patch.object(planner_module, "MAX_PRECOMPUTED_TABLE_SIZE", 0)
+        planner: Planner = Planner(RecipeBook.from_settings(settings))
+
+        assert planner.table == {}
+        assert planner.plan([settings.ROBOT_FOO_COST, 0, 0, settings.ROBOT_COST]) == 4
+        assert planner.table == {planner.size - 1 - planner.strides[1] - planner.strides[2]: 4}
+
+    def test_plan_large_graph(self):
+        """
+        Test the table of a graph too large to be precomputed stays sparse
+        :return:
+        """
+        resources: List[str] = [f"part {index}" for index in range(40)]
+        planner: Planner = Planner(
+            RecipeBook(
+                recipes=[
+                    *(Recipe(name=f"making {resource}", outputs={resource: 1}) for resource in resources),
+                    Recipe(name="buying robot", inputs={resource: 1 for resource in resources}, outputs={"robot": 1}),
+                ]
+            )
+        )
+
+        assert planner.size == 2**40
+        assert planner.plan_recipe({}).name == "making part 0"
+        assert planner.plan_recipe({resource: 1 for resource in resources}).name == "buying robot"
+        assert len(planner.table) == 2
+
+    def test_get_raw_needs(self):
+        """
+        Test the raw resources needs take the success rates, the failure outputs and the sale values into account
+        :return:
+        """
+        assert self.planner.needs == {
+            "foo": settings.ROBOT_COST / settings.FOOBAR_VALUE / settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE * 100,
+            "bar": settings.ROBOT_COST / settings.FOOBAR_VALUE,
+        }
+        assert Planner(self.recipe_book).needs == {"ore": 8, "wood": 4}
+
+    def test_decide(self):
+        """
+        Test the decision steps on a deeper recipe book
+        :return:
+        """
+        planner: Planner = Planner(self.recipe_book)
+
+        assert planner.plan_recipe({"money": 10, "wood": 2}).name == "buying robot"
+        assert planner.plan_recipe({"money": 10, "wood": 1}).name == "cutting wood"
+        assert planner.plan_recipe({"tool": 1, "ingot": 1, "wood": 1}).name == "selling tools"
+        assert planner.plan_recipe({"ingot": 1, "wood": 1, "ore": 2}).name == "building tool"
+        assert planner.plan_recipe({"ore": 2, "wood": 5}).name == "smelting ingot"
+        assert planner.plan_recipe({"wood": 1}).name == "cutting wood"
+        assert planner.plan_recipe({"wood": 2, "ore": 1}).name == "mining ore"
+        assert planner.plan_recipe({"wood": 3}).name == "mining ore"
+
+    def test_can_start(self):
+        """
+        Test the recipe planned for a stock can always be started with that stock
+        :return:
+        """
+        assert self.planner.can_start("assembling foobar", {"foo": 1, "bar": 1})
+        assert not self.planner.can_start("assembling foobar", {"foo": 1})
+        for balance in range(5):
+            for foos in range(10):
+                for bars in range(3):
+                    for foobars in range(8):
+                        stock: Dict[str, float] = {"money": balance, "foo": foos, "bar": bars, "foobar": foobars}
+                        assert self.planner.can_start(self.planner.plan_recipe(stock).name, stock)
+
+    def test_get_planner(self):
+        """
+        Test the planner is compiled once per settings
+        :return:
+        """
+        assert get_planner(settings) is get_planner(settings)
+        assert get_planner(settings) is not get_planner(settings.override({"ROBOT_COST": 4}))
+        assert get_planner(settings, Strategy(reserves={"foo": 1})) is get_planner(
+            settings, Strategy(reserves={"foo": 1})
+        )
+        assert get_planner(settings) is not get_planner(settings, Strategy(reserves={"foo": 1}))
+
+    def test_get_planner_bounded(self):
+        """
+        Test the least recently used planners are dropped once MAX_CACHED_PLANNERS of them are compiled
+        :return:
+        """
+        planner: Planner = get_planner(settings)
+        for target in range(planner_module.MAX_CACHED_PLANNERS):
+            get_planner(settings, Strategy(targets={"foo": target + 1}))
+
+        assert planner_module.compile_planner.cache_info().currsize == planner_module.MAX_CACHED_PLANNERS
+        assert get_planner(settings) is not planner
+
+    def test_default_strategy(self):
+        """
+        Test the empty strategy keeps the default rules
+        :return:
+        """
+        planner: Planner = Planner(RecipeBook.from_settings(settings), Strategy())
+
+        assert planner.thresholds == self.planner.thresholds
+        assert planner.table == self.planner.table
+
+    def test_strategy(self):
+        """
+        Test the strategy batch sizes, reserves and targets change the decisions
+        :return:
+        """
+        planner: Planner = Planner(
+            RecipeBook.from_settings(settings),
+            Strategy(batch_min={"selling foobar": 5}, reserves={"foo": 2}, targets={"foo": 10}),
+        )
+
+        assert planner.plan_recipe({"foobar": 4, "foo": 2, "bar": 1}).name == "mining foo"
+        assert self.planner.plan_recipe({"foobar": 4, "foo": 2, "bar": 1}).name == "selling foobar"
+        assert planner.plan_recipe({"foobar": 5}).name == "selling foobar"
+        assert planner.plan_recipe({"foo": 2, "bar": 1}).name == "mining foo"
+        assert planner.plan_recipe({"foo": 3, "bar": 1}).name == "assembling foobar"
+        assert planner.plan_recipe({"foo": 8}).name == "mining foo"
+        assert planner.plan_recipe({"foo": 10}).name == "mining bar"
+
+    def test_strategy_validation(self):
+        """
+        Test the strategies not applying to the recipes are refused
+        :return:
+        """
+        recipe_book: RecipeBook = RecipeBook.from_settings(settings)
+        with pytest.raises(ValueError):
+            Planner(recipe_book, Strategy(batch_min={"painting foobar": 2}))
+        with pytest.raises(ValueError):
+            Planner(recipe_book, Strategy(batch_min={"selling foobar": settings.ROBOT_SELLING_FOOBARS_MAX + 1}))
+        with pytest.raises(ValueError):
+            Planner(recipe_book, Strategy(reserves={"gold": 1}))
+        with pytest.raises(ValueError):
+            Planner(recipe_book, Strategy(targets={"foobar": 1}))
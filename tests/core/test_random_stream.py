@@ -0,0 +1,51 @@
+import random
+from typing import Iterator
+
+import pytest
+
+from foobartory.core.random_stream import RandomStream
+
+
+class TestRandomStream:
+    def setup_method(self):
+        self.random_stream: RandomStream = RandomStream(seed=1, block_size=16)
+
+    def test_uniform(self):
+        """
+        Test the uniform method draws the same values as random.uniform, across several blocks
+        :return:
+        """
+        draws: Iterator[float] = self.random_stream.uniform(0.5, 2)
+        generator: random.Random = random.Random(1)
+
+        assert [next(draws) for _ in range(50)] == [generator.uniform(0.5, 2) for _ in range(50)]
+
+    def test_randrange(self):
+        """
+        Test the randrange method draws the same values as random.randrange, across several blocks
+        :return:
+        """
+        draws: Iterator[int] = self.random_stream.randrange(100)
+        generator: random.Random = random.Random(1)
+
+        assert [next(draws) for _ in range(50)] == [generator.randrange(100) for _ in range(50)]
+
+    def test_randrange_invalid_stop(self):
+        """
+        Test the randrange method with an empty range
+        :return:
+        """
+        with pytest.raises(ValueError):
+            self.random_stream.randrange(0)
+
+    def test_spawn(self):
+        """
+        Test the spawn method returns independent but reproducible streams
+        :return:
+        """
+        first_stream: RandomStream = self.random_stream.spawn()
+        second_stream: RandomStream = self.random_stream.spawn()
+        same_stream: RandomStream = RandomStream(seed=1, block_size=16).spawn()
+
+        assert next(first_stream.randrange(10**9)) == next(same_stream.randrange(10**9))
+        assert next(first_stream.randrange(10**9)) != next(second_stream.randrange(10**9))
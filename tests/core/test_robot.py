@@ -1,5 +1,7 @@
 from unittest.mock import Mock
 
+import pytest
+
 from foobartory.core.models.items.bar import Bar
 from foobartory.core.models.items.foo import Foo
 from foobartory.core.models.items.foobar import FooBar
@@ -114,112 +116,90 @@ class TestRobot:
         assert self.robot.activity == robot_final_activity
         execute_activity_mock.assert_called_once_with()
 
-    def test_get_next_activity_buy_robot(self, mocker):
+    def test_get_next_activity_buy_robot(self):
         """
         Test the get_next_activity method, can buy robot
-        :param mocker: pytest mocker
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = True
+        self.robot.warehouse.balance = settings.ROBOT_COST
+        self.robot.warehouse.foos = [Foo() for _ in range(settings.ROBOT_FOO_COST)]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.BUYING_ROBOT
 
-    def test_get_next_activity_enough_balance_to_buy_robot(self, mocker):
+    def test_get_next_activity_enough_balance_to_buy_robot(self):
         """
         Test the get_next_activity method, with enough balance to buy robot but not enough foo
-        :param mocker: pytest mocker
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = False
-        has_enough_balance_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_balance_to_buy_robot")
-        has_enough_balance_to_buy_robot_mock.return_value = True
+        self.robot.warehouse.balance = settings.ROBOT_COST
+        self.robot.warehouse.foobars = [FooBar(foo=Foo(), bar=Bar()) for _ in range(settings.ROBOT_SELLING_FOOBARS_MAX)]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.MINING_FOO
 
-    def test_get_next_activity_can_sell_foobars(self, mocker):
+    def test_get_next_activity_can_sell_foobars(self):
         """
-        Test the get_next_activity method, with can_sell_foobars True
-        :param mocker: pytest mocker
+        Test the get_next_activity method, with foobars to sell
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = False
-        has_enough_balance_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_balance_to_buy_robot")
-        has_enough_balance_to_buy_robot_mock.return_value = False
-        can_sell_foobars_mock: Mock = mocker.patch.object(Robot, "can_sell_foobars")
-        can_sell_foobars_mock.return_value = True
+        self.robot.warehouse.foobars = [
+            FooBar(foo=Foo(), bar=Bar()) for _ in range(settings.ROBOT_SELLING_FOOBARS_MIN + 1)
+        ]
+        self.robot.warehouse.foos = [Foo()]
+        self.robot.warehouse.bars = [Bar()]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.SELLING_FOOBARS
 
-    def test_get_next_activity_can_assemble_foobar(self, mocker):
+    def test_get_next_activity_can_assemble_foobar(self):
         """
-        Test the get_next_activity method, with can_assemble_foobar True
-        :param mocker: pytest mocker
+        Test the get_next_activity method, with a foo and a bar to assemble
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = False
-        has_enough_balance_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_balance_to_buy_robot")
-        has_enough_balance_to_buy_robot_mock.return_value = False
-        can_sell_foobars_mock: Mock = mocker.patch.object(Robot, "can_sell_foobars")
-        can_sell_foobars_mock.return_value = False
-        can_assemble_foobar_mock: Mock = mocker.patch.object(Robot, "can_assemble_foobar")
-        can_assemble_foobar_mock.return_value = True
+        self.robot.warehouse.foobars = [FooBar(foo=Foo(), bar=Bar()) for _ in range(settings.ROBOT_SELLING_FOOBARS_MIN)]
+        self.robot.warehouse.foos = [Foo()]
+        self.robot.warehouse.bars = [Bar()]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.ASSEMBLING_FOOBAR
 
-    def test_get_next_activity_not_enough_foo_to_buy_robot(self, mocker):
+    def test_get_next_activity_not_enough_foo_to_buy_robot(self):
         """
-        Test the get_next_activity method, with has_enough_foo_to_buy_robot False
-        :param mocker: pytest mocker
+        Test the get_next_activity method, without enough foo to buy robot
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = False
-        has_enough_balance_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_balance_to_buy_robot")
-        has_enough_balance_to_buy_robot_mock.return_value = False
-        can_sell_foobars_mock: Mock = mocker.patch.object(Robot, "can_sell_foobars")
-        can_sell_foobars_mock.return_value = False
-        can_assemble_foobar_mock: Mock = mocker.patch.object(Robot, "can_assemble_foobar")
-        can_assemble_foobar_mock.return_value = False
-        has_enough_foo_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_foo_to_buy_robot")
-        has_enough_foo_to_buy_robot_mock.return_value = False
+        self.robot.warehouse.foos = [Foo() for _ in range(settings.ROBOT_FOO_COST - 1)]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.MINING_FOO
 
-    def test_get_next_activity_mining_bar(self, mocker):
+    def test_get_next_activity_mining_bar(self):
         """
-        Test the get_next_activity method else
-        :param mocker: pytest mocker
+        Test the get_next_activity method, with enough foo to buy robot but nothing else to do
         :return:
         """
-        can_buy_robot_mock: Mock = mocker.patch.object(Robot, "can_buy_robot")
-        can_buy_robot_mock.return_value = False
-        has_enough_balance_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_balance_to_buy_robot")
-        has_enough_balance_to_buy_robot_mock.return_value = False
-        can_sell_foobars_mock: Mock = mocker.patch.object(Robot, "can_sell_foobars")
-        can_sell_foobars_mock.return_value = False
-        can_assemble_foobar_mock: Mock = mocker.patch.object(Robot, "can_assemble_foobar")
-        can_assemble_foobar_mock.return_value = False
-        has_enough_foo_to_buy_robot_mock: Mock = mocker.patch.object(Robot, "has_enough_foo_to_buy_robot")
-        has_enough_foo_to_buy_robot_mock.return_value = True
+        self.robot.warehouse.foos = [Foo() for _ in range(settings.ROBOT_FOO_COST)]
 
         next_activity: RobotActivity = self.robot.get_next_activity()
 
         assert next_activity == RobotActivity.MINING_BAR
 
+    def test_get_stock(self):
+        """
+        Test the get_stock method
+        :return:
+        """
+        self.robot.warehouse.balance = 2
+        self.robot.warehouse.foos = [Foo()]
+
+        assert self.robot.get_stock() == {"money": 2, "foo": 1, "bar": 0, "foobar": 0}
+
     def test_execute_activity_buy_robot(self, mocker):
         """
         Test the execute_activity method, buy robot call
@@ -286,6 +266,20 @@ class TestRobot:
         self.robot.wait(second)
         sleep_mock.assert_called_once_with(second * settings.TIME_RATIO)
 
+    def test_wait_stats(self):
+        """
+        Test the wait method records the running time before the wait, the wait and the wake up lateness
+        :return:
+        """
+        self.robot.woke_at -= 0.5
+        self.robot.wait(0.01 / settings.TIME_RATIO)
+
+        assert self.robot.stats.running_time >= 0.5
+        assert self.robot.stats.waiting_time >= 0.01
+        assert self.robot.stats.wake_up_lateness.count == 1
+        assert self.robot.stats.wake_up_lateness_by_robots[0].count == 1
+        assert self.robot.stats.wake_up_lateness.total == pytest.approx(self.robot.stats.waiting_time - 0.01)
+
     def test_move(self, mocker):
         """
         Test the move method
@@ -325,14 +319,6 @@ class TestRobot:
         assert wait_argument >= settings.ROBOT_MINING_BAR_DURATION_MIN
         assert wait_argument <= settings.ROBOT_MINING_BAR_DURATION_MAX
 
-    def test_can_assemble_foobar(self, ):
-        """
-        Test the can_assemble_foobar method
-        :return:
-        """
-        assert self.robot.can_assemble_foobar() == (
-                    len(self.robot.warehouse.foos) > 0 and len(self.robot.warehouse.bars) > 0)
-
     def test_assemble_foobar_success(self, mocker):
         """
         Test the assemble_foobar method success
@@ -345,8 +331,7 @@ class TestRobot:
         self.robot.warehouse.bars.append(bar)
 
         wait_mock: Mock = mocker.patch.object(Robot, 'wait')
-        randrange_mock: Mock = mocker.patch('foobartory.core.robot.random.randrange')
-        randrange_mock.return_value = settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE - 1
+        self.robot.assembling_draws = iter([settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE - 1])
         self.robot.assemble_foobar()
 
         wait_mock.assert_called_once_with(settings.ROBOT_ASSEMBLING_FOOBAR_DURATION)
@@ -366,8 +351,7 @@ class TestRobot:
         self.robot.warehouse.bars.append(bar)
 
         wait_mock: Mock = mocker.patch.object(Robot, 'wait')
-        randrange_mock: Mock = mocker.patch('foobartory.core.robot.random.randrange')
-        randrange_mock.return_value = settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE + 1
+        self.robot.assembling_draws = iter([settings.ROBOT_ASSEMBLING_FOOBAR_SUCCESS_RATE + 1])
         self.robot.assemble_foobar()
 
         wait_mock.assert_called_once_with(settings.ROBOT_ASSEMBLING_FOOBAR_DURATION)
@@ -375,13 +359,6 @@ class TestRobot:
         assert self.robot.warehouse.bars[0] == bar
         assert len(self.robot.warehouse.foos) == 0
 
-    def test_can_sell_foobars(self):
-        """
-        Test the can_sell_foobars method
-        :return:
-        """
-        assert self.robot.can_sell_foobars() == (len(self.robot.warehouse.foobars) > settings.ROBOT_SELLING_FOOBARS_MIN)
-
     def test_get_foobars_to_sell_one_foobar(self):
         """
         Test the get_foobars_to_sell method with one foobar
@@ -409,6 +386,7 @@ class TestRobot:
         get_foobars_to_sell_mock: Mock = mocker.patch.object(Robot, 'get_foobars_to_sell')
         get_foobars_to_sell_mock_return = [FooBar(foo=Foo(), bar=Bar()), FooBar(foo=Foo(), bar=Bar())]
         get_foobars_to_sell_mock.return_value = get_foobars_to_sell_mock_return
+        self.robot.warehouse.foobars.extend(get_foobars_to_sell_mock_return)
 
         wait_mock: Mock = mocker.patch.object(Robot, 'wait')
 
@@ -418,97 +396,76 @@ class TestRobot:
         wait_mock.assert_called_once_with(settings.ROBOT_SELLING_FOOBARS_DURATION)
         assert self.robot.warehouse.balance == (settings.FOOBAR_VALUE * len(get_foobars_to_sell_mock_return))
 
-    def test_can_buy_robot_true(self, mocker):
+    def test_buy_robot(self, mocker):
         """
-        test the can_buy_robot method,
+        Test the buy_robot method
+
         :param mocker: pytest mocker
         :return:
         """
-        has_enough_balance_to_buy_robot_mock = mocker.patch.object(Robot,  'has_enough_balance_to_buy_robot')
-        has_enough_balance_to_buy_robot_mock.return_value = True
-        has_enough_foo_to_buy_robot_mock = mocker.patch.object(Robot,  'has_enough_foo_to_buy_robot')
-        has_enough_foo_to_buy_robot_mock.return_value = True
+        self.robot.warehouse.balance = settings.ROBOT_COST
+        base_robots_length = len(self.robot.warehouse.robots)
+        for _ in range(settings.ROBOT_FOO_COST):
+            self.robot.warehouse.foos.append(Foo())
 
-        assert self.robot.can_buy_robot()
+        start_mock: Mock = mocker.patch.object(Robot, 'start')
 
-    def test_can_buy_robot_not_enough_foos(self, mocker):
-        """
-        test the can_buy_robot method, not enough foos
-        :param mocker: pytest mocker
-        :return:
-        """
-        has_enough_balance_to_buy_robot_mock = mocker.patch.object(Robot,  'has_enough_balance_to_buy_robot')
-        has_enough_balance_to_buy_robot_mock.return_value = True
-        has_enough_foo_to_buy_robot_mock = mocker.patch.object(Robot,  'has_enough_foo_to_buy_robot')
-        has_enough_foo_to_buy_robot_mock.return_value = False
+        self.robot.buy_robot()
 
-        assert not self.robot.can_buy_robot()
+        assert self.robot.warehouse.balance == 0
+        assert len(self.robot.warehouse.robots) == base_robots_length + 1
+        start_mock.assert_called_once_with()
 
-    def test_can_buy_robot_not_enough_balance(self, mocker):
+    def test_assemble_foobar_taken(self, mocker):
         """
-        test the can_buy_robot method, not enough balance
+        Test the assemble_foobar method when another robot took the bar after the planning: the robot plans again
         :param mocker: pytest mocker
         :return:
         """
-        has_enough_balance_to_buy_robot_mock = mocker.patch.object(Robot, 'has_enough_balance_to_buy_robot')
-        has_enough_balance_to_buy_robot_mock.return_value = False
-        has_enough_foo_to_buy_robot_mock = mocker.patch.object(Robot, 'has_enough_foo_to_buy_robot')
-        has_enough_foo_to_buy_robot_mock.return_value = True
+        self.robot.warehouse.foos.append(Foo())
+        wait_mock: Mock = mocker.patch.object(Robot, 'wait')
+        execute_next_activity_mock: Mock = mocker.patch.object(Robot, 'execute_next_activity')
 
-        assert not self.robot.can_buy_robot()
+        self.robot.assemble_foobar()
 
-    def test_has_enough_balance_to_buy_robot(self):
-        """
-        test the has_enough_balance_to_buy_robot True
-        :return:
-        """
-        self.robot.warehouse.balance = settings.ROBOT_COST
-        assert self.robot.has_enough_balance_to_buy_robot()
+        execute_next_activity_mock.assert_called_once_with()
+        wait_mock.assert_not_called()
+        assert len(self.robot.warehouse.foos) == 1
 
-    def test_has_enough_balance_to_buy_robot_false(self):
+    def test_selling_foobars_taken(self, mocker):
         """
-        test the has_enough_balance_to_buy_robot False
+        Test the sell_foobars method when other robots took the foobars after the planning: the robot plans again
+        :param mocker: pytest mocker
         :return:
         """
-        self.robot.warehouse.balance = 0
-        assert not self.robot.has_enough_balance_to_buy_robot()
+        self.robot.warehouse.foobars.append(FooBar(foo=Foo(), bar=Bar()))
+        wait_mock: Mock = mocker.patch.object(Robot, 'wait')
+        execute_next_activity_mock: Mock = mocker.patch.object(Robot, 'execute_next_activity')
 
-    def test_has_enough_foo_to_buy_robot(self):
-        """
-        test the has_enough_foo_to_buy_robot True
-        :return:
-        """
-        for _ in range(settings.ROBOT_FOO_COST):
-            self.robot.warehouse.foos.append(Foo())
-        assert self.robot.has_enough_foo_to_buy_robot()
+        self.robot.sell_foobars()
 
-    def test_has_enough_foo_to_buy_robot_false(self):
-        """
-        test the has_enough_foo_to_buy_robot false
-        :return:
-        """
-        self.robot.warehouse.foos = []
-        assert not self.robot.has_enough_foo_to_buy_robot()
+        execute_next_activity_mock.assert_called_once_with()
+        wait_mock.assert_not_called()
+        assert len(self.robot.warehouse.foobars) == 1
+        assert self.robot.warehouse.balance == 0
 
-    def test_buy_robot(self, mocker):
+    def test_buy_robot_taken(self, mocker):
         """
-        Test the buy_robot method
-
+        Test the buy_robot method when another robot spent the balance after the planning: the robot plans again
         :param mocker: pytest mocker
         :return:
         """
-        self.robot.warehouse.balance = settings.ROBOT_COST
-        base_robots_length = len(self.robot.warehouse.robots)
+        self.robot.warehouse.balance = settings.ROBOT_COST - 1
         for _ in range(settings.ROBOT_FOO_COST):
             self.robot.warehouse.foos.append(Foo())
-
+        base_robots_length = len(self.robot.warehouse.robots)
         start_mock: Mock = mocker.patch.object(Robot, 'start')
+        execute_next_activity_mock: Mock = mocker.patch.object(Robot, 'execute_next_activity')
 
         self.robot.buy_robot()
 
-        assert self.robot.warehouse.balance == 0
-        assert len(self.robot.warehouse.robots) == base_robots_length + 1
-        start_mock.assert_called_once_with()
-
-
-
+        execute_next_activity_mock.assert_called_once_with()
+        start_mock.assert_not_called()
+        assert self.robot.warehouse.balance == settings.ROBOT_COST - 1
+        assert len(self.robot.warehouse.foos) == settings.ROBOT_FOO_COST
+        assert len(self.robot.warehouse.robots) == base_robots_length
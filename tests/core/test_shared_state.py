@@ -0,0 +1,127 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import List
+
+import pytest
+
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.shared_state import (
+    SEQUENCE,
+    SEQUENCE_OFFSET,
+    SharedState,
+    SharedStateReader,
+    SharedStateWriter,
+)
+
+
+def read_in_process(name: str, connection: Connection) -> None:
+    """
+    Read the shared states from another process until the factory is finished
+    :param name: shared memory block name
+    :param connection: connection to send the states to
+    :return:
+    """
+    with SharedStateReader(name) as reader:
+        connection.send(list(reader.iter_states(interval=0.001)))
+    connection.close()
+
+
+class TestSharedState:
+    def setup_method(self):
+        self.writer: SharedStateWriter = SharedStateWriter()
+        self.reader: SharedStateReader = SharedStateReader(self.writer.name)
+        self.state: WarehouseState = WarehouseState(time=12.5, robots=3, balance=1.5, foos=4, bars=2, foobars=1)
+
+    def teardown_method(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_read(self):
+        """
+        Test a written state is read back
+        :return:
+        """
+        assert self.reader.read().version == 0
+        self.writer.write(self.state, {RobotActivity.MINING_BAR: 2, RobotActivity.MINING_FOO: 1})
+
+        state: SharedState = self.reader.read()
+
+        assert state.version == 1
+        assert (state.time, state.robots, state.balance, state.foos, state.bars, state.foobars) == (
+            12.5,
+            3,
+            1.5,
+            4,
+            2,
+            1,
+        )
+        assert not state.finished
+        assert state.activities[RobotActivity.MINING_BAR] == 2
+        assert state.activities[RobotActivity.SELLING_FOOBARS] == 0
+
+    def test_publish(self):
+        """
+        Test the state listener keeps the last activities
+        :return:
+        """
+        self.writer.write(self.state, {RobotActivity.MINING_BAR: 3})
+        self.writer.publish(self.state.copy(update={"robots": 4}))
+
+        state: SharedState = self.reader.read()
+
+        assert state.version == 2
+        assert state.robots == 4
+        assert state.activities[RobotActivity.MINING_BAR] == 3
+
+    def test_write_closed(self):
+        """
+        Test writing in a closed block does nothing
+        :return:
+        """
+        self.reader.close()
+        self.writer.close()
+        self.writer.write(self.state)
+
+        assert self.writer.sequence == 0
+
+    def test_read_during_write(self):
+        """
+        Test a read never returns a state while the sequence is odd
+        :return:
+        """
+        SEQUENCE.pack_into(self.writer.memory.buf, SEQUENCE_OFFSET, 1)
+
+        with pytest.raises(TimeoutError):
+            self.reader.read(retries=10)
+
+    def test_reader_invalid_block(self):
+        """
+        Test a reader refuses a block not written by a SharedStateWriter
+        :return:
+        """
+        self.writer.memory.buf[0] = 0
+
+        with pytest.raises(ValueError):
+            SharedStateReader(self.writer.name)
+
+    def test_read_from_another_process(self):
+        """
+        Test another process polls the states while they are written
+        :return:
+        """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process: multiprocessing.Process = multiprocessing.Process(
+            target=read_in_process, args=(self.writer.name, sender)
+        )
+        process.start()
+        for robots in range(1, 2001):
+            self.writer.write(self.state.copy(update={"robots": robots, "foos": robots}))
+        self.writer.write(self.state.copy(update={"robots": 2001, "foos": 2001}), finished=True)
+        states: List[SharedState] = receiver.recv()
+        process.join()
+
+        assert states[-1].finished
+        assert states[-1].robots == 2001
+        assert all(state.robots == state.foos for state in states if state.version)
+        assert [state.version for state in states] == sorted({state.version for state in states})
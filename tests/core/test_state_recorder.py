@@ -0,0 +1,94 @@
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.state_recorder import COLUMNS, StateRecorder, iter_recording_chunks, load_recording
+
+
+class TestStateRecorder:
+    def setup_method(self):
+        self.states: List[WarehouseState] = [
+            WarehouseState(time=index * 0.5, robots=2 + index, balance=index, foos=index, bars=1, foobars=0)
+            for index in range(10)
+        ]
+
+    def record(self, path: Path, chunk_size: int) -> None:
+        """
+        Record self.states
+        :param path: recording path
+        :param chunk_size: recorder chunk size
+        :return:
+        """
+        with StateRecorder(path, chunk_size=chunk_size) as recorder:
+            for state in self.states:
+                recorder.record(state)
+
+    def test_record_chunks(self, tmp_path):
+        """
+        Test the states are written in chunks and only a chunk is buffered
+        :param tmp_path: pytest tmp_path
+        :return:
+        """
+        path: Path = tmp_path / "states.rec"
+        recorder: StateRecorder = StateRecorder(path, chunk_size=4)
+        for state in self.states:
+            recorder.record(state)
+            assert len(recorder) < 4
+        recorder.close()
+
+        chunks: List[Dict[str, array]] = list(iter_recording_chunks(path))
+        assert [len(chunk["time"]) for chunk in chunks] == [4, 4, 2]
+        assert [name for name, _ in COLUMNS] == list(chunks[0])
+        assert list(chunks[2]["robots"]) == [10, 11]
+        assert list(chunks[0]["time"]) == [0, 0.5, 1, 1.5]
+
+    def test_iter_recording_chunks_invalid_file(self, tmp_path):
+        """
+        Test reading a file which is not a recording
+        :param tmp_path: pytest tmp_path
+        :return:
+        """
+        path: Path = tmp_path / "states.rec"
+        path.write_bytes(b"robots,balance\n")
+        with pytest.raises(ValueError):
+            list(iter_recording_chunks(path))
+
+    def test_iter_recording_chunks_other_byte_order(self, tmp_path):
+        """
+        Test reading a recording written with the other byte order
+        :param tmp_path: pytest tmp_path
+        :return:
+        """
+        path: Path = tmp_path / "states.rec"
+        self.record(path, chunk_size=20)
+        content: bytes = path.read_bytes()
+        swapped_content: bytearray = bytearray(content[:7] + (b">" if sys.byteorder == "little" else b"<"))
+        swapped_content += content[8:12]
+        for index, (_, typecode) in enumerate(COLUMNS):
+            column: array = array(typecode)
+            column.frombytes(content[12 + index * 80 : 12 + (index + 1) * 80])
+            column.byteswap()
+            swapped_content += column.tobytes()
+        path.write_bytes(bytes(swapped_content))
+
+        chunk: Dict[str, array] = next(iter_recording_chunks(path))
+        assert list(chunk["robots"]) == [state.robots for state in self.states]
+
+    def test_load_recording(self, tmp_path):
+        """
+        Test the load_recording method
+        :param tmp_path: pytest tmp_path
+        :return:
+        """
+        numpy = pytest.importorskip("numpy")
+        path: Path = tmp_path / "states.rec"
+        self.record(path, chunk_size=3)
+
+        columns = load_recording(path)
+        assert columns["robots"].dtype == numpy.int64
+        assert columns["robots"].tolist() == [state.robots for state in self.states]
+        assert columns["balance"].tolist() == [state.balance for state in self.states]
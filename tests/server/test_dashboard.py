@@ -0,0 +1,117 @@
+import json
+import socket
+from typing import Any, Dict
+
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.server.dashboard import DashboardServer, Subscriber
+
+
+def get_state(**values) -> WarehouseState:
+    """
+    Returns a warehouse state
+    :param values: values replacing the default ones
+    :return: warehouse state
+    """
+    return WarehouseState(**{"time": 0, "robots": 2, "balance": 0, "foos": 0, "bars": 0, "foobars": 0, **values})
+
+
+class TestDashboardServer:
+    def setup_method(self):
+        self.server: DashboardServer = DashboardServer(port=0)
+        self.server.start()
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def connect(self, path: str) -> socket.socket:
+        """
+        Open a connection and send a GET request
+        :param path: request path
+        :return: client socket
+        """
+        client: socket.socket = socket.create_connection((self.server.host, self.server.port), timeout=5)
+        client.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        return client
+
+    @staticmethod
+    def read_event(client_file) -> Dict[str, Any]:
+        """
+        Read the next Server-Sent Event data
+        :param client_file: client socket file
+        :return: event data
+        """
+        while True:
+            line: str = client_file.readline().decode()
+            if line.startswith("data: "):
+                return json.loads(line[len("data: ") :])
+
+    def test_page(self):
+        """
+        Test the dashboard page
+        :return:
+        """
+        response: bytes = self.connect("/").makefile("rb").read()
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b"EventSource" in response
+
+    def test_not_found(self):
+        """
+        Test an unknown path
+        :return:
+        """
+        assert self.connect("/unknown").makefile("rb").read().startswith(b"HTTP/1.1 404")
+
+    def test_events_deltas(self):
+        """
+        Test the subscribers receive the full state then only the changed fields
+        :return:
+        """
+        self.server.publish(get_state())
+        client_file = self.connect("/events").makefile("rb")
+        assert self.read_event(client_file) == get_state().dict()
+
+        self.server.publish(get_state(time=1, foos=1))
+        assert self.read_event(client_file) == {"time": 1, "foos": 1}
+
+    def test_publish_drops_oldest_states(self):
+        """
+        Test the publish queue is bounded
+        :return:
+        """
+        server: DashboardServer = DashboardServer(queue_size=2)
+        server.loop = self.server.loop
+        server.states_available = self.server.states_available
+        for index in range(5):
+            server.publish(get_state(time=index))
+        assert [state.time for state in server.states] == [3, 4]
+
+    def test_publish_wakes_loop_once(self, mocker):
+        """
+        Test the loop is woken up once until the broadcaster drains the queue
+        :param mocker: pytest mocker
+        :return:
+        """
+        server: DashboardServer = DashboardServer()
+        server.loop = mocker.Mock()
+        server.states_available = mocker.Mock()
+        for index in range(5):
+            server.publish(get_state(time=index))
+        assert server.loop.call_soon_threadsafe.call_count == 1
+
+        server.wakeup_pending = False
+        server.publish(get_state(time=5))
+        assert server.loop.call_soon_threadsafe.call_count == 2
+
+
+class TestSubscriber:
+    def test_push_merges_deltas(self):
+        """
+        Test the pending deltas are merged
+        :return:
+        """
+        subscriber: Subscriber = Subscriber({})
+        subscriber.push({"time": 1, "foos": 1})
+        subscriber.push({"time": 2})
+
+        assert subscriber.pending == {"time": 2, "foos": 1}
+        assert subscriber.changed.is_set()
@@ -0,0 +1,154 @@
+import asyncio
+import http.client
+import json
+from typing import Any, Dict, List
+from unittest.mock import Mock
+
+import pytest
+
+from foobartory.server import job_server
+from foobartory.server.job_server import Job, JobRequest, JobServer, JobStatus
+from foobartory.settings.settings import settings
+
+
+class TestJobServer:
+    def setup_method(self):
+        self.server: JobServer = JobServer(port=0, workers=2)
+        self.server.start()
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def request(self, method: str, path: str, body: Any = None) -> http.client.HTTPResponse:
+        """
+        Send a request to the server
+        :param method: HTTP method
+        :param path: request path
+        :param body: JSON body
+        :return: response
+        """
+        connection: http.client.HTTPConnection = http.client.HTTPConnection(
+            self.server.host, self.server.port, timeout=10
+        )
+        connection.request(method, path, body=None if body is None else json.dumps(body))
+        return connection.getresponse()
+
+    def post_job(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Post a job and read its status updates
+        :param body: job request
+        :return: status updates
+        """
+        response: http.client.HTTPResponse = self.request("POST", "/jobs", body)
+        assert response.status == 200
+        return [json.loads(line) for line in response.read().splitlines()]
+
+    def test_job_done(self):
+        """
+        Test a job is run and its status updates are streamed
+        :return:
+        """
+        updates: List[Dict[str, Any]] = self.post_job({"seed": 1, "settings": {"MAX_ROBOTS": 10}})
+
+        assert [update["status"] for update in updates] == ["queued", "running", "done"]
+        assert updates[-1]["result"]["robots"] == 10
+        assert updates[-1]["result"]["finished"]
+
+        response: http.client.HTTPResponse = self.request("GET", f"/jobs/{updates[0]['id']}")
+        assert json.loads(response.read())["status"] == "done"
+
+    def test_job_invalid_settings(self):
+        """
+        Test a job with unknown settings is refused
+        :return:
+        """
+        assert self.request("POST", "/jobs", {"settings": {"UNKNOWN": 1}}).status == 400
+
+    def test_job_invalid_payload(self):
+        """
+        Test a malformed job request is refused as a bad request
+        :return:
+        """
+        assert self.request("POST", "/jobs", {"settings": 3}).status == 400
+        assert self.request("POST", "/jobs", {"seed": "first"}).status == 400
+
+    def test_job_time_budget(self):
+        """
+        Test a job running longer than its budget is interrupted, and the worker replaced
+        :return:
+        """
+        updates: List[Dict[str, Any]] = self.post_job({"settings": {"MAX_ROBOTS": 10**9}, "time_budget": 0.2})
+        assert updates[-1]["status"] == "timed out"
+        assert self.post_job({"settings": {"MAX_ROBOTS": 10}})[-1]["status"] == "done"
+
+    def test_cancel_running_job(self):
+        """
+        Test a running job is cancelled
+        :return:
+        """
+        response: http.client.HTTPResponse = self.request("POST", "/jobs", {"settings": {"MAX_ROBOTS": 10**9}})
+        assert json.loads(response.readline())["status"] == "queued"
+        assert json.loads(response.readline())["status"] == "running"
+
+        assert self.request("DELETE", "/jobs/1").status == 202
+        assert json.loads(response.readline())["status"] == "cancelled"
+
+    def test_unknown_job(self):
+        """
+        Test getting an unknown job
+        :return:
+        """
+        assert self.request("GET", "/jobs/42").status == 404
+        assert self.request("GET", "/jobs/unknown").status == 404
+        assert self.request("DELETE", "/jobs/-1").status == 404
+
+    def test_preload_worker_modules(self, mocker):
+        """
+        Test the fork server preload is only set by a server about to start its workers, not on import
+        :param mocker: pytest mocker
+        :return:
+        """
+        context_mock: Mock = mocker.patch.object(job_server, "MULTIPROCESSING_CONTEXT")
+        context_mock.get_start_method.return_value = "forkserver"
+
+        JobServer.preload_worker_modules()
+
+        context_mock.set_forkserver_preload.assert_called_once_with(["foobartory.server.job_server"])
+
+
+class TestJobQueue:
+    def test_get_next_job_priority(self):
+        """
+        Test the highest priority job is run first, then the oldest one
+        :return:
+        """
+
+        async def get_jobs_order() -> List[int]:
+            server: JobServer = JobServer()
+            server.loop = asyncio.get_running_loop()
+            server.jobs_available = asyncio.Condition()
+            for priority in [0, 5, 0, 5]:
+                server.submit(JobRequest(priority=priority))
+            server.cancel(server.jobs[4])
+            return [(await server.get_next_job()).id for _ in range(3)]
+
+        assert asyncio.run(get_jobs_order()) == [2, 1, 3]
+
+
+class TestJob:
+    def test_update(self):
+        """
+        Test the update method wakes up the waiting clients
+        :return:
+        """
+
+        async def update() -> Job:
+            job: Job = Job(1, JobRequest(), settings)
+            changed: asyncio.Event = job.changed
+            job.update(JobStatus.FAILED, error="error")
+            assert changed.is_set()
+            return job
+
+        job: Job = asyncio.run(update())
+        assert job.finished
+        assert job.get_info().error == "error"
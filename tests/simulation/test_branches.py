@@ -0,0 +1,66 @@
+from typing import Dict
+
+import pytest
+
+from foobartory.core.conditions import FoobarsTarget
+from foobartory.simulation.branches import Branch, BranchRun, fork_branches
+from foobartory.simulation.engine import Simulation, SimulationResult
+
+
+class TestForkBranches:
+    def setup_method(self):
+        self.simulation: Simulation = Simulation(seed=3)
+        self.simulation.run(max_time=300)
+
+    def test_fork_branches(self):
+        """
+        Test the branches continue from the forked state while the simulation goes on
+        :return:
+        """
+        runs: Dict[str, BranchRun] = fork_branches(
+            self.simulation,
+            {
+                "unchanged": Branch(),
+                "foobar value": Branch(settings={"FOOBAR_VALUE": 2}),
+                "foobars": Branch(stop_condition=FoobarsTarget(count=1), seed=1),
+            },
+        )
+        result: SimulationResult = self.simulation.run()
+
+        assert runs["unchanged"].result(timeout=30) == result
+        assert runs["foobar value"].result(timeout=30).finished
+        assert runs["foobar value"].result(timeout=30).time > 300
+        assert runs["foobars"].result(timeout=30).foobars >= 1
+        assert all(run.done() for run in runs.values())
+
+    def test_fork_branches_max_robots(self):
+        """
+        Test a branch overriding MAX_ROBOTS runs to the new target when the simulation had the default stop condition
+        :return:
+        """
+        run: BranchRun = fork_branches(self.simulation, {"more robots": Branch(settings={"MAX_ROBOTS": 50})})[
+            "more robots"
+        ]
+
+        assert run.result(timeout=60).finished
+        assert run.result(timeout=60).robots == 50
+
+    def test_fork_branches_max_time(self):
+        """
+        Test a branch stops at its simulated time budget
+        :return:
+        """
+        run: BranchRun = fork_branches(self.simulation, {"short": Branch(max_time=310)})["short"]
+
+        assert not run.result(timeout=30).finished
+        assert run.result(timeout=30).time <= 310
+
+    def test_fork_branches_error(self):
+        """
+        Test a branch failure is raised by its result
+        :return:
+        """
+        run: BranchRun = fork_branches(self.simulation, {"unknown": Branch(settings={"UNKNOWN": 1})})["unknown"]
+
+        with pytest.raises(RuntimeError, match="UNKNOWN"):
+            run.result(timeout=30)
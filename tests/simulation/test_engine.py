@@ -0,0 +1,263 @@
+from typing import Dict, List
+from unittest.mock import Mock
+
+import pytest
+
+from foobartory.core.conditions import BalanceTarget, FoobarsTarget, RobotsTarget, SimulatedTimeBudget
+from foobartory.core.models.items.foo import Foo
+from foobartory.core.models.recipe import Recipe, RecipeBook
+from foobartory.core.models.robot.enums.robot_action import RobotActivity
+from foobartory.core.models.strategy import Strategy
+from foobartory.core.models.warehouse import Warehouse
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.core.robot import Robot
+from foobartory.settings.settings import settings
+from foobartory.simulation.engine import Simulation, SimulationResult, run_simulation
+
+
+class TestSimulation:
+    def setup_method(self):
+        self.simulation: Simulation = Simulation(seed=1)
+
+    def get_recipe_index(self, activity: RobotActivity) -> int:
+        return [recipe.name for recipe in self.simulation.recipes].index(activity.value)
+
+    def test_init(self):
+        """
+        Test the simulation starts with the default robots mining foo
+        :return:
+        """
+        assert self.simulation.robots == settings.DEFAULT_ROBOTS
+        assert self.simulation.activities == [self.get_recipe_index(RobotActivity.MINING_FOO)] * settings.DEFAULT_ROBOTS
+        assert len(self.simulation.events) == settings.DEFAULT_ROBOTS
+
+    def test_move_before_changing_activity(self):
+        """
+        Test a robot moves before starting a new activity
+        :return:
+        """
+        self.simulation.set_stock("foo", settings.ROBOT_FOO_COST)
+        self.simulation.step()
+
+        assert self.simulation.result.moves == 1
+        assert self.simulation.events[-1][0] == settings.ROBOT_MOVING_DURATION
+
+    def test_buy_robot(self):
+        """
+        Test buying a robot pays it and adds a robot immediately
+        :return:
+        """
+        self.simulation.set_stock("money", settings.ROBOT_COST)
+        self.simulation.set_stock("foo", settings.ROBOT_FOO_COST)
+        self.simulation.start_activity(0, self.get_recipe_index(RobotActivity.BUYING_ROBOT))
+
+        assert self.simulation.robots == settings.DEFAULT_ROBOTS + 1
+        assert self.simulation.balance == 0
+        assert self.simulation.foos == 0
+
+    def test_sell_foobars(self):
+        """
+        Test selling takes at most ROBOT_SELLING_FOOBARS_MAX foobars and pays them at the end
+        :return:
+        """
+        self.simulation.set_stock("foobar", settings.ROBOT_SELLING_FOOBARS_MAX + 1)
+        self.simulation.start_activity(0, self.get_recipe_index(RobotActivity.SELLING_FOOBARS))
+
+        assert self.simulation.foobars == 1
+        assert self.simulation.balance == 0
+
+        self.simulation.time, _, robot, _, activity, count = self.simulation.events[-1]
+        self.simulation.finish_activity(robot, activity, count)
+
+        assert self.simulation.balance == settings.FOOBAR_VALUE * settings.ROBOT_SELLING_FOOBARS_MAX
+
+    def test_run(self):
+        """
+        Test the run method reaches MAX_ROBOTS
+        :return:
+        """
+        result: SimulationResult = self.simulation.run()
+
+        assert result.finished
+        assert result.robots == settings.MAX_ROBOTS
+        assert result.robots_bought == settings.MAX_ROBOTS - settings.DEFAULT_ROBOTS
+        assert result.time > 0
+        assert result.recipe_runs[RobotActivity.BUYING_ROBOT.value] == result.robots_bought
+        assert result.foobars_assembled == result.produced["foobar"]
+
+    def test_run_max_time(self):
+        """
+        Test the run method stops at the time budget
+        :return:
+        """
+        result: SimulationResult = self.simulation.run(max_time=10)
+
+        assert not result.finished
+        assert result.time <= 10
+
+    def test_run_simulation_deterministic(self):
+        """
+        Test the same seed gives the same result
+        :return:
+        """
+        assert run_simulation(seed=42) == run_simulation(seed=42)
+
+    def test_state_listeners(self):
+        """
+        Test the state listeners get every change of the counters
+        :return:
+        """
+        states: List[WarehouseState] = []
+        simulation: Simulation = Simulation(seed=1, state_listeners=[states.append])
+        result: SimulationResult = simulation.run()
+
+        assert states[0].robots == settings.DEFAULT_ROBOTS
+        assert states[-1].robots == result.robots
+        assert len(states) < result.events
+        assert all(previous.time <= state.time for previous, state in zip(states, states[1:]))
+
+    def test_stop_condition(self):
+        """
+        Test the simulation stops at the stop condition
+        :return:
+        """
+        simulation: Simulation = Simulation(seed=1, stop_condition=FoobarsTarget(count=3))
+        result: SimulationResult = simulation.run()
+
+        assert result.finished
+        assert result.foobars == 3
+        assert result.robots < settings.MAX_ROBOTS
+
+    def test_simulated_time_budget(self):
+        """
+        Test the simulation stops exactly at a simulated time budget
+        :return:
+        """
+        result: SimulationResult = Simulation(seed=1, stop_condition=SimulatedTimeBudget(seconds=100)).run()
+
+        assert result.finished
+        assert result.time == 100
+
+    def test_step_simulated_deadline(self):
+        """
+        Test a simulated deadline not stopping the simulation is a step of its own, before the next event
+        :return:
+        """
+        simulation: Simulation = Simulation(seed=1, milestones={"minute": SimulatedTimeBudget(seconds=60)})
+        while simulation.events[0][0] < 60:
+            simulation.step()
+        events: int = simulation.result.events
+
+        assert simulation.step()
+        assert simulation.time == 60
+        assert simulation.result.events == events
+        assert not simulation.finished
+        assert simulation.step()
+        assert simulation.result.events == events + 1
+
+    def test_milestones(self):
+        """
+        Test the milestones are reported with their simulated time
+        :return:
+        """
+        result: SimulationResult = Simulation(
+            seed=1, milestones={"ten robots": RobotsTarget(count=10), "never": BalanceTarget(balance=10**6)}
+        ).run()
+
+        assert [milestone.name for milestone in result.milestones] == ["ten robots"]
+        assert 0 < result.milestones[0].time < result.time
+
+    def test_recipe_book(self):
+        """
+        Test the simulation runs any recipe book
+        :return:
+        """
+        recipe_book: RecipeBook = RecipeBook(
+            recipes=[
+                Recipe(name="mining ore", outputs={"ore": 1}, duration_min=1, duration_max=3),
+                Recipe(name="smelting ingot", inputs={"ore": 2}, outputs={"ingot": 1}, duration_min=2, duration_max=2),
+                Recipe(name="selling ingots", inputs={"ingot": 1}, sale_value=4, batch_max=3, duration_max=5),
+                Recipe(name="buying robot", inputs={"money": 10}, outputs={"robot": 1}),
+            ]
+        )
+        result: SimulationResult = run_simulation(seed=1, recipe_book=recipe_book)
+
+        assert result.finished
+        assert result.robots == settings.MAX_ROBOTS
+        assert result.recipe_runs["buying robot"] == settings.MAX_ROBOTS - settings.DEFAULT_ROBOTS
+        assert result.produced["money"] == 4 * result.sold["ingot"]
+        assert result.foobars_assembled == 0
+
+    def test_reconfigure(self):
+        """
+        Test the simulation goes on with new settings from its current state
+        :return:
+        """
+        self.simulation.run(max_time=200)
+        state: WarehouseState = self.simulation.get_state()
+        runs: Dict[str, int] = self.simulation.get_result().recipe_runs
+        self.simulation.reconfigure(
+            settings=settings.override({"ROBOT_COST": 1}), stop_condition=RobotsTarget(count=40)
+        )
+
+        assert self.simulation.get_state() == state
+        assert self.simulation.get_result().recipe_runs == runs
+        assert self.simulation.planner.goal.inputs["money"] == 1
+        assert self.simulation.run().robots == 40
+
+    def test_strategy(self):
+        """
+        Test the simulation robots follow the planner strategy, also after a reconfiguration
+        :return:
+        """
+        strategy: Strategy = Strategy(
+            batch_min={RobotActivity.SELLING_FOOBARS.value: settings.ROBOT_SELLING_FOOBARS_MAX}
+        )
+        result: SimulationResult = run_simulation(seed=1, strategy=strategy)
+
+        assert result.robots == settings.MAX_ROBOTS
+        assert result.recipe_runs[RobotActivity.SELLING_FOOBARS.value] * settings.ROBOT_SELLING_FOOBARS_MAX == (
+            result.sold["foobar"]
+        )
+        assert run_simulation(seed=1, strategy=Strategy()) == run_simulation(seed=1)
+        self.simulation.reconfigure(strategy=strategy)
+        assert self.simulation.planner.strategy == strategy
+
+    def test_reconfigure_missing_recipe(self):
+        """
+        Test the new recipes have to contain the running ones
+        :return:
+        """
+        recipe_book: RecipeBook = RecipeBook(
+            recipes=[
+                Recipe(name="mining ore", outputs={"ore": 1}),
+                Recipe(name="selling ore", inputs={"ore": 1}, sale_value=1),
+                Recipe(name="buying robot", inputs={"money": 3}, outputs={"robot": 1}),
+            ]
+        )
+        with pytest.raises(ValueError, match="mining foo"):
+            self.simulation.reconfigure(recipe_book=recipe_book)
+
+    def test_from_factory(self):
+        """
+        Test a simulation can start from the state of a running factory
+        :return:
+        """
+        warehouse: Warehouse = Warehouse(balance=2, foos=[Foo()] * 3)
+        for activity in [RobotActivity.MINING_BAR, RobotActivity.SELLING_FOOBARS, RobotActivity.MINING_FOO]:
+            robot: Robot = Robot(robot_id=warehouse.robots.next_id(), warehouse=warehouse, stop_event=Mock())
+            robot.activity = activity
+            warehouse.robots.add(robot)
+        factory: Mock = Mock(
+            warehouse=warehouse, stop_condition=None, condition_monitor=None, milestones={}, strategy=None
+        )
+        factory.get_state.return_value = WarehouseState(time=50, robots=3, balance=2, foos=3, bars=0, foobars=0)
+        simulation: Simulation = Simulation.from_factory(factory, seed=1)
+
+        assert simulation.get_state() == factory.get_state.return_value
+        assert [simulation.recipes[activity].name for activity in simulation.activities] == [
+            RobotActivity.MINING_BAR.value,
+            RobotActivity.SELLING_FOOBARS.value,
+            RobotActivity.MINING_FOO.value,
+        ]
+        assert simulation.run().robots == settings.MAX_ROBOTS
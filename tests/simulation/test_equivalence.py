@@ -0,0 +1,102 @@
+from typing import List
+
+from foobartory.settings.settings import settings
+from foobartory.simulation.equivalence import (
+    EquivalenceHarness,
+    EquivalenceReport,
+    MetricComparison,
+    RunMeasure,
+    measure_factory,
+    measure_simulation,
+    patch_settings,
+)
+
+
+class TestEquivalenceHarness:
+    def setup_method(self):
+        self.harness: EquivalenceHarness = EquivalenceHarness(time_ratio=0.001, timeout=30, max_workers=2)
+        self.settings_values = settings.override({"MAX_ROBOTS": 4}).dict()
+
+    def test_patch_settings(self):
+        """
+        Test the global settings are patched without validation then restored
+        :return:
+        """
+        time_ratio: float = settings.TIME_RATIO
+        with patch_settings({"TIME_RATIO": 0.001}):
+            assert settings.TIME_RATIO == 0.001
+        assert settings.TIME_RATIO == time_ratio
+
+    def test_measure_simulation(self):
+        """
+        Test the engine measures
+        :return:
+        """
+        measure: RunMeasure = measure_simulation(self.settings_values, 1)
+
+        assert measure.finished
+        assert measure.time > 0
+        assert measure.sales > 0
+
+    def test_measure_factory(self):
+        """
+        Test the threaded factory measures are taken at MAX_ROBOTS robots, the settings are restored afterwards
+        :return:
+        """
+        time_ratio: float = settings.TIME_RATIO
+        measure: RunMeasure = measure_factory(self.settings_values, 1, 0.001, 30)
+
+        assert measure.finished
+        assert measure.time > 0
+        assert measure.sales > 0
+        assert measure.assemblies >= measure.sales
+        assert settings.TIME_RATIO == time_ratio
+        assert settings.MAX_ROBOTS != 4
+
+    def test_compare(self):
+        """
+        Test the comparisons flag the measures whose distributions differ
+        :return:
+        """
+        engine: List[RunMeasure] = [
+            RunMeasure(seed=seed, finished=True, time=100 + seed, sales=10 + (seed + 1) % 2, assemblies=20 + seed % 3)
+            for seed in range(30)
+        ]
+        factory: List[RunMeasure] = [
+            measure.copy(update={"time": measure.time * 1.5, "sales": 10 + measure.seed % 2}) for measure in engine
+        ]
+        comparisons: List[MetricComparison] = self.harness.compare(engine, factory)
+
+        assert [comparison.metric for comparison in comparisons] == ["time", "sales", "assemblies"]
+        assert [comparison.diverged for comparison in comparisons] == [True, False, False]
+        assert comparisons[0].relative_difference == 0.5
+
+    def test_compare_multiple_testing(self):
+        """
+        Test a p-value below alpha alone does not flag a measure once corrected for the 6 tests of the configuration
+        :return:
+        """
+        engine: List[RunMeasure] = [
+            RunMeasure(seed=seed, finished=True, time=100 + seed, sales=10, assemblies=20) for seed in range(30)
+        ]
+        factory: List[RunMeasure] = [measure.copy(update={"time": measure.time + 7}) for measure in engine]
+        comparison: MetricComparison = self.harness.compare(engine, factory)[0]
+
+        assert comparison.mann_whitney_p_value < self.harness.alpha
+        assert comparison.mann_whitney_adjusted_p_value == 6 * comparison.mann_whitney_p_value
+        assert not comparison.diverged
+
+    def test_run(self):
+        """
+        Test the harness runs both implementations on the same seeds and reports the comparisons
+        :return:
+        """
+        report: EquivalenceReport = self.harness.run([{"MAX_ROBOTS": 4}], range(4))
+
+        assert len(report.configurations) == 1
+        assert [measure.seed for measure in report.configurations[0].engine] == list(range(4))
+        assert [measure.seed for measure in report.configurations[0].factory] == list(range(4))
+        assert report.configurations[0].unfinished == 0
+        assert len(report.configurations[0].metrics) == 3
+        assert "{'MAX_ROBOTS': 4}: 4 seeds" in report.format()
+        assert f"alpha/6={self.harness.alpha / 6:.3g}" in report.format()
@@ -0,0 +1,132 @@
+import time
+from typing import Dict, List
+
+import pytest
+
+from foobartory.core.conditions import RobotsTarget, SimulatedTimeBudget, WallTimeBudget
+from foobartory.core.models.warehouse_state import WarehouseState
+from foobartory.settings.settings import settings
+from foobartory.simulation.branches import Branch, BranchRun
+from foobartory.simulation.engine import run_simulation
+from foobartory.simulation.host import FactoryHost, Tenant
+
+
+class TestFactoryHost:
+    def setup_method(self):
+        self.host: FactoryHost = FactoryHost(workers=2, quantum=1)
+
+    def teardown_method(self):
+        self.host.stop()
+
+    def test_add_tenant(self):
+        """
+        Test the tenants are scheduled when added and their ids are unique
+        :return:
+        """
+        tenant: Tenant = self.host.add_tenant("first", seed=1)
+
+        assert self.host.tenants == {"first": tenant}
+        assert self.host.waiting[0][2] is tenant
+        with pytest.raises(ValueError):
+            self.host.add_tenant("first")
+
+    def test_remove_tenant(self):
+        """
+        Test a removed tenant is not scheduled anymore
+        :return:
+        """
+        self.host.add_tenant("first", seed=1)
+        self.host.remove_tenant("first")
+
+        assert self.host.tenants == {}
+        assert self.host.waiting == []
+
+    def test_round_robin(self):
+        """
+        Test a tenant still late after its quantum goes back behind the other due tenants
+        :return:
+        """
+        first: Tenant = self.host.add_tenant("first", seed=1, time_ratio=0)
+        second: Tenant = self.host.add_tenant("second", seed=2, time_ratio=0)
+        self.host.admit_due_tenants(time.perf_counter())
+
+        assert list(self.host.ready) == [first, second]
+
+        self.host.running += 1
+        self.host.process_tenant(self.host.ready.popleft())
+
+        assert list(self.host.ready) == [second, first]
+        assert first.processed_events == 1
+        assert self.host.running == 0
+
+    def test_run(self):
+        """
+        Test the tenants run isolated: each one gets the result it would get alone
+        :return:
+        """
+        states: List[WarehouseState] = []
+        with self.host:
+            tenants: List[Tenant] = [
+                self.host.add_tenant(
+                    str(seed),
+                    settings=settings.override({"ROBOT_COST": seed + 1}),
+                    seed=seed,
+                    time_ratio=0.0001,
+                    stop_condition=RobotsTarget(count=5),
+                    state_listeners=[states.append] if seed == 0 else None,
+                )
+                for seed in range(20)
+            ]
+            assert self.host.wait(timeout=60)
+
+        for seed, tenant in enumerate(tenants):
+            assert tenant.finished
+            assert tenant.get_result().dict(exclude={"milestones"}) == run_simulation(
+                settings=settings.override({"ROBOT_COST": seed + 1}), seed=seed, stop_condition=RobotsTarget(count=5)
+            ).dict(exclude={"milestones"})
+        assert states[-1] == tenants[0].get_state()
+
+    def test_run_paced(self):
+        """
+        Test a tenant follows the wall clock with its time ratio
+        :return:
+        """
+        with self.host:
+            tenant: Tenant = self.host.add_tenant(
+                "paced", seed=1, time_ratio=0.01, stop_condition=SimulatedTimeBudget(seconds=20)
+            )
+            started_at: float = time.perf_counter()
+            assert tenant.wait(timeout=10)
+
+        assert time.perf_counter() - started_at >= 0.19
+        assert tenant.get_state().time == 20
+
+    def test_run_wall_time_budget(self):
+        """
+        Test a tenant stops at its wall time budget
+        :return:
+        """
+        with self.host:
+            tenant: Tenant = self.host.add_tenant(
+                "slow", seed=1, time_ratio=1, stop_condition=WallTimeBudget(seconds=0.1)
+            )
+            assert tenant.wait(timeout=10)
+
+        assert tenant.get_result().finished
+        assert tenant.get_state().robots == settings.DEFAULT_ROBOTS
+
+    def test_fork(self):
+        """
+        Test a tenant can be forked into branches while the host runs
+        :return:
+        """
+        with self.host:
+            tenant: Tenant = self.host.add_tenant("forked", seed=1, time_ratio=0.0001)
+            runs: Dict[str, BranchRun] = self.host.fork_tenant(
+                "forked", {"unchanged": Branch(), "cheaper": Branch(settings={"ROBOT_COST": 1})}
+            )
+            assert self.host.paused == 0
+            assert tenant.wait(timeout=60)
+
+        assert runs["unchanged"].result(timeout=30) == tenant.get_result()
+        assert runs["cheaper"].result(timeout=30).robots == settings.MAX_ROBOTS
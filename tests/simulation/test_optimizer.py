@@ -0,0 +1,74 @@
+from typing import List
+
+import pytest
+
+from foobartory.core.models.strategy import Strategy
+from foobartory.settings.settings import settings
+from foobartory.simulation.engine import SimulationResult
+from foobartory.simulation.optimizer import OptimizationResult, StrategyOptimizer
+from foobartory.simulation.result_cache import ResultCache
+from foobartory.simulation.sweep import get_run_key
+
+
+class TestStrategyOptimizer:
+    def setup_method(self):
+        self.cache: ResultCache = ResultCache(path=":memory:")
+        self.optimizer: StrategyOptimizer = StrategyOptimizer(cache=self.cache, max_workers=2)
+
+    def test_sample(self):
+        """
+        Test the sampled strategies are distinct, reproducible and in the search space
+        :return:
+        """
+        strategies: List[Strategy] = self.optimizer.sample(20, seed=1)
+
+        assert strategies == self.optimizer.sample(20, seed=1)
+        assert len(strategies) == len(set(strategy.json() for strategy in strategies))
+        for strategy in strategies:
+            for name, value in strategy.get_parameters().items():
+                low, high = self.optimizer.search_space[name]
+                assert low <= value <= high
+
+    def test_get_score(self):
+        """
+        Test the runs not reaching MAX_ROBOTS score the time budget
+        :return:
+        """
+        result: SimulationResult = SimulationResult(
+            seed=1, finished=True, time=500, robots=settings.MAX_ROBOTS, balance=0, foos=0, bars=0, foobars=0
+        )
+
+        assert self.optimizer.get_score(result) == 500
+        assert self.optimizer.get_score(result.copy(update={"robots": 3})) == self.optimizer.time_budget
+
+    def test_optimize(self):
+        """
+        Test the successive halving keeps fewer candidates on more seeds, and scores the winner and the default
+        strategy on held-out seeds
+        :return:
+        """
+        candidates: List[Strategy] = [
+            Strategy(batch_min={"selling foobar": 1}),
+            Strategy(batch_min={"selling foobar": settings.ROBOT_SELLING_FOOBARS_MAX}),
+            Strategy(reserves={"foo": settings.ROBOT_FOO_COST}),
+        ]
+        result: OptimizationResult = self.optimizer.optimize(candidates, seeds=8, min_seeds=2)
+
+        assert [(len(round.scores), round.seeds) for round in result.rounds] == [(4, 2), (2, 4), (1, 8)]
+        assert result.best.seeds == result.baseline.seeds == 8
+        assert result.baseline.strategy == Strategy()
+        assert result.rounds[-1].scores[0].strategy == result.best.strategy
+        for seed in range(8, 16):
+            assert self.cache.get(get_run_key(settings, seed, self.optimizer.stop_condition, Strategy())) is not None
+        assert result.evaluations < 4 * 8 + 2 * 8
+        assert len(self.cache) == result.evaluations
+
+    def test_optimize_validation(self):
+        """
+        Test the search parameters validation
+        :return:
+        """
+        with pytest.raises(ValueError):
+            self.optimizer.optimize(2, seeds=4, min_seeds=8)
+        with pytest.raises(ValueError):
+            self.optimizer.optimize(2, reduction=1)
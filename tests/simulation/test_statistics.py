@@ -0,0 +1,81 @@
+import math
+import random
+from typing import List
+
+import pytest
+
+from foobartory.simulation.statistics import describe, holm, ks_2samp, mann_whitney_u, rank
+
+
+class TestStatistics:
+    def setup_method(self):
+        generator: random.Random = random.Random(1)
+        self.sample: List[float] = [generator.gauss(0, 1) for _ in range(200)]
+        self.same: List[float] = [generator.gauss(0, 1) for _ in range(150)]
+        self.shifted: List[float] = [generator.gauss(1, 1) for _ in range(150)]
+
+    def test_ks_2samp(self):
+        """
+        Test the Kolmogorov-Smirnov test distinguishes shifted distributions only
+        :return:
+        """
+        assert ks_2samp([1, 2, 3], [1, 2, 3]) == (0, 1)
+        statistic, p_value = ks_2samp(list(range(10)), list(range(10, 20)))
+        assert statistic == 1
+        assert p_value == pytest.approx(2 * math.exp(-2 * (math.sqrt(5) + 0.12 + 0.11 / math.sqrt(5)) ** 2), rel=1e-3)
+        assert ks_2samp(self.sample, self.same)[1] > 0.05
+        assert ks_2samp(self.sample, self.shifted)[1] < 1e-6
+
+    def test_ks_2samp_ties(self):
+        """
+        Test tied values are only compared once both distribution functions stepped over them
+        :return:
+        """
+        assert ks_2samp([1, 1, 2, 2], [1, 2]) == (0, 1)
+
+    def test_mann_whitney_u(self):
+        """
+        Test the Mann-Whitney test against a value computed by hand and on drawn samples
+        :return:
+        """
+        statistic, p_value = mann_whitney_u([1, 2, 3], [4, 5, 6])
+        assert statistic == 0
+        assert p_value == pytest.approx(math.erfc(4 / math.sqrt(5.25) / math.sqrt(2)))
+        assert mann_whitney_u([1, 1, 1], [1, 1]) == (3, 1)
+        assert mann_whitney_u(self.sample, self.same)[1] > 0.05
+        assert mann_whitney_u(self.sample, self.shifted)[1] < 1e-6
+
+    def test_empty_samples(self):
+        """
+        Test the tests refuse empty samples
+        :return:
+        """
+        with pytest.raises(ValueError):
+            ks_2samp([], [1])
+        with pytest.raises(ValueError):
+            mann_whitney_u([1], [])
+
+    def test_rank(self):
+        """
+        Test the tied values get their average rank
+        :return:
+        """
+        assert rank([10, 30, 20, 30]) == ([1, 3.5, 2, 3.5], [1, 1, 2])
+
+    def test_holm(self):
+        """
+        Test the p-values are multiplied by the number of tests left and kept in the order of the sorted p-values
+        :return:
+        """
+        assert holm([0.04, 0.01, 0.03]) == pytest.approx([0.06, 0.03, 0.06])
+        assert holm([0.5, 0.001]) == pytest.approx([0.5, 0.002])
+        assert holm([0.9, 0.8]) == [1, 1]
+        assert holm([]) == []
+
+    def test_describe(self):
+        """
+        Test the mean and the sample standard deviation
+        :return:
+        """
+        assert describe([1, 2, 3]) == {"mean": 2, "std": 1}
+        assert describe([4]) == {"mean": 4, "std": 0}
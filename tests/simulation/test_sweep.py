@@ -0,0 +1,101 @@
+from typing import List
+
+import pytest
+
+from foobartory.core.conditions import RobotsTarget, WallTimeBudget
+from foobartory.core.models.strategy import Strategy
+from foobartory.settings.settings import settings
+from foobartory.simulation.result_cache import ResultCache
+from foobartory.simulation.sweep import Sweep, SweepRun, get_run_key
+
+
+class TestSweep:
+    def setup_method(self):
+        self.cache: ResultCache = ResultCache(path=":memory:")
+        self.sweep: Sweep = Sweep(cache=self.cache, max_workers=2)
+
+    def test_grid(self):
+        """
+        Test the grid method
+        :return:
+        """
+        assert Sweep.grid({"ROBOT_COST": [3, 4], "FOOBAR_VALUE": [1]}) == [
+            {"ROBOT_COST": 3, "FOOBAR_VALUE": 1},
+            {"ROBOT_COST": 4, "FOOBAR_VALUE": 1},
+        ]
+
+    def test_random_samples(self):
+        """
+        Test the random_samples method, integer settings get integer values
+        :return:
+        """
+        samples = Sweep.random_samples({"ROBOT_FOO_COST": (2, 8), "FOOBAR_VALUE": (1, 2)}, samples=10, seed=1)
+
+        assert len(samples) == 10
+        assert samples == Sweep.random_samples({"ROBOT_FOO_COST": (2, 8), "FOOBAR_VALUE": (1, 2)}, samples=10, seed=1)
+        for sample in samples:
+            assert type(sample["ROBOT_FOO_COST"]) is int
+            assert 2 <= sample["ROBOT_FOO_COST"] <= 8
+            assert 1 <= sample["FOOBAR_VALUE"] <= 2
+
+    def test_get_run_key(self):
+        """
+        Test the get_run_key method changes with the settings, the seed and the strategy
+        :return:
+        """
+        assert get_run_key(settings, 1) == get_run_key(settings.copy(), 1)
+        assert get_run_key(settings, 1) != get_run_key(settings, 2)
+        assert get_run_key(settings, 1) != get_run_key(settings.override({"ROBOT_COST": 4}), 1)
+        assert get_run_key(settings, 1) != get_run_key(settings, 1, RobotsTarget(count=10))
+        assert get_run_key(settings, 1) == get_run_key(settings, 1, strategy=Strategy())
+        assert get_run_key(settings, 1) != get_run_key(settings, 1, strategy=Strategy(reserves={"foo": 1}))
+
+    def test_wall_time_budget_refused(self):
+        """
+        Test the simulations stopped on a wall time budget are not cached
+        :return:
+        """
+        with pytest.raises(ValueError):
+            get_run_key(settings, 1, RobotsTarget(count=10) | WallTimeBudget(seconds=1))
+        with pytest.raises(ValueError):
+            Sweep(cache=self.cache, stop_condition=WallTimeBudget(seconds=1))
+
+    def test_run_uses_cache(self):
+        """
+        Test the run method only computes the simulations missing from the cache
+        :return:
+        """
+        first_runs: List[SweepRun] = self.sweep.run(Sweep.grid({"ROBOT_COST": [3, 4]}), seeds=[1])
+        second_runs: List[SweepRun] = self.sweep.run(Sweep.grid({"ROBOT_COST": [3, 4, 5]}), seeds=[1])
+
+        assert [run.cached for run in first_runs] == [False, False]
+        assert [run.cached for run in second_runs] == [True, True, False]
+        assert second_runs[0].result == first_runs[0].result
+        assert all(run.result.finished for run in second_runs)
+        assert len(self.cache) == 3
+
+    def test_run_unknown_setting(self):
+        """
+        Test the run method with an unknown setting
+        :return:
+        """
+        with pytest.raises(ValueError):
+            self.sweep.run([{"UNKNOWN": 1}], seeds=[1])
+
+
+class TestResultCache:
+    def test_eviction(self):
+        """
+        Test the least recently used entries are evicted
+        :return:
+        """
+        cache: ResultCache = ResultCache(path=":memory:", max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert len(cache) == 2
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"